@@ -0,0 +1,35 @@
+"""
+_timing.py
+----------
+Throughput helpers shared by the micro-benchmarks.
+"""
+
+import time
+
+
+def _rate(fn, seconds):
+    """Run fn repeatedly for ~seconds, return calls/sec."""
+    n, batch = 0, 200
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        for _ in range(batch):
+            fn()
+        n += batch
+        now = time.perf_counter()
+        if now >= deadline:
+            return n / (now - start)
+
+
+async def _arate(coro_fn, seconds):
+    """Await coro_fn() repeatedly for ~seconds, return calls/sec."""
+    n, batch = 0, 200
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        for _ in range(batch):
+            await coro_fn()
+        n += batch
+        now = time.perf_counter()
+        if now >= deadline:
+            return n / (now - start)
@@ -0,0 +1,82 @@
+"""
+bench_codec.py
+--------------
+Compares the JSON codec backends (stdlib / orjson / msgspec) on realistic
+telemetry envelopes as they arrive from an Air Unit.
+
+Per backend it measures:
+  decode   - NATS bytes -> envelope dict
+  encode   - WS frame {"type", "payload"} -> str
+  roundtrip- the full TelemetryController + send_event path (decode,
+             extract body, encode WS frame)
+
+Run from src/:
+    python -m benchmarks.bench_codec [--seconds 1.0]
+"""
+
+import argparse
+import json
+
+from benchmarks._timing import _rate
+from core.utils.codec import create_codec, _BACKENDS
+
+
+def telemetry_envelope(seq: int = 1) -> dict:
+    """A telemetry message shaped like the Air Unit's MessageFactory output."""
+    return {
+        "header": {
+            "msg_type": "Telemetry",
+            "msg_id": "5f0e1c7a-3b8e-4c8e-9a55-0b1f3f7f2d11",
+            "qos": "AT_MOST_ONCE",
+            "stream": None,
+            "timestamp": "2026-10-17T09:41:12.512345",
+            "source": "airunit-001",
+            "sequence": seq,
+        },
+        "body": {
+            "drone_id": "airunit-001",
+            "position": {"lat": -35.3632621, "lon": 149.1652374, "alt": 584.07, "relative_alt": 20.03},
+            "velocity": {"vx": 1.42, "vy": -0.37, "vz": -0.02},
+            "attitude": {"roll": 0.0123, "pitch": -0.0456, "yaw": 1.5708},
+            "heading": 90.0,
+            "groundspeed": 1.47,
+            "airspeed": 1.51,
+            "battery": {"voltage": 12.41, "current": 8.73, "remaining": 87},
+            "gps": {"fix_type": 3, "satellites_visible": 14, "eph": 0.8, "epv": 1.2},
+            "mode": "GUIDED",
+            "armed": True,
+            "status": "ok",
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=1.0, help="time budget per case")
+    args = parser.parse_args()
+
+    envelope = telemetry_envelope()
+    raw = json.dumps(envelope).encode("utf-8")
+    frame = {"type": "telemetry_update", "payload": envelope["body"]}
+    print(f"envelope: {len(raw)} bytes\n")
+
+    print(f"{'backend':<8} {'decode/s':>12} {'encode/s':>12} {'roundtrip/s':>12}")
+    for name in _BACKENDS:
+        codec = create_codec(name)
+        if codec.name != name:
+            print(f"{name:<8} (not installed)")
+            continue
+
+        def roundtrip():
+            body = codec.loads(raw).get("body", {})
+            return codec.dumps_text({"type": "telemetry_update", "payload": body})
+
+        assert json.loads(roundtrip())["payload"] == envelope["body"]
+        dec = _rate(lambda: codec.loads(raw), args.seconds)
+        enc = _rate(lambda: codec.dumps_text(frame), args.seconds)
+        rt = _rate(roundtrip, args.seconds)
+        print(f"{name:<8} {dec:>12,.0f} {enc:>12,.0f} {rt:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
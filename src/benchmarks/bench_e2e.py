@@ -0,0 +1,287 @@
+"""
+bench_e2e.py
+------------
+End-to-end telemetry latency: NATS publish -> nats-server -> NetworkService
+(TelemetryController -> WebSocketServer) -> K WebSocket clients.
+
+NetworkService runs in this process exactly as main.py starts it (NatsNode
+launches nats-server from a generated .conf). The simulated fleet and the WS
+clients each run in their own process, so they don't share this GIL. Every
+telemetry body carries sent_ns (time.time_ns() at publish); clients record
+now - sent_ns for each telemetry_update frame they receive.
+
+For each (uavs, clients) pair the run reports p50/p99/p999/max latency,
+ingress rate and WS egress throughput, and the whole matrix is written to JSON.
+
+Run from src/ (nats-server must be on PATH or given with --nats-server):
+    python -m benchmarks.bench_e2e [--uavs 1,10,100] [--clients 1,10] [--rate 10]
+        [--duration 10] [--ws-mode threaded|inline] [--conflate] [--out FILE]
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import warnings
+from array import array
+from datetime import datetime
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+
+def _percentiles(samples_ns):
+    if not samples_ns:
+        return {"p50_us": None, "p99_us": None, "p999_us": None, "max_us": None, "mean_us": None}
+    ordered = sorted(samples_ns)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] / 1000, 1)
+    return {
+        "p50_us": pick(0.50),
+        "p99_us": pick(0.99),
+        "p999_us": pick(0.999),
+        "max_us": round(ordered[-1] / 1000, 1),
+        "mean_us": round(sum(ordered) / len(ordered) / 1000, 1),
+    }
+
+
+# ------------------------------
+# Child processes
+# ------------------------------
+
+def _run_publisher(url, uavs, rate, duration, result):
+    """Publish uav.<id>.telemetry.update for `uavs` UAVs at `rate` Hz each."""
+    import nats
+    from core.utils import get_codec
+
+    codec = get_codec()
+
+    async def main():
+        nc = await nats.connect(url)
+        ids = [f"bench-{i + 1:04d}" for i in range(uavs)]
+        subjects = [f"uav.{uav_id}.telemetry.update" for uav_id in ids]
+        body = {
+            "position": {"lat": -35.3632621, "lon": 149.1652374, "alt": 584.07, "relative_alt": 20.03},
+            "velocity": {"vx": 1.42, "vy": -0.37, "vz": -0.02},
+            "attitude": {"roll": 0.0123, "pitch": -0.0456, "yaw": 1.5708},
+            "heading": 90.0, "groundspeed": 1.47, "airspeed": 1.51,
+            "battery": {"voltage": 12.41, "current": 8.73, "remaining": 87},
+            "gps": {"fix_type": 3, "satellites_visible": 14, "eph": 0.8, "epv": 1.2},
+            "mode": "GUIDED", "armed": True, "status": "ok",
+        }
+        header = {"msg_type": "Telemetry", "qos": "AT_MOST_ONCE", "stream": None, "sequence": 0}
+
+        loop = asyncio.get_running_loop()
+        period = 1.0 / rate
+        due = loop.time()
+        end = due + duration
+        sent = 0
+        while loop.time() < end:
+            for uav_id, subject in zip(ids, subjects):
+                header["sequence"] = sent
+                body["drone_id"] = uav_id
+                body["sent_ns"] = time.time_ns()
+                await nc.publish(subject, codec.dumps({"header": header, "body": body}))
+                sent += 1
+            due += period
+            delay = due - loop.time()
+            await asyncio.sleep(max(0.0, delay))
+        await nc.flush()
+        await nc.close()
+        return sent
+
+    result.put(asyncio.run(main()))
+
+
+def _run_clients(ws_url, clients, warmup, ready, stop, result):
+    """K WS clients; each records now - sent_ns for every telemetry_update frame."""
+    import websockets
+    from core.utils import get_codec
+
+    codec = get_codec()
+
+    warmup_ns = int(warmup * 1e9)
+    first_sent = [0]     # first sent_ns seen by any client; samples before first + warmup are dropped
+    samples = array("q")
+    received = [0]
+
+    async def client(connected):
+        async with websockets.connect(ws_url, max_queue=None) as ws:
+            connected.append(ws)
+            async for frame in ws:
+                now = time.time_ns()
+                msg = codec.loads(frame)
+                if msg.get("type") != "telemetry_update":
+                    continue
+                sent_ns = msg["payload"].get("sent_ns")
+                if not sent_ns:
+                    continue
+                received[0] += 1
+                if not first_sent[0]:
+                    first_sent[0] = sent_ns
+                if sent_ns >= first_sent[0] + warmup_ns:
+                    samples.append(now - sent_ns)
+
+    async def main():
+        connected = []
+        tasks = [asyncio.create_task(client(connected)) for _ in range(clients)]
+        while len(connected) < clients:
+            if any(task.done() for task in tasks):
+                return
+            await asyncio.sleep(0.01)
+        ready.set()
+        await asyncio.to_thread(stop.wait)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(main())
+    result.put((samples.tobytes(), received[0]))
+
+
+# ------------------------------
+# Orchestration (this process runs NetworkService)
+# ------------------------------
+
+async def _start_service(args, nats_port, ws_port, conf_path):
+    from services import NetworkService
+
+    service = NetworkService()
+    config = copy.deepcopy(service.config)
+    config["config_file"] = [conf_path]
+    config["nats"]["local_urls"] = [f"nats://127.0.0.1:{nats_port}"]
+    config["ws"]["port"] = ws_port
+    config["ws"]["mode"] = args.ws_mode
+    config["ws"].setdefault("conflation", {})["enabled"] = args.conflate
+    config.setdefault("recorder", {})["enabled"] = False
+    config.setdefault("telemetry", {})["passthrough"] = not args.no_passthrough
+    service.config = config
+    service.client.local_servers = config["nats"]["local_urls"]
+
+    await service.start_service()
+    if not service.ws_server or not service.client.nc:
+        raise RuntimeError("NetworkService failed to start; see log above")
+    return service
+
+
+async def _run_case(ctx, args, ws_url, nats_url, uavs, clients):
+    ready, stop = ctx.Event(), ctx.Event()
+    client_q, pub_q = ctx.Queue(), ctx.Queue()
+
+    client_proc = ctx.Process(target=_run_clients, args=(ws_url, clients, args.warmup, ready, stop, client_q))
+    client_proc.start()
+    if not await asyncio.to_thread(ready.wait, 30):
+        client_proc.terminate()
+        raise RuntimeError("WS clients failed to connect")
+
+    pub_proc = ctx.Process(target=_run_publisher, args=(nats_url, uavs, args.rate, args.duration + args.warmup, pub_q))
+    pub_proc.start()
+    sent = await asyncio.to_thread(pub_q.get)
+    await asyncio.to_thread(pub_proc.join)
+
+    # Let in-flight frames drain before stopping the clients
+    await asyncio.sleep(1.0)
+    stop.set()
+    raw, received = await asyncio.to_thread(client_q.get)
+    await asyncio.to_thread(client_proc.join)
+
+    samples = array("q")
+    samples.frombytes(raw)
+    expected = sent * clients
+    return dict(
+        {
+            "uavs": uavs,
+            "clients": clients,
+            "rate_hz": args.rate,
+            "sent": sent,
+            "received": received,
+            "delivery": round(received / expected, 4) if expected else None,
+            "ingress_msgs_s": round(sent / (args.duration + args.warmup), 1),
+            "egress_frames_s": round(received / (args.duration + args.warmup), 1),
+            "samples": len(samples),
+        },
+        **_percentiles(samples),
+    )
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="NATS -> NetworkService -> WS latency benchmark")
+    parser.add_argument("--uavs", default="1,10,100", help="comma-separated fleet sizes")
+    parser.add_argument("--clients", default="1,10", help="comma-separated WS client counts")
+    parser.add_argument("--rate", type=float, default=10.0, help="telemetry Hz per UAV")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per case")
+    parser.add_argument("--warmup", type=float, default=1.0, help="seconds discarded at the start of each case")
+    parser.add_argument("--ws-mode", choices=("threaded", "inline"), default="threaded")
+    parser.add_argument("--conflate", action="store_true", help="keep telemetry conflation on (default: off)")
+    parser.add_argument("--no-passthrough", action="store_true", help="parse telemetry instead of slicing bytes")
+    parser.add_argument("--nats-server", default=None, help="path to nats-server if not on PATH")
+    parser.add_argument("--nats-port", type=int, default=34222)
+    parser.add_argument("--ws-port", type=int, default=38901)
+    parser.add_argument("--out", default=None, help="JSON output path (default benchmarks/results/e2e-<time>.json)")
+    args = parser.parse_args()
+
+    if args.nats_server:
+        os.environ["PATH"] = os.path.dirname(os.path.abspath(args.nats_server)) + os.pathsep + os.environ["PATH"]
+
+    workdir = tempfile.mkdtemp(prefix="bench_e2e_")
+    conf_path = os.path.join(workdir, "nats.conf")
+    with open(conf_path, "w") as f:
+        f.write(f"listen: 127.0.0.1:{args.nats_port}\n")
+
+    nats_url = f"nats://127.0.0.1:{args.nats_port}"
+    ws_url = f"ws://127.0.0.1:{args.ws_port}/?client_class=bench"
+    ctx = multiprocessing.get_context("spawn")
+
+    service = await _start_service(args, args.nats_port, args.ws_port, conf_path)
+    runs = []
+    try:
+        for uavs in [int(x) for x in args.uavs.split(",")]:
+            for clients in [int(x) for x in args.clients.split(",")]:
+                result = await _run_case(ctx, args, ws_url, nats_url, uavs, clients)
+                runs.append(result)
+                print(
+                    f"🏁 uavs={uavs:<5} clients={clients:<4} in {result['ingress_msgs_s']:>9,.0f}/s "
+                    f"out {result['egress_frames_s']:>10,.0f}/s  p50 {result['p50_us']}us  "
+                    f"p99 {result['p99_us']}us  p999 {result['p999_us']}us  delivery {result['delivery']}"
+                )
+    finally:
+        await service.stop_service()
+
+    from core.utils import get_codec
+    report = {
+        "benchmark": "e2e_telemetry_latency",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {
+            "ws_mode": args.ws_mode,
+            "conflation": args.conflate,
+            "passthrough": not args.no_passthrough,
+            "codec": get_codec().name,
+            "rate_hz": args.rate,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+        },
+        "runs": runs,
+    }
+
+    out = args.out or os.path.join("benchmarks", "results", f"e2e-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📝 Results written to {out}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+"""
+bench_hot_paths.py
+------------------
+Per-call cost of the per-message building blocks, with realistic payloads
+(~630 B telemetry envelope, ~410 B discovery, 50-waypoint mission).
+
+  MessageFactory.create / encode     (discovery)
+  SubjectFactory.create              (cached hit, and a miss per call)
+  NatsPublisher.publish              (encode + QoS routing, fake NATS client)
+  TelemetryController handler        (fake msg; parsed, passthrough, +history)
+  WebSocketServer.send_event         (frame serialization + subscriber lookup, no clients)
+  WebSocketServer.send_raw           (passthrough framing, no clients)
+
+No network is used; NATS and the WS loop are stubbed so only our code is timed.
+
+Run from src/:
+    python -m benchmarks.bench_hot_paths [--seconds 1.0] [--filter telemetry]
+"""
+
+import argparse
+import asyncio
+import itertools
+
+from benchmarks._timing import _arate, _rate
+from benchmarks.bench_codec import telemetry_envelope
+from controllers import TelemetryController
+from core.comms.nats.publisher import NatsPublisher
+from core.comms.ws import WebSocketServer
+from core.utils import get_codec, slice_envelope_body
+from factory import MessageFactory, SubjectFactory
+from services.telemetry_store import TelemetryStore
+
+HISTORY_FIELDS = [
+    "position.lat", "position.lon", "position.alt", "position.relative_alt",
+    "velocity.vx", "velocity.vy", "velocity.vz", "heading", "groundspeed",
+    "battery.voltage", "battery.current", "battery.remaining",
+]
+
+
+class _FakeNc:
+    async def publish(self, subject, data):
+        pass
+
+
+class _FakeClient:
+    nc = _FakeNc()
+
+
+class _FakeMsg:
+    __slots__ = ("subject", "data")
+
+    def __init__(self, subject, data):
+        self.subject = subject
+        self.data = data
+
+
+async def _noop(*args):
+    pass
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=1.0, help="time budget per case")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    args = parser.parse_args()
+
+    codec = get_codec()
+    envelope = telemetry_envelope()
+    telemetry_raw = codec.dumps(envelope)
+    telemetry_body = envelope["body"]
+    telemetry_body_raw = slice_envelope_body(telemetry_raw)
+    telemetry_msg = _FakeMsg("uav.airunit-001.telemetry.update", telemetry_raw)
+
+    subjects = SubjectFactory()
+    uav_ids = (f"uav-{i}" for i in itertools.count())
+
+    publisher = NatsPublisher(_FakeClient())
+    discovery_dict = MessageFactory.create("discovery")
+    discovery_encoded = MessageFactory.encode("discovery")
+    mission = {
+        "header": discovery_dict["header"],
+        "body": {"mission_type": "WAYPOINT", "rtl_after": True, "waypoints": [
+            {"seq": i, "lat": -35.3632621 + i * 5e-5, "lon": 149.1652374, "alt": 20.0} for i in range(50)
+        ]},
+    }
+
+    parsed = TelemetryController(None, "bench", _noop, on_telemetry_raw=_noop, passthrough=False)
+    passthrough = TelemetryController(None, "bench", _noop, on_telemetry_raw=_noop, passthrough=True)
+    with_history = TelemetryController(
+        None, "bench", _noop, on_telemetry_raw=_noop, passthrough=True,
+        store=TelemetryStore(HISTORY_FIELDS, capacity=600, max_uavs=4),
+    )
+
+    # send_event/send_raw on an inline WS server (this loop) with no clients: serialization + lookup only
+    ws = WebSocketServer("127.0.0.1", 0)
+    await ws.start_async()
+
+    sync_cases = [
+        ("MessageFactory.create(discovery)", lambda: MessageFactory.create("discovery"), len(codec.dumps(discovery_dict))),
+        ("MessageFactory.encode(discovery)", lambda: MessageFactory.encode("discovery"), len(discovery_encoded.data)),
+        ("SubjectFactory.create (hit)", lambda: subjects.create(
+            source="ground", source_id="groundunit-001", topic="fcconnect", subtopic="request",
+            mode="pub", remote_client_id="airunit-001"), None),
+        ("SubjectFactory.create (miss)", lambda: subjects.create(
+            source="ground", source_id="groundunit-001", topic="fcconnect", subtopic="request",
+            mode="pub", remote_client_id=next(uav_ids)), None),
+        ("send_event(telemetry_update)", lambda: ws.send_event(
+            "telemetry_update", telemetry_body, uav_id="airunit-001"), len(telemetry_body_raw)),
+        ("send_raw(telemetry_update)", lambda: ws.send_raw(
+            "telemetry_update", telemetry_body_raw, uav_id="airunit-001"), len(telemetry_body_raw)),
+    ]
+    async_cases = [
+        ("NatsPublisher.publish(dict discovery)", lambda: publisher.publish("bench.subject", discovery_dict), None),
+        ("NatsPublisher.publish(encoded discovery)", lambda: publisher.publish("bench.subject", discovery_encoded), None),
+        ("NatsPublisher.publish(dict mission x50)", lambda: publisher.publish("bench.subject", mission), len(codec.dumps(mission))),
+        ("telemetry handler (parsed)", lambda: parsed._handle_incoming_telemetry(telemetry_msg), len(telemetry_raw)),
+        ("telemetry handler (passthrough)", lambda: passthrough._handle_incoming_telemetry(telemetry_msg), len(telemetry_raw)),
+        ("telemetry handler (passthrough+history)", lambda: with_history._handle_incoming_telemetry(telemetry_msg), len(telemetry_raw)),
+    ]
+
+    print(f"codec: {codec.name}\n")
+    print(f"{'case':<42} {'payload':>8} {'calls/s':>12} {'us/call':>9}")
+    for name, fn, size in sync_cases:
+        if args.filter in name:
+            rate = _rate(fn, args.seconds)
+            print(f"{name:<42} {size or '':>8} {rate:>12,.0f} {1e6 / rate:>9.2f}")
+    for name, fn, size in async_cases:
+        if args.filter in name:
+            rate = await _arate(fn, args.seconds)
+            print(f"{name:<42} {size or '':>8} {rate:>12,.0f} {1e6 / rate:>9.2f}")
+    await ws.stop_async()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+"""
+bench_ws_modes.py
+-----------------
+Latency of the WebSocket server in "threaded" mode (own loop thread,
+cross-thread hops) vs "inline" mode (served on the main asyncio loop).
+
+Two measurements per mode, using one WS client in a separate thread:
+  egress - main loop send_event() -> frame received by the client
+  rtt    - client event -> handler -> hop to main loop (as NetworkService
+           does) -> send_event() reply -> received by the client
+
+Run from src/:
+    python -m benchmarks.bench_ws_modes [--messages 2000] [--interval 0.001] [--port 38900]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import warnings
+
+import websockets
+
+from core.comms.ws import WebSocketServer
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+
+def _summary(samples_ns):
+    us = sorted(s / 1000 for s in samples_ns)
+    pick = lambda q: us[min(len(us) - 1, int(q * len(us)))]
+    return f"p50 {pick(0.50):8.1f}us  p99 {pick(0.99):8.1f}us  mean {statistics.fmean(us):8.1f}us"
+
+
+async def _client(port, messages, egress_ready, egress_done):
+    """Runs on its own loop in a worker thread."""
+    egress, rtt = [], []
+    async with websockets.connect(f"ws://127.0.0.1:{port}") as ws:
+        # --- egress: the server pushes, we timestamp arrival ---
+        egress_ready.set()
+        for _ in range(messages):
+            frame = json.loads(await ws.recv())
+            egress.append(time.perf_counter_ns() - frame["payload"]["t0"])
+        egress_done.set()
+
+        # --- rtt: we ping, the main loop answers ---
+        for i in range(messages):
+            t0 = time.perf_counter_ns()
+            await ws.send(json.dumps({"type": "ping", "payload": {"i": i}}))
+            await ws.recv()
+            rtt.append(time.perf_counter_ns() - t0)
+    return egress, rtt
+
+
+async def run_mode(mode, port, messages, interval):
+    main_loop = asyncio.get_running_loop()
+    srv = WebSocketServer(host="127.0.0.1", port=port, max_queue=messages + 1)
+
+    def dispatch(coro):
+        # Same bridging rule as NetworkService._dispatch
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is main_loop:
+            main_loop.create_task(coro)
+        else:
+            asyncio.run_coroutine_threadsafe(coro, main_loop)
+
+    async def reply(ws, payload):
+        srv.send_event("pong", payload, to=ws)
+
+    srv.listen_event("ping", lambda ws, payload: dispatch(reply(ws, payload)))
+
+    if mode == "inline":
+        await srv.start_async()
+    else:
+        srv.start()
+        while not (srv.loop and srv.loop.is_running() and srv.server):
+            await asyncio.sleep(0.01)
+
+    import threading
+    egress_ready, egress_done = threading.Event(), threading.Event()
+    client = main_loop.run_in_executor(
+        None, lambda: asyncio.run(_client(port, messages, egress_ready, egress_done))
+    )
+
+    await asyncio.to_thread(egress_ready.wait)
+    while not srv.sessions:
+        await asyncio.sleep(0.001)
+    for _ in range(messages):
+        srv.send_event("telemetry_update", {"t0": time.perf_counter_ns()})
+        await asyncio.sleep(interval)  # paced like a telemetry feed, so we measure latency not backlog
+
+    egress, rtt = await client
+
+    if mode == "inline":
+        await srv.stop_async()
+    else:
+        srv.stop()
+    return egress, rtt
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--interval", type=float, default=0.001, help="seconds between egress frames")
+    parser.add_argument("--port", type=int, default=38900)
+    args = parser.parse_args()
+
+    results = {}
+    for i, mode in enumerate(("threaded", "inline")):
+        results[mode] = await run_mode(mode, args.port + i, args.messages, args.interval)
+
+    print()
+    for mode, (egress, rtt) in results.items():
+        print(f"{mode:<9} egress  {_summary(egress)}")
+        print(f"{mode:<9} rtt     {_summary(rtt)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,20 +1,38 @@
 # config_loader.py
 
 import os
+import threading
 import yaml
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
 class ConfigLoader:
     """
     Central loader for YAML configs in config/ directory.
 
+    Parsed files are kept in a process-wide cache keyed by absolute path,
+    so repeated get() calls on the hot path never touch the YAML parser.
+    An entry is re-parsed only when the file's mtime changes, or when
+    reload() is called explicitly.
+
     Example:
         loader = ConfigLoader()
         nats_cfg = loader.get("nats.yaml")
         loader.save("new_config.yaml", {"a": 1, "b": 2})
+
+        # Live updates
+        loader.subscribe("topic.yaml", lambda name, data: print(name, data))
+        ConfigLoader.start_watcher(interval=1.0)
     """
 
+    # ---- process-wide state (shared by every ConfigLoader instance) ----
+    _cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+    _subscribers: Dict[str, List[Callable[[str, Dict[str, Any]], None]]] = {}
+    _lock = threading.RLock()
+
+    _watcher: Optional[threading.Thread] = None
+    _watcher_stop = threading.Event()
+
     def __init__(self, config_dir: str = "config"):
         self.config_dir = os.path.abspath(config_dir)
 
@@ -22,15 +40,14 @@ class ConfigLoader:
         """Build absolute path to a config file."""
         return os.path.join(self.config_dir, filename)
 
-    def _load_file(self, filename: str) -> Dict[str, Any]:
+    @staticmethod
+    def _parse(path: str) -> Dict[str, Any]:
         """
-        Private: check file existence and load YAML as dict.
+        Private: load YAML at path as dict.
         Raises:
             FileNotFoundError: if the file does not exist
             ValueError: if file is empty or contains invalid YAML
         """
-        path = self._file_path(filename)
-
         if not os.path.exists(path):
             raise FileNotFoundError(f"Config file not found: {path}")
 
@@ -45,19 +62,157 @@ class ConfigLoader:
 
         return data
 
+    def _load_file(self, filename: str) -> Dict[str, Any]:
+        """
+        Private: return cached YAML for filename, re-parsing only if the
+        file changed on disk since it was cached.
+        """
+        path = self._file_path(filename)
+
+        # While the watcher runs it owns invalidation; skip the stat() syscall
+        cached = ConfigLoader._cache.get(path)
+        if cached is not None and ConfigLoader._watcher is not None:
+            return cached[1]
+
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Config file not found: {path}") from None
+
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        with ConfigLoader._lock:
+            cached = ConfigLoader._cache.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            data = self._parse(path)
+            ConfigLoader._cache[path] = (mtime, data)
+
+        # A changed file picked up lazily still counts as a change
+        if cached is not None:
+            ConfigLoader._notify(path, data)
+        return data
+
     def get(self, filename: str) -> Dict[str, Any]:
         """
         Public method: load YAML and return dict.
+        The returned dict is shared with the cache and must be treated as read-only.
         Raises exceptions if file missing or data invalid.
         """
         return self._load_file(filename)
 
+    def reload(self, filename: Optional[str] = None) -> None:
+        """
+        Force re-parse of one file (or every cached file in this config
+        directory when filename is None) and notify subscribers.
+        """
+        if filename is not None:
+            paths = [self._file_path(filename)]
+        else:
+            with ConfigLoader._lock:
+                paths = [p for p in ConfigLoader._cache if os.path.dirname(p) == self.config_dir]
+
+        for path in paths:
+            with ConfigLoader._lock:
+                mtime = os.stat(path).st_mtime
+                data = self._parse(path)
+                ConfigLoader._cache[path] = (mtime, data)
+            ConfigLoader._notify(path, data)
+
+    def subscribe(self, filename: str, callback: Callable[[str, Dict[str, Any]], None]) -> None:
+        """
+        Register callback(filename, data) to run whenever filename is re-parsed
+        after a change. Callbacks may run on the watcher thread.
+        """
+        path = self._file_path(filename)
+        with ConfigLoader._lock:
+            ConfigLoader._subscribers.setdefault(path, []).append(callback)
+
+    def unsubscribe(self, filename: str, callback: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Remove a callback previously registered with subscribe()."""
+        path = self._file_path(filename)
+        with ConfigLoader._lock:
+            callbacks = ConfigLoader._subscribers.get(path, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    @classmethod
+    def _notify(cls, path: str, data: Dict[str, Any]) -> None:
+        """Invoke subscribers of path. A failing subscriber never breaks the others."""
+        with cls._lock:
+            callbacks = list(cls._subscribers.get(path, []))
+
+        name = os.path.basename(path)
+        for cb in callbacks:
+            try:
+                cb(name, data)
+            except Exception as e:
+                print(f"❌ Config subscriber failed for {name}: {e}")
+
+    # ------------------------------
+    # Change watcher
+    # ------------------------------
+
+    @classmethod
+    def start_watcher(cls, interval: float = 1.0) -> None:
+        """
+        Start a daemon thread that polls the mtime of every cached file
+        and of every file with subscribers, re-parsing and notifying on change.
+        Polling keeps this portable (no inotify on Windows ground stations).
+        """
+        if cls._watcher and cls._watcher.is_alive():
+            return
+        cls._watcher_stop.clear()
+        cls._watcher = threading.Thread(
+            target=cls._watch, args=(interval,), name="config-watcher", daemon=True
+        )
+        cls._watcher.start()
+
+    @classmethod
+    def stop_watcher(cls) -> None:
+        """Stop the change watcher thread if running."""
+        cls._watcher_stop.set()
+        if cls._watcher:
+            cls._watcher.join(timeout=2)
+        cls._watcher = None
+
+    @classmethod
+    def _watch(cls, interval: float) -> None:
+        while not cls._watcher_stop.wait(interval):
+            with cls._lock:
+                paths = set(cls._cache) | set(cls._subscribers)
+
+            for path in paths:
+                try:
+                    mtime = os.stat(path).st_mtime
+                except OSError:
+                    continue
+
+                cached = cls._cache.get(path)
+                if cached is not None and cached[0] == mtime:
+                    continue
+
+                try:
+                    with cls._lock:
+                        cached = cls._cache.get(path)
+                        if cached is not None and cached[0] == mtime:
+                            continue
+                        data = cls._parse(path)
+                        cls._cache[path] = (mtime, data)
+                except (FileNotFoundError, ValueError) as e:
+                    # Keep serving the last good config while the file is mid-edit
+                    print(f"❌ Config reload failed for {path}: {e}")
+                    continue
+
+                cls._notify(path, data)
+
     def save(self, filename: str, data: Dict[str, Any]) -> str:
         """
         Save a dictionary as a YAML config file inside the config directory.
 
         Args:
-            filename: Target YAML filename 
+            filename: Target YAML filename
             data: Dict to write into the YAML file.
 
         Returns:
@@ -81,4 +236,11 @@ class ConfigLoader:
         except Exception as e:
             raise OSError(f"Failed to write YAML file: {path}: {e}") from e
 
+        # Drop the stale entry so the next get() re-parses; push to live subscribers now
+        with ConfigLoader._lock:
+            ConfigLoader._cache.pop(path, None)
+            subscribed = bool(ConfigLoader._subscribers.get(path))
+        if subscribed:
+            self.reload(filename)
+
         return path
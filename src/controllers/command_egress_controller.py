@@ -1,26 +1,48 @@
-import json
 import asyncio
+from functools import partial
 from typing import Optional
 
-from core.utils import Logger
+from core.utils import Logger, get_codec, get_latency_tracker, get_subject_stats, mark_decoded
 from factory import MessageFactory, SubjectFactory
 from core.comms import NatsPublisher
+from .pending_commands import PendingCommand, PendingCommands
 
 class CommandEgressController:
     """
     Ground-side Command Relay controller.
     
-    Purpose:
+    Purpose: sends FC link and mission commands to one UAV and pairs each
+    response with the command that caused it.
+
+    Every command is published with a reply subject
+    <inbox>.<command>.<uav_id>.<request_id>; UAVs that answer on msg.reply
+    are matched by request id, legacy air units that publish on
+    uav.<id>.<command>.response are matched FIFO per (uav, command).
+    Response callbacks get (uav_id, body, request), where request is the
+    PendingCommand (requester, rtt) or None for an unsolicited response.
+    Commands that time out, or that nobody is subscribed to (NATS "no
+    responders"), go to on_command_failed(request) with request.error set.
     """
 
-    def __init__(self, nats_client, ground_id: str, on_conn_response=None, on_disconn_response=None, on_mission_upload_response=None):
+    def __init__(self, nats_client, ground_id: str, on_conn_response=None, on_disconn_response=None, on_mission_upload_response=None, recorder=None, on_command_failed=None, timeouts=None):
         self.client = nats_client
         self.publisher = NatsPublisher(nats_client)
         self.ground_id = ground_id
         self.logger = Logger.get("CommandEgress")
-        self._on_fcconnect_response = on_conn_response
-        self._on_fcdisconnect_response = on_disconn_response
-        self._on_mission_upload_response = on_mission_upload_response
+        self.codec = get_codec()
+        self.latency = get_latency_tracker()
+        self.subjects = SubjectFactory()
+        self._on_command_failed = on_command_failed
+        self._response_handlers = {
+            "fcconnect": on_conn_response,
+            "fcdisconnect": on_disconn_response,
+            "mission_upload": on_mission_upload_response,
+        }
+        self.recorder = recorder
+        self.pending = PendingCommands(self._on_failed, timeouts)
+        self._inbox: Optional[str] = None
+        self._reply_traffic = None
+        self._response_traffic = {}     # command -> SubjectCounter of uav.*.<command>.response
 
     # ------------------------------
     # Public API
@@ -29,10 +51,15 @@ class CommandEgressController:
         """Initialize any required subscriptions or state."""
         self.logger.info("Activating FCLinkController...")
         # Add subscription setups if needed
+        await self._subscribe_to_replies()
         await self._subscribe_to_fc_responses()
         await self._subscribe_to_mission_upload_response()
 
-    async def send_connect_request(self, uav_id: str):
+    async def deactivate(self):
+        """Drop pending commands and their timers; no timeouts fire afterwards."""
+        self.pending.cancel_all()
+
+    async def send_connect_request(self, uav_id: str, requester=None) -> PendingCommand:
         """Send a 'wannaconnect' trigger to a specific UAV."""
         subject = self._build_fcconnect_pub_subject(uav_id)
         # You can use a raw string like your test or a Factory message
@@ -43,10 +70,11 @@ class CommandEgressController:
         # )
         payload = "wannaconnect"  # Simple string as per your test case
         # await self.publisher.publish(subject, payload)
-        await self.client.nc.publish(subject, payload.encode())
-        self.logger.info(f"🚀 Sent FC Connect request to [{uav_id}] on {subject}")
+        request = await self._send("fcconnect", uav_id, subject, payload.encode(), requester)
+        self.logger.info(f"🚀 Sent FC Connect request #{request.id} to [{uav_id}] on {subject}")
+        return request
 
-    async def send_disconnect_request(self, uav_id: str):
+    async def send_disconnect_request(self, uav_id: str, requester=None) -> PendingCommand:
         """Send a 'wannadisconnect' trigger to a specific UAV."""
         subject = self._build_fcdisconnect_pub_subject(uav_id)
         # payload = MessageFactory.create(
@@ -57,10 +85,11 @@ class CommandEgressController:
         payload = "wannadisconnect"  # Simple string as per your test case      
         
         # await self.publisher.publish(subject, payload)
-        await self.client.nc.publish(subject, payload.encode())
-        self.logger.info(f"⏹️ Sent FC Disconnect request to [{uav_id}] on {subject}")
+        request = await self._send("fcdisconnect", uav_id, subject, payload.encode(), requester)
+        self.logger.info(f"⏹️ Sent FC Disconnect request #{request.id} to [{uav_id}] on {subject}")
+        return request
 
-    async def send_mission(self, uav_id: str, mission):
+    async def send_mission(self, uav_id: str, mission, requester=None) -> PendingCommand:
         """Send mission to a specific UAV."""
         subject = self._build_mission_upload_pub_subject(uav_id)
         # payload = MessageFactory.create(
@@ -69,39 +98,58 @@ class CommandEgressController:
         #     sender=self.ground_id,
         #     body={"mission": mission}
         # )
-        payload = json.dumps(mission)
-        await self.client.nc.publish(subject, payload.encode())
-        self.logger.info(f"📍 Sent {len(mission)} mission items to [{uav_id}] on {subject}")    
+        payload = self.codec.dumps(mission)
+        request = await self._send("mission_upload", uav_id, subject, payload, requester)
+        self.logger.info(f"📍 Sent {len(mission)} mission items to [{uav_id}] on {subject} (#{request.id})")    
+        return request
+
+    async def _send(self, command: str, uav_id: str, subject: str, data: bytes, requester) -> PendingCommand:
+        """Publish with a reply subject carrying the request id, and start its timeout."""
+        request = self.pending.add(uav_id, command, requester)
+        try:
+            await self.client.nc.publish(subject, data, reply=f"{self._inbox}.{command}.{uav_id}.{request.id}")
+        except Exception:
+            self.pending.discard(request.id)
+            raise
+        return request
+
+    def _on_failed(self, request: PendingCommand):
+        self.logger.warning(f"⌛ {request.command} #{request.id} to [{request.uav_id}] failed: {request.error}")
+        if self._on_command_failed:
+            self._on_command_failed(request)
 
     # ------------------------------
     # Subscription Handelers
     # ------------------------------
 
+    async def _subscribe_to_replies(self):
+        """One wildcard subscription for every correlated reply to this ground unit."""
+        self._inbox = self.client.nc.new_inbox()
+        # labelled by shape: the inbox is random per process and would start a new series on every restart
+        self._reply_traffic = get_subject_stats().counter("<inbox>.>")
+        self._reply_traffic.subscriptions.append(
+            await self.client.nc.subscribe(f"{self._inbox}.>", cb=self._reply_cb)
+        )
+
     async def _subscribe_to_fc_responses(self):
         """Subscribe to UAV FCLink connect/disconnect responses."""
         # Subscribe to connect responses
-        subject = self._build_fcconnect_sub_subject()
-        await self.client.nc.subscribe(
-            subject,
-            cb=self._fcconnect_response_cb
-        )
+        await self._subscribe_legacy("fcconnect", self._build_fcconnect_sub_subject())
         # Subscribe to disconnect responses
-        subject = self._build_fcdisconnect_sub_subject()
-        await self.client.nc.subscribe(
-            subject,
-            cb=self._fcdisconnect_response_cb
-        )
+        await self._subscribe_legacy("fcdisconnect", self._build_fcdisconnect_sub_subject())
         self.logger.info(f"Subscribed to fc responses")
 
     async def _subscribe_to_mission_upload_response(self):
         """Subscribe to UAV response for mission upload."""
-        subject =  self._build_mission_upload_sub_subject()
-        await self.client.nc.subscribe(
-            subject,
-            cb=self._mission_upload_response_cb
-        )
+        await self._subscribe_legacy("mission_upload", self._build_mission_upload_sub_subject())
         self.logger.info(f"Subscribed to waypoint upload response")    
 
+    async def _subscribe_legacy(self, command: str, subject: str):
+        counter = self._response_traffic[command] = get_subject_stats().counter(subject)
+        counter.subscriptions.append(
+            await self.client.nc.subscribe(subject, cb=partial(self._legacy_response_cb, command))
+        )
+
     # ------------------------------
     # Subject Builders
     # ------------------------------
@@ -111,7 +159,7 @@ class CommandEgressController:
         Builds: ground.<ground_id>.fcconnect.<request/response>
         With remote_client_id directed at the specific UAV.
         """
-        return SubjectFactory().create(
+        return self.subjects.create(
             source="ground",
             source_id=self.ground_id,
             topic="fcconnect",
@@ -125,7 +173,7 @@ class CommandEgressController:
         Builds: ground.<ground_id>.fcdisconnect.<request/response>
         With remote_client_id directed at the specific UAV.
         """
-        return SubjectFactory().create(
+        return self.subjects.create(
             source="ground",
             source_id=self.ground_id,
             topic="fcdisconnect",
@@ -139,7 +187,7 @@ class CommandEgressController:
         Builds: ground.<ground_id>.mission_upload.request
         For publishing waypoint upload requests to a specific UAV.
         """
-        return SubjectFactory().create(
+        return self.subjects.create(
             source="ground",
             source_id=self.ground_id,
             topic="mission_upload",
@@ -154,7 +202,7 @@ class CommandEgressController:
         Builds: uav.*.fcconnect.response
         For subscribing to connect requests from any UAV.
         """
-        return SubjectFactory().create(
+        return self.subjects.create(
             source="uav",
             source_id="*",
             topic="fcconnect",
@@ -167,7 +215,7 @@ class CommandEgressController:
         Builds: uav.*.fcdisconnect.response
         For subscribing to disconnect requests from any UAV.
         """
-        return SubjectFactory().create(
+        return self.subjects.create(
             source="uav",
             source_id="*",
             topic="fcdisconnect",
@@ -180,7 +228,7 @@ class CommandEgressController:
         Builds: uav.*.mission_upload.response
         For subscribing to waypoint upload responses from any UAV.
         """
-        return SubjectFactory().create(
+        return self.subjects.create(
             source="uav",
             source_id="*",
             topic="mission_upload",
@@ -192,69 +240,66 @@ class CommandEgressController:
     # Callbacks
     # ------------------------------
 
-    async def _fcconnect_response_cb(self, msg):
+    async def _reply_cb(self, msg):
         """
-        Callback for uav.*.fcconnect.response
-        Extracts data from NATS Msg and forwards to WebSocket.
+        Callback for <inbox>.<command>.<uav_id>.<request_id>
+        A reply that arrives after its timeout is still forwarded, as unsolicited.
         """
+        self._reply_traffic.count(msg)
         try:
-            # 1. Extract and Decode the NATS data
-            # msg is a nats.aio.msg.Msg object
-            raw_payload = msg.data.decode()
-            data = json.loads(raw_payload)
-            
-            # 2. Extract the 'body' specifically (the part with {connected: True})
-            body = data.get("body", {})
-            
-            # 3. Format the WebSocket message
-            # ws_msg = {
-            #     "type": "fc_connection_res",
-            #     "payload": body
-            # }
-            
-            # 4. Forward to the GCS (assuming self.ws_manager or similar)
-            await self._on_fcconnect_response(body)
-            self.logger.info(f"✅ Forwarded FC Connect response to GCS: {body}")
+            command, rest = msg.subject[len(self._inbox) + 1:].split(".", 1)
+            uav_id, request_id = rest.rsplit(".", 1)
+        except ValueError:
+            command = None
+        if command not in self._response_handlers:
+            # Not a reply subject we built; raising here would only reach the nats error callback
+            self.pending.counts["unmatched"] += 1
+            self.logger.warning(f"Ignoring reply on unexpected subject {msg.subject}")
+            return
+        if msg.headers and msg.headers.get("Status") == "503":
+            # Sent by nats-server, not the UAV: nothing is subscribed to the command subject
+            self.pending.reject(request_id, f"{uav_id} is not listening for {command} (no responders)")
+            return
+        await self._handle_response(command, uav_id, msg, self.pending.resolve(request_id))
 
-        except Exception as e:
-            self.logger.error(f"Error handling fcconnect callback: {e}")
-
-    async def _fcdisconnect_response_cb(self, msg):
+    async def _legacy_response_cb(self, command: str, msg):
         """
-        Callback for uav.*.fcdisconnect.response
+        Callback for uav.*.<command>.response (air units that ignore msg.reply)
         """
-        try:
-            raw_payload = msg.data.decode()
-            data = json.loads(raw_payload)
-            body = data.get("body", {})
-            
-            # ws_msg = {
-            #     "type": "fc_disconnection_res",
-            #     "payload": body
-            # }
-
-            await self._on_fcdisconnect_response(body)
-            self.logger.info(f"✅ Forwarded FC Disconnect response to GCS: {body}")
-
-        except Exception as e:
-            self.logger.error(f"Error handling fcdisconnect callback: {e}")
+        self._response_traffic[command].count(msg)
+        # uav.<uav_id>.<command>.response
+        uav_id = msg.subject.split(".", 2)[1]
+        await self._handle_response(command, uav_id, msg, self.pending.resolve_oldest(uav_id, command))
 
-    async def _mission_upload_response_cb(self, msg):
+    async def _handle_response(self, command: str, uav_id: str, msg, request: Optional[PendingCommand]):
         """
-        Callback for uav.*.mission_upload.response
+        Extracts data from NATS Msg and forwards to WebSocket.
         """
+        if self.recorder:
+            self.recorder.record(msg.subject, msg.data)
+        trace_token = self.latency.begin(command)
         try:
-            raw_payload = msg.data.decode()
-            data = json.loads(raw_payload)
+            # 1. Decode the NATS data
+            # msg is a nats.aio.msg.Msg object
+            data = self.codec.loads(msg.data)
+            
+            # 2. Extract the 'body' specifically (e.g. the part with {connected: True})
             body = data.get("body", {})
+            mark_decoded()
+            if request is not None and self.latency.enabled:
+                self.latency.record(command, "rtt", request.rtt_ns)
             
-            # Here you would forward this to the GCS as needed, e.g.:
-            # ws_msg = {
-            #     "type": "mission_upload_res",
-            #     "payload": body
-            # }
-            await self._on_mission_upload_response(body)
-            self.logger.info(f"✅ Received Mission Upload response: {body}")
+            # 3. Forward to the GCS with the responding UAV's id and the matched command, if any
+            await self._response_handlers[command](uav_id, body, request)
+            if request is not None:
+                self.logger.info(
+                    f"✅ {command} response from [{uav_id}] for #{request.id} in {request.rtt_ms}ms"
+                    f"{'' if request.correlated else ' (uncorrelated, FIFO match)'}: {body}"
+                )
+            else:
+                self.logger.info(f"✅ Unsolicited {command} response from [{uav_id}]: {body}")
 
         except Exception as e:
-            self.logger.error(f"Error handling Mission upload response callback: {e}")        
\ No newline at end of file
+            self.logger.error(f"Error handling {command} response: {e}")
+        finally:
+            self.latency.end(trace_token)
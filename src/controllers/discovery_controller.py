@@ -1,8 +1,8 @@
-import json
 import asyncio
-from typing import Optional
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
-from core.utils import Logger
+from core.utils import Logger, get_codec, get_subject_stats
 from factory import MessageFactory, SubjectFactory
 from core.comms import NatsPublisher
 
@@ -14,25 +14,74 @@ class DiscoveryController:
     Purpose:
     - Listen for UAV discovery requests
     - Respond with ground station presence & capabilities
+
+    The subscription is long-lived. Every UAV that asked is kept in a TTL
+    cache: on_uav_discovered(uav_data) fires only for a new, changed or
+    expired UAV, on_uav_seen(uav_id) for repeats. Responses are rate
+    limited per UAV to one every min_response_interval seconds.
+
+    The response body is encoded once and kept as bytes; only uptime_seconds
+    and status are refreshed, at most every refresh_interval seconds. Each
+    response then costs a header splice plus one publish.
     """
 
-    def __init__(self, nats_client, ground_id: str, on_uav_discovered=None):
+    # Body fields a UAV updates on every request; ignored when detecting changes
+    VOLATILE_FIELDS = frozenset({"uptime_seconds"})
+
+    def __init__(
+        self,
+        nats_client,
+        ground_id: str,
+        on_uav_discovered=None,
+        on_uav_seen=None,
+        ttl: float = 30.0,
+        min_response_interval: float = 1.0,
+        refresh_interval: float = 1.0,
+        recorder=None,
+    ):
         self.client = nats_client
         self.publisher = NatsPublisher(nats_client)
         self.ground_id = ground_id
         self.remote_client_id = None
 
         self._on_uav_discovered = on_uav_discovered
+        self._on_uav_seen = on_uav_seen
+        self.ttl = ttl
+        self.min_response_interval = min_response_interval
+        self.recorder = recorder
+
+        # uav_id -> (uav_data, fingerprint, expires_at)
+        self._known: Dict[str, Tuple[Dict[str, Any], Dict[str, Any], float]] = {}
+        # uav_id -> monotonic time of the last response sent
+        self._last_response: Dict[str, float] = {}
+        self._next_prune = 0.0
+
+        # Pre-encoded response body, rebuilt when volatile fields go stale
+        self.refresh_interval = refresh_interval
+        self.status: Optional[str] = None
+        self._started = time.monotonic()
+        self._template = None
+        self._body_bytes: Optional[bytes] = None
+        self._body_expires = 0.0
+
+        self.requests = 0
+        self.responses = 0
+        self.suppressed = 0
 
         self._sub = None
+        self.subjects = SubjectFactory()
+        self._traffic = get_subject_stats().counter(self._build_subscribing_subject())
         self.logger = Logger.get("Discovery")
+        self.codec = get_codec()
 
     # ------------------------------
     # Public API (called by service)
     # ------------------------------
 
     async def activate(self):
-        """Initialize subscriptions."""
+        """Initialize subscriptions. Safe to call again while already active."""
+        if self._sub:
+            return
         self.logger.info("Activating DiscoveryController...")
         await self._subscribe_to_requests()
 
@@ -43,6 +92,27 @@ class DiscoveryController:
                 await self.client.nc.unsubscribe(self._sub.sid)
             except Exception:
                 pass
+            if self._sub in self._traffic.subscriptions:
+                self._traffic.subscriptions.remove(self._sub)
+            self._sub = None
+
+    def known_uavs(self) -> List[Dict[str, Any]]:
+        """Discovery bodies of every UAV seen within the TTL."""
+        self._prune(time.monotonic())
+        return [uav_data for uav_data, _, _ in self._known.values()]
+
+    def set_status(self, status: str):
+        """Change the advertised ground status; the next response carries it."""
+        self.status = status
+        self._body_expires = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "known": len(self._known),
+            "requests": self.requests,
+            "responses": self.responses,
+            "suppressed": self.suppressed,
+        }
 
     # ------------------------------
     # Internal subscription setup
@@ -56,6 +126,7 @@ class DiscoveryController:
                 subject,
                 cb=self._on_discovery_request
             )
+            self._traffic.subscriptions.append(self._sub)
 
             self.logger.info(f"Subscribed to discovery requests: {subject}")
 
@@ -71,34 +142,46 @@ class DiscoveryController:
      """
      Handle incoming discovery request and respond.
      """
+     self._traffic.count(msg)
+     if self.recorder:
+        self.recorder.record(msg.subject, msg.data)
      try:
         # 1. Decode and parse the incoming message
-        data_decoded = msg.data.decode()
-        envelope = json.loads(data_decoded)
+        envelope = self.codec.loads(msg.data)
         
         # ---- STRICT SOURCE OF TRUTH ----
         # Extract the body which contains the UAV details
         uav_data = envelope.get("body", {})
-        self.remote_client_id = uav_data.get("client_id")
+        uav_id = uav_data.get("client_id")
+        if not uav_id:
+            self.logger.warning("Discovery request without client_id ignored")
+            return
+        self.remote_client_id = uav_id
+        self.requests += 1
+        now = time.monotonic()
 
-        self.logger.info(
-            f"Discovery request received from UAV [{self.remote_client_id}]"
-        )
+        # 2. TRIGGER CALLBACK: full notification only for new/changed/expired UAVs
+        if self._remember(uav_id, uav_data, now):
+            self.logger.info(f"Discovery request received from UAV [{uav_id}]")
+            if self._on_uav_discovered:
+                # We pass the uav_data (the dict) as expected by the method signature
+                self._on_uav_discovered(uav_data)
+        elif self._on_uav_seen:
+            self._on_uav_seen(uav_id)
 
-        # # 2. TRIGGER CALLBACK: Notify the external module that a UAV was found
-        if self._on_uav_discovered:
-            # We pass the uav_data (the dict) as expected by the method signature
-            self._on_uav_discovered(uav_data)
+        # 3. Respond back to the UAV, at most once per min_response_interval
+        if now - self._last_response.get(uav_id, float("-inf")) < self.min_response_interval:
+            self.suppressed += 1
+            return
+        self._last_response[uav_id] = now
 
-        # 3. Respond back to the UAV
-        subject = self._build_publishing_subject()
-        response = self._build_response_message()
+        subject = self._build_publishing_subject(uav_id)
+        response = self._build_response_message(now)
 
         await self.publisher.publish(subject, response)
+        self.responses += 1
 
-        self.logger.info(
-            f"Discovery response sent to UAV [{self.remote_client_id}]"
-        )
+        self.logger.debug(f"Discovery response sent to UAV [{uav_id}]")
 
         # testing fclink connect message
         # await asyncio.sleep(5)  # slight delay to ensure response is sent first
@@ -120,22 +203,45 @@ class DiscoveryController:
      except Exception as e:
         self.logger.error(f"Discovery request handling error: {e}")    
     
+    # ------------------------------
+    # Known-UAV cache
+    # ------------------------------
+
+    def _remember(self, uav_id: str, uav_data: Dict[str, Any], now: float) -> bool:
+        """Cache uav_data for ttl seconds. True if the UAV is new, changed or had expired."""
+        fingerprint = {k: v for k, v in uav_data.items() if k not in self.VOLATILE_FIELDS}
+        entry = self._known.get(uav_id)
+        fresh = entry is None or entry[2] < now or entry[1] != fingerprint
+
+        if now >= self._next_prune:
+            self._prune(now)
+        self._known[uav_id] = (uav_data, fingerprint, now + self.ttl)
+        return fresh
+
+    def _prune(self, now: float):
+        self._next_prune = now + self.ttl
+        expired = [uav_id for uav_id, entry in self._known.items() if entry[2] < now]
+        for uav_id in expired:
+            del self._known[uav_id]
+            self._last_response.pop(uav_id, None)
+
     # ------------------------------
     # Builders
     # ------------------------------
 
-    def _build_publishing_subject(self):
-        return SubjectFactory().create(
+    def _build_publishing_subject(self, uav_id: Optional[str] = None):
+        # Rendered subjects are cached per UAV by the SubjectRegistry
+        return self.subjects.create(
             source="ground",
             source_id=self.ground_id,
             topic="discovery",
             subtopic="response",
             mode="pub",
-            remote_client_id=self.remote_client_id
+            remote_client_id=uav_id or self.remote_client_id
         )
     
     def _build_subscribing_subject(self):
-        return SubjectFactory().create(
+        return self.subjects.create(
             source="uav",
             source_id="*",
             topic="discovery",
@@ -143,13 +249,24 @@ class DiscoveryController:
             mode="sub"
         )
 
-    def _build_response_message(self):
-        return MessageFactory.create(
-            msg_type="discovery"
-        )
+    def _build_response_message(self, now: Optional[float] = None):
+        template = MessageFactory.template("discovery")
+        return template.render(self._response_body(template, now or time.monotonic()))
+
+    def _response_body(self, template, now: float) -> bytes:
+        """Cached body bytes with live uptime/status; re-encoded only when stale or message.yaml changed."""
+        if template is not self._template or now >= self._body_expires:
+            body = dict(template.body)
+            body["uptime_seconds"] = int(now - self._started)
+            if self.status is not None:
+                body["status"] = self.status
+            self._body_bytes = self.codec.dumps(body)
+            self._template = template
+            self._body_expires = now + self.refresh_interval
+        return self._body_bytes
     
     # def build_connection_subject(self):
-    #     return SubjectFactory().create(
+    #     return self.subjects.create(
     #         source="ground",
     #         source_id=self.ground_id,
     #         topic="fclink",
@@ -159,7 +276,7 @@ class DiscoveryController:
     #     )
     
     # def build_disconnection_subject(self):
-    #     return SubjectFactory().create(
+    #     return self.subjects.create(
     #         source="ground",
     #         source_id=self.ground_id,
     #         topic="fclink",
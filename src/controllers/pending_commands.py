@@ -0,0 +1,147 @@
+"""
+pending_commands.py
+-------------------
+Table of commands sent to UAVs that are still waiting for a response.
+
+Each command gets a request id that travels in its NATS reply subject, so
+a UAV that answers on msg.reply is matched exactly. Air units that still
+publish on the shared uav.<id>.<command>.response subject are matched to
+the oldest pending command for that (uav, command) instead: commands to
+one UAV are handled in order, so FIFO pairs them correctly.
+
+Every entry has a timeout; it lives on the event loop (call_later), and
+all methods must be called from that loop. A command can also fail early
+via reject(), e.g. when NATS reports no responders for its subject.
+"""
+
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+
+class PendingCommand:
+    __slots__ = ("id", "uav_id", "command", "requester", "sent_ns", "timeout", "rtt_ns", "correlated", "error", "_timer")
+
+    def __init__(self, id: str, uav_id: str, command: str, requester: Any, timeout: float):
+        self.id = id
+        self.uav_id = uav_id
+        self.command = command
+        self.requester = requester      # opaque to the controller (the WS sid)
+        self.sent_ns = time.perf_counter_ns()
+        self.timeout = timeout
+        self.rtt_ns = 0
+        self.correlated = False         # True if matched by reply subject, False if by FIFO
+        self.error: Optional[str] = None  # set when the command failed (timeout, no responders)
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def rtt_ms(self) -> float:
+        return round(self.rtt_ns / 1e6, 3)
+
+
+class PendingCommands:
+    """
+    Args:
+        on_failed: called with the PendingCommand (error set) when it times out or is rejected.
+        timeouts: seconds per command name; "default" covers the rest.
+    """
+
+    def __init__(self, on_failed: Callable[[PendingCommand], None], timeouts: Optional[Dict[str, float]] = None):
+        self.on_failed = on_failed
+        self.timeouts = {"default": 5.0, **(timeouts or {})}
+        self._pending: Dict[str, PendingCommand] = {}
+        self._fifo: Dict[Tuple[str, str], Deque[str]] = {}
+        self._ids = itertools.count(1)
+
+        self.counts = {"sent": 0, "correlated": 0, "fifo": 0, "unmatched": 0, "timeout": 0, "no_responders": 0}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, uav_id: str, command: str, requester: Any = None) -> PendingCommand:
+        timeout = self.timeouts.get(command, self.timeouts["default"])
+        pending = PendingCommand(str(next(self._ids)), uav_id, command, requester, timeout)
+        pending._timer = asyncio.get_running_loop().call_later(timeout, self._expire, pending.id)
+        self._pending[pending.id] = pending
+        self._fifo.setdefault((uav_id, command), deque()).append(pending.id)
+        self.counts["sent"] += 1
+        return pending
+
+    def discard(self, request_id: str):
+        """Forget a command that was never actually sent (e.g. publish failed)."""
+        pending = self._pending.pop(request_id, None)
+        if pending:
+            pending._timer.cancel()
+            self._drop_from_fifo(pending)
+            self.counts["sent"] -= 1
+
+    def resolve(self, request_id: str) -> Optional[PendingCommand]:
+        """Match a response that carried its request id."""
+        pending = self._finish(request_id)
+        if pending:
+            pending.correlated = True
+            self.counts["correlated"] += 1
+        else:
+            self.counts["unmatched"] += 1
+        return pending
+
+    def resolve_oldest(self, uav_id: str, command: str) -> Optional[PendingCommand]:
+        """Match an uncorrelated (legacy) response to the oldest pending (uav, command)."""
+        queue = self._fifo.get((uav_id, command))
+        pending = self._finish(queue[0]) if queue else None
+        if pending:
+            self.counts["fifo"] += 1
+            return pending
+        self.counts["unmatched"] += 1
+        return None
+
+    def _finish(self, request_id: str) -> Optional[PendingCommand]:
+        pending = self._pending.pop(request_id, None)
+        if pending is None:
+            return None
+        pending.rtt_ns = time.perf_counter_ns() - pending.sent_ns
+        pending._timer.cancel()
+        self._drop_from_fifo(pending)
+        return pending
+
+    def _drop_from_fifo(self, pending: PendingCommand):
+        """Remove the id wherever it sits; commands can finish out of order."""
+        key = (pending.uav_id, pending.command)
+        queue = self._fifo.get(key)
+        if queue is None:
+            return
+        try:
+            queue.remove(pending.id)
+        except ValueError:
+            pass
+        if not queue:
+            del self._fifo[key]
+
+    def reject(self, request_id: str, error: str, reason: str = "no_responders"):
+        """Fail a command before its timeout; reason is the counter it is counted under."""
+        pending = self._finish(request_id)
+        if pending is None:
+            return
+        pending.error = error
+        self.counts[reason] += 1
+        self.on_failed(pending)
+
+    def _expire(self, request_id: str):
+        pending = self._pending.pop(request_id, None)
+        if pending is None:
+            return
+        self._drop_from_fifo(pending)
+        pending.error = f"No response within {pending.timeout}s"
+        self.counts["timeout"] += 1
+        self.on_failed(pending)
+
+    def cancel_all(self):
+        for pending in self._pending.values():
+            pending._timer.cancel()
+        self._pending.clear()
+        self._fifo.clear()
+
+    def stats(self) -> dict:
+        return {"pending": len(self._pending), **self.counts}
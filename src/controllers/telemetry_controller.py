@@ -2,7 +2,7 @@ import json
 import asyncio
 from typing import Optional
 
-from core.utils import Logger
+from core.utils import Logger, get_codec, get_latency_tracker, get_subject_stats, mark_decoded, slice_envelope_body
 from factory import MessageFactory, SubjectFactory
 # from core.comms import NatsPublisher
 
@@ -10,23 +10,40 @@ from factory import MessageFactory, SubjectFactory
 class TelemetryController:
     """
     Handles incoming NATS telemetry from the Air Unit using a 
-    standardized subject pattern and forwards body data to GCS.
+    standardized subject pattern and forwards body data to GCS
+    via on_telemetry_update(uav_id, body).
+
+    In passthrough mode the body is sliced out of the raw NATS bytes and
+    handed to on_telemetry_raw(uav_id, body_bytes) without being parsed;
+    messages that don't match the envelope layout fall back to the
+    parsed path.
+
+    If a TelemetryStore is given, every body is also appended to its
+    per-UAV history, and with a FlightRecorder every raw message is recorded.
     """
-    def __init__(self, nats_client, client_id, on_telemetry_update):
+    def __init__(self, nats_client, client_id, on_telemetry_update, on_telemetry_raw=None, passthrough: bool = False, store=None, recorder=None):
         self.logger = Logger.get("Telemetry")
+        self.codec = get_codec()
+        self.latency = get_latency_tracker()
         
         self.client = nats_client
         self.client_id = client_id
         self.on_telemetry_update = on_telemetry_update
+        self.on_telemetry_raw = on_telemetry_raw
+        self.passthrough = passthrough and on_telemetry_raw is not None
+        self.store = store
+        self.recorder = recorder
         
         self.subscription = None
+        self.subjects = SubjectFactory()
+        self._traffic = get_subject_stats().counter(self._build_subscribing_subject())
 
     def _build_subscribing_subject(self):
         """
         Builds the NATS subject string using the SubjectFactory.
         Uses wildcard '*' for source_id to capture telemetry updates.
         """
-        return SubjectFactory().create(
+        return self.subjects.create(
             source="uav",
             source_id="*",
             topic="telemetry",
@@ -46,6 +63,7 @@ class TelemetryController:
                 subject, 
                 cb=self._handle_incoming_telemetry
             )
+            self._traffic.subscriptions.append(self.subscription)
             
             self.logger.info(f"📡 Ground Telemetry active. Listening on: {subject}")
 
@@ -56,13 +74,31 @@ class TelemetryController:
         """
         Decodes NATS message, extracts 'body', and forwards to GCS callback.
         """
+        self._traffic.count(msg)
+        if self.recorder:
+            self.recorder.record(msg.subject, msg.data)
+        trace_token = self.latency.begin("telemetry")
         try:
-            # 1. Decode and Load JSON
-            raw_payload = msg.data.decode()
-            data = json.loads(raw_payload)
+            # uav.<uav_id>.telemetry.update
+            uav_id = msg.subject.split(".", 2)[1]
+
+            if self.passthrough:
+                body_raw = slice_envelope_body(msg.data)
+                if body_raw is not None:
+                    mark_decoded()
+                    await self.on_telemetry_raw(uav_id, body_raw)
+                    if self.store is not None:
+                        self.store.append_raw(uav_id, body_raw)
+                    return
+
+            # 1. Decode JSON straight from bytes
+            data = self.codec.loads(msg.data)
             
             # 2. Extract the 'body' specifically
             body = data.get("body", {})
+            mark_decoded()
+            if self.store is not None:
+                self.store.append(uav_id, body)
             
             # # 3. Format the WebSocket message
             # ws_msg = {
@@ -71,7 +107,7 @@ class TelemetryController:
             # }
             
             # 4. Forward to the GCS via the constructor-provided callback
-            await self.on_telemetry_update(body)
+            await self.on_telemetry_update(uav_id, body)
             
             # Optional: Log success for debugging (high frequency)
             # self.logger.debug(f"Forwarded telem body for {data.get('header', {}).get('source', 'unknown')}")
@@ -80,6 +116,8 @@ class TelemetryController:
             self.logger.error("Failed to decode telemetry JSON: invalid format")
         except Exception as e:
             self.logger.error(f"Error in Ground Telemetry handler: {e}")
+        finally:
+            self.latency.end(trace_token)
 
     async def deactivate(self):
         """
@@ -88,6 +126,8 @@ class TelemetryController:
         if self.subscription:
             try:
                 await self.subscription.unsubscribe()
+                if self.subscription in self._traffic.subscriptions:
+                    self._traffic.subscriptions.remove(self.subscription)
                 self.logger.info("Ground Telemetry unsubscribed.")
             except Exception as e:
                 self.logger.warning(f"Error during telemetry unsubscription: {e}")
\ No newline at end of file
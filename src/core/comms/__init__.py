@@ -1,5 +1,6 @@
 from .nats import NatsClient, NatsNode, NatsPublisher, NatsSubscriber 
 from .wnp import IPCServer
 from .ws import WebSocketServer
+from .http import MetricsServer
 
-__all__ = ["NatsClient", "NatsNode", "NatsPublisher", "NatsSubscriber", "IPCServer", "WebSocketServer"]
\ No newline at end of file
+__all__ = ["NatsClient", "NatsNode", "NatsPublisher", "NatsSubscriber", "IPCServer", "WebSocketServer", "MetricsServer"]
\ No newline at end of file
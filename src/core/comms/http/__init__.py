@@ -0,0 +1,3 @@
+from .metrics_server import MetricsServer
+
+__all__ = ["MetricsServer"]
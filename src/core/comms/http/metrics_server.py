@@ -0,0 +1,73 @@
+"""
+metrics_server.py
+-----------------
+Minimal HTTP/1.1 endpoint for Prometheus scrapes, served with
+asyncio.start_server on the caller's loop (no web framework).
+
+GET /metrics returns render() as text/plain; version=0.0.4. Every
+response closes the connection; scrapes are infrequent and tiny.
+"""
+
+import asyncio
+from typing import Callable, Optional
+
+from core.utils import Logger
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricsServer:
+    def __init__(self, render: Callable[[], str], host: str = "127.0.0.1", port: int = 9108,
+                 path: str = "/metrics", read_timeout: float = 5.0):
+        self.logger = Logger.get("Metrics")
+        self.render = render
+        self.host = host
+        self.port = port
+        self.path = path
+        self.read_timeout = read_timeout
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        if self.server:
+            return
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.logger.info(f"📈 Metrics at http://{self.host}:{self.port}{self.path}")
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.read_timeout)
+            method, target = request.split(b" ", 2)[:2]
+            path = target.decode("latin-1").split("?", 1)[0]
+
+            if method not in (b"GET", b"HEAD"):
+                self._respond(writer, "405 Method Not Allowed", b"method not allowed\n")
+            elif path != self.path:
+                self._respond(writer, "404 Not Found", b"not found\n")
+            else:
+                body = self.render().encode()
+                self._respond(writer, "200 OK", body, head=method == b"HEAD")
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        except ConnectionError:
+            pass
+        except Exception as e:
+            self.logger.error(f"Metrics scrape failed: {e}")
+            self._respond(writer, "500 Internal Server Error", b"error\n")
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _respond(writer: asyncio.StreamWriter, status: str, body: bytes, head: bool = False):
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+        )
+        if not head:
+            writer.write(body)
@@ -1,12 +1,13 @@
-import json
 from typing import Any
+from core.utils import get_codec
 from .qos_manager import QoSLevel
 
 
 class NatsPublisher:
     """
     Publishes structured messages to NATS or JetStream based on QoS header.
-    Expects payloads generated by MessageFactory (dict with header + body).
+    Expects payloads generated by MessageFactory: either a dict with
+    header + body, or a pre-serialized EncodedMessage (sent as-is).
     """
 
     def __init__(self, client):
@@ -15,22 +16,32 @@ class NatsPublisher:
                        Must expose publish() and js_publish() if JetStream is used.
         """
         self.client = client
+        self.codec = get_codec()
 
-    async def publish(self, subject: str, msg: dict):
+    async def publish(self, subject: str, msg):
         """
         Publish message using QoS level in header.
         :param subject: NATS subject to publish on.
-        :param msg: Message dict as returned by MessageFactory.
+        :param msg: Message dict as returned by MessageFactory.create(),
+                    or EncodedMessage from MessageFactory.encode().
         """
-        # Validate payload structure
-        if not isinstance(msg, dict) or "header" not in msg or "body" not in msg:
-            raise TypeError("Invalid message: must contain 'header' and 'body' fields.")
+        if isinstance(msg, dict):
+            # Validate payload structure
+            if "header" not in msg or "body" not in msg:
+                raise TypeError("Invalid message: must contain 'header' and 'body' fields.")
 
-        header = msg["header"]
-        qos = header.get("qos", QoSLevel.AT_MOST_ONCE)
-        msg_id = header.get("msg_id")
-        stream = header.get("stream")  # Optional, for JetStream
-        data = json.dumps(msg).encode("utf-8")
+            header = msg["header"]
+            qos = header.get("qos", QoSLevel.AT_MOST_ONCE)
+            msg_id = header.get("msg_id")
+            stream = header.get("stream")  # Optional, for JetStream
+            data = self.codec.dumps(msg)
+
+        elif hasattr(msg, "data") and hasattr(msg, "qos"):
+            # Pre-serialized: header fields ride alongside the bytes
+            data, msg_id, qos, stream = msg.data, msg.msg_id, msg.qos, msg.stream
+
+        else:
+            raise TypeError("Invalid message: expected dict or EncodedMessage.")
 
         # QoS-level routing
         if qos == QoSLevel.AT_MOST_ONCE:
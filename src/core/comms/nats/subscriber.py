@@ -1,6 +1,6 @@
 # subscriber.py
-import json
 from typing import Callable, Any, Dict
+from core.utils import get_codec
 from .qos_manager import QoSLevel
 
 class NatsSubscriber:
@@ -10,6 +10,7 @@ class NatsSubscriber:
         :param client: An already connected NATS client (from client.py).
         """
         self.client = client
+        self.codec = get_codec()
 
     async def subscribe(
         self,
@@ -28,8 +29,10 @@ class NatsSubscriber:
         :param stream: JetStream stream (for QoS >= 1).
         """
 
+        loads = self.codec.loads
+
         async def _on_message(msg):
-            payload = json.loads(msg.data.decode("utf-8"))
+            payload = loads(msg.data)
             await callback(payload)
 
         if qos == QoSLevel.AT_MOST_ONCE:
@@ -1,3 +1,5 @@
 from .ws_server import WebSocketServer
+from .client_session import ClientSession, SendPolicy
+from .subscription_index import SubscriptionIndex
 
-__all__ = ['WebSocketServer']
\ No newline at end of file
+__all__ = ['WebSocketServer', 'ClientSession', 'SendPolicy', 'SubscriptionIndex']
\ No newline at end of file
@@ -0,0 +1,152 @@
+import asyncio
+import time
+from collections import deque
+from enum import Enum
+
+import websockets
+
+
+class SendPolicy(str, Enum):
+    DROP_OLDEST = "drop_oldest"   # Lossy: evict the oldest queued frame (telemetry)
+    BLOCK = "block"               # Wait for space, disconnect after block_timeout
+    DISCONNECT = "disconnect"     # Drop the client as soon as its queue is full
+
+
+class ClientSession:
+    """
+    One connected WS client: a bounded outbound queue drained by a
+    dedicated writer task, so a stalled client can never pile up
+    unbounded futures or memory in the server.
+
+    BLOCK frames that find the queue full wait in an overflow deque (at
+    most max_queue of them) that the writer moves into the queue as it
+    drains; one timer disconnects the client if the oldest has waited
+    block_timeout. The queue stays full while the overflow is non-empty,
+    so later frames cannot overtake it.
+
+    All methods run on the WebSocket server's event loop.
+    """
+
+    def __init__(self, websocket, client_class: str, max_queue: int = 256, block_timeout: float = 2.0):
+        self.websocket = websocket
+        self.client_class = client_class
+        self.block_timeout = block_timeout
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.overflow: deque = deque()   # (item, deadline) of BLOCK frames waiting for queue space
+
+        self.sent = 0
+        self.dropped = 0
+        self.closing = False
+        self._writer = None
+        self._block_timer = None
+        self._closer = None
+
+    @property
+    def depth(self) -> int:
+        return self.queue.qsize() + len(self.overflow)
+
+    def writable(self) -> bool:
+        """True if a frame can be written straight to the socket without reordering or overfilling it."""
+        if self.closing or not self.queue.empty():
+            return False
+        transport = self.websocket.transport
+        return transport is not None and transport.get_write_buffer_size() < self.websocket.write_limit
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write_loop())
+
+    async def close(self):
+        self.closing = True
+        self._cancel_block_timer()
+        self.overflow.clear()
+        if self._writer:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def enqueue(self, message: str, policy: SendPolicy = SendPolicy.BLOCK, trace=None, enqueued: int = 0):
+        """
+        Queue a frame for this client, applying policy when the queue is full.
+        trace/enqueued (from core.utils.latency) time the send hop once written.
+        """
+        if self.closing:
+            return
+        item = (message, trace, enqueued)
+        try:
+            self.queue.put_nowait(item)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if policy == SendPolicy.DROP_OLDEST:
+            self.queue.get_nowait()
+            self.dropped += 1
+            self.queue.put_nowait(item)
+        elif policy == SendPolicy.BLOCK:
+            if len(self.overflow) >= self.queue.maxsize:
+                self.dropped += 1
+                self._disconnect("send queue and overflow full")
+                return
+            self.overflow.append((item, time.monotonic() + self.block_timeout))
+            if self._block_timer is None:
+                self._block_timer = asyncio.get_running_loop().call_later(self.block_timeout, self._check_blocked)
+        else:
+            self.dropped += 1
+            self._disconnect("send queue full")
+
+    def _refill(self):
+        """Move waiting BLOCK frames into the queue as it drains."""
+        while self.overflow and not self.queue.full():
+            self.queue.put_nowait(self.overflow.popleft()[0])
+        if not self.overflow:
+            self._cancel_block_timer()
+
+    def _check_blocked(self):
+        self._block_timer = None
+        if not self.overflow or self.closing:
+            return
+        remaining = self.overflow[0][1] - time.monotonic()
+        if remaining > 0:
+            self._block_timer = asyncio.get_running_loop().call_later(remaining, self._check_blocked)
+            return
+        self.dropped += len(self.overflow)
+        self.overflow.clear()
+        self._disconnect(f"blocked for {self.block_timeout}s")
+
+    def _cancel_block_timer(self):
+        if self._block_timer is not None:
+            self._block_timer.cancel()
+            self._block_timer = None
+
+    def _disconnect(self, reason: str):
+        if self.closing:
+            return
+        self.closing = True
+        self._cancel_block_timer()
+        print(f"🐢 [WS] Slow consumer {self.websocket.remote_address[0]} disconnected: {reason}")
+        self._closer = asyncio.create_task(self.websocket.close(code=1008, reason="slow consumer"))
+
+    async def _write_loop(self):
+        try:
+            while True:
+                message, trace, enqueued = await self.queue.get()
+                if self.overflow:
+                    self._refill()
+                await self.websocket.send(message)
+                self.sent += 1
+                if trace:
+                    trace.mark_sent(enqueued)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "remote": "%s:%s" % self.websocket.remote_address[:2],
+            "client_class": self.client_class,
+            "queue_depth": self.depth,
+            "queue_max": self.queue.maxsize,
+            "sent": self.sent,
+            "dropped": self.dropped,
+        }
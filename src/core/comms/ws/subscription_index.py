@@ -0,0 +1,99 @@
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+WILDCARD = "*"
+
+
+class SubscriptionIndex:
+    """
+    (event, uav_id) -> interested ClientSessions.
+
+    Clients subscribe to the cross product of event types and UAV ids;
+    "*" matches any event or any UAV. A new client starts with an implicit
+    ("*", "*") subscription that is replaced by its first explicit subscribe,
+    so clients that never subscribe keep receiving everything.
+
+    Only touched from the WS event loop, so no locking is needed.
+    """
+
+    def __init__(self):
+        self._subs: Dict[Tuple[str, str], Set] = {}
+        self._by_event: Dict[str, Set] = {}
+        self._keys: Dict[object, Set[Tuple[str, str]]] = {}
+        self._implicit: Set = set()
+
+    def add_client(self, session):
+        self._keys[session] = set()
+        self._add(session, WILDCARD, WILDCARD)
+        self._implicit.add(session)
+
+    def remove_client(self, session):
+        for event, uav_id in list(self._keys.get(session, ())):
+            self._remove(session, event, uav_id)
+        self._keys.pop(session, None)
+        self._implicit.discard(session)
+
+    def subscribe(self, session, events: Optional[Iterable[str]], uavs: Optional[Iterable[str]]):
+        if session in self._implicit:
+            self._implicit.discard(session)
+            self._remove(session, WILDCARD, WILDCARD)
+        for event in events or [WILDCARD]:
+            for uav_id in uavs or [WILDCARD]:
+                self._add(session, str(event), str(uav_id))
+
+    def unsubscribe(self, session, events: Optional[Iterable[str]], uavs: Optional[Iterable[str]]):
+        """Remove matching keys; with no events and no uavs, remove every subscription."""
+        self._implicit.discard(session)
+        if not events and not uavs:
+            keys = list(self._keys.get(session, ()))
+        else:
+            events = set(events or [WILDCARD])
+            uavs = set(uavs or [WILDCARD])
+            keys = [
+                (e, u) for e, u in self._keys.get(session, ())
+                if (e in events or WILDCARD in events) and (u in uavs or WILDCARD in uavs)
+            ]
+        for event, uav_id in keys:
+            self._remove(session, event, uav_id)
+
+    def subscriptions(self, session):
+        return sorted(self._keys.get(session, ()))
+
+    def targets(self, event: str, uav_id: Optional[str] = None) -> Set:
+        """
+        Sessions interested in event for uav_id. A fleet-level event
+        (uav_id None) reaches every session subscribed to that event type.
+        """
+        if uav_id is None:
+            return self._by_event.get(event, set()) | self._by_event.get(WILDCARD, set())
+
+        subs = self._subs
+        result = set()
+        for key in ((event, uav_id), (event, WILDCARD), (WILDCARD, uav_id), (WILDCARD, WILDCARD)):
+            sessions = subs.get(key)
+            if sessions:
+                result |= sessions
+        return result
+
+    def _add(self, session, event: str, uav_id: str):
+        self._subs.setdefault((event, uav_id), set()).add(session)
+        self._by_event.setdefault(event, set()).add(session)
+        self._keys.setdefault(session, set()).add((event, uav_id))
+
+    def _remove(self, session, event: str, uav_id: str):
+        keys = self._keys.get(session)
+        if keys is None:
+            return
+        keys.discard((event, uav_id))
+
+        sessions = self._subs.get((event, uav_id))
+        if sessions is not None:
+            sessions.discard(session)
+            if not sessions:
+                del self._subs[(event, uav_id)]
+
+        if not any(e == event for e, _ in keys):
+            by_event = self._by_event.get(event)
+            if by_event is not None:
+                by_event.discard(session)
+                if not by_event:
+                    del self._by_event[event]
@@ -102,38 +102,134 @@
 import asyncio
 import threading
 import json
+from urllib.parse import urlparse, parse_qs
 import websockets
 from websockets.server import serve
+try:
+    from websockets.legacy.protocol import broadcast  # matches the legacy serve() above
+except ImportError:
+    from websockets import broadcast
+from core.utils import get_codec, current_trace
+from .client_session import ClientSession, SendPolicy
+from .subscription_index import SubscriptionIndex
 
 class WebSocketServer:
-    def __init__(self, host="0.0.0.0", port=None): # Default set to 3000
+    """
+    GCS-facing WebSocket server.
+
+    Runs either on its own event loop thread (start/stop, "threaded" mode)
+    or directly on the caller's running loop (start_async/stop_async,
+    "inline" mode), which avoids a cross-thread hop per message.
+
+    Each client belongs to a client class (e.g. "gcs", "dashboard"), chosen
+    with ?client_class=<name> on connect or a "set_client_class" event.
+    Unknown or missing classes map to "default".
+
+    Every client gets a bounded send queue drained by its own writer task.
+    What happens when that queue is full is chosen per event type via
+    policies (see SendPolicy); unlisted events use policies["default"].
+
+    Clients narrow what they receive with
+        {"type": "subscribe",   "payload": {"events": [...], "uavs": [...]}}
+        {"type": "unsubscribe", "payload": {"events": [...], "uavs": [...]}}
+    and send_event() only touches sockets subscribed to (event, uav_id).
+    """
+
+    DEFAULT_CLASS = "default"
+
+    def __init__(self, host="0.0.0.0", port=None, max_queue=256, block_timeout=2.0, policies=None): # Default set to 3000
         self.host = host
         self.port = port
         self.server_thread = None
         self.is_running = False
+        self.ready = threading.Event()   # set once self.loop is serving
         self.loop = None
         self.server = None
+        self.inline = False
+        self._loop_thread_id = None
         self.event_handlers = {}
         self.clients = set()
+        self.sessions = {}
+        self.subscriptions = SubscriptionIndex()
+        self.known_classes = {self.DEFAULT_CLASS}
+        self.configure(max_queue, block_timeout, policies)
+        self.codec = get_codec()
+        self._frame_prefixes = {}
+        self._closed_sent = 0       # frame counters of sessions that have disconnected
+        self._closed_dropped = 0
+
+    def configure(self, max_queue=256, block_timeout=2.0, policies=None):
+        """
+        Send queue settings; safe to call again while running (live config).
+        Policies and block_timeout apply at once, max_queue to new connections.
+        """
+        merged = {"default": SendPolicy.BLOCK, "telemetry_update": SendPolicy.DROP_OLDEST}
+        merged.update({k: SendPolicy(v) for k, v in (policies or {}).items()})
+        self.policies = merged
+        self.max_queue = max_queue
+        self.block_timeout = block_timeout
+        for session in list(self.sessions.values()):
+            session.block_timeout = block_timeout
 
     def listen_event(self, event_name, callback):
         self.event_handlers[event_name] = callback
         print(f"Registered listener for: {event_name}")
 
+    def set_client_classes(self, names):
+        """Declare the client class names this server accepts."""
+        self.known_classes = {self.DEFAULT_CLASS, *names}
+
+    def _resolve_class(self, name):
+        return name if name in self.known_classes else self.DEFAULT_CLASS
+
+    def clients_of_class(self, client_class):
+        """Snapshot of connected clients in client_class."""
+        return [ws for ws, s in list(self.sessions.items()) if s.client_class == client_class]
+
+    def _policy_for(self, event_name):
+        return self.policies.get(event_name) or self.policies["default"]
+
+    def client_stats(self):
+        """Per-client queue depth, sent and dropped counters."""
+        return [s.stats() for s in list(self.sessions.values())]
+
+    def frame_totals(self):
+        """(sent, dropped) frames over the server's lifetime, including disconnected clients."""
+        sessions = list(self.sessions.values())
+        return (
+            self._closed_sent + sum(s.sent for s in sessions),
+            self._closed_dropped + sum(s.dropped for s in sessions),
+        )
+
     async def _handler(self, websocket):
+        query = parse_qs(urlparse(getattr(websocket, "path", "") or "").query)
+        session = ClientSession(
+            websocket,
+            self._resolve_class(query.get("client_class", [self.DEFAULT_CLASS])[0]),
+            max_queue=self.max_queue,
+            block_timeout=self.block_timeout,
+        )
+        session.start()
+        self.sessions[websocket] = session
+        self.subscriptions.add_client(session)
         self.clients.add(websocket)
         remote_addr = websocket.remote_address[0]
-        print(f"⚡ [WS] New Connection: {remote_addr}")
+        print(f"⚡ [WS] New Connection: {remote_addr} ({session.client_class})")
 
         try:
             async for message in websocket:
                 try:
-                    data = json.loads(message)
+                    data = self.codec.loads(message)
                     # print(data)
                     event_type = data.get("type")
                     payload = data.get("payload")
 
-                    if event_type in self.event_handlers:
+                    if event_type == "set_client_class":
+                        name = payload.get("client_class") if isinstance(payload, dict) else payload
+                        session.client_class = self._resolve_class(name)
+                    elif event_type in ("subscribe", "unsubscribe"):
+                        self._handle_subscription(session, event_type, payload)
+                    elif event_type in self.event_handlers:
                         self.event_handlers[event_type](websocket, payload)
                     else:
                         print(f"Unknown event: {event_type}")
@@ -144,44 +240,154 @@ class WebSocketServer:
         finally:
             if websocket in self.clients:
                 self.clients.remove(websocket)
+            self.subscriptions.remove_client(session)
+            await session.close()
+            # No await between these, so frame_totals() never loses or double-counts the session
+            self.sessions.pop(websocket, None)
+            self._closed_sent += session.sent
+            self._closed_dropped += session.dropped
             print(f"🔌 [WS] Disconnected: {remote_addr}")
 
-    def send_event(self, event_name, data, to=None):
-        message = json.dumps({"type": event_name, "payload": data})
+    def _handle_subscription(self, session, action, payload):
+        payload = payload if isinstance(payload, dict) else {}
+        events, uavs = payload.get("events"), payload.get("uavs")
+        if isinstance(events, str):
+            events = [events]
+        if isinstance(uavs, str):
+            uavs = [uavs]
+
+        if action == "subscribe":
+            self.subscriptions.subscribe(session, events, uavs)
+        else:
+            self.subscriptions.unsubscribe(session, events, uavs)
+
+        current = [{"event": e, "uav": u} for e, u in self.subscriptions.subscriptions(session)]
+        self.send_event("subscriptions", current, to=session.websocket)
+
+    def send_event(self, event_name, data, to=None, client_class=None, uav_id=None):
+        message = self.codec.dumps_text({"type": event_name, "payload": data})
+        self.send_frame(message, to, client_class, self._policy_for(event_name), event_name, uav_id)
+
+    def send_raw(self, event_name, payload: bytes, to=None, client_class=None, uav_id=None):
+        """
+        Send a payload that is already JSON-encoded bytes (e.g. a telemetry
+        body sliced out of a NATS message) without decoding it.
+        """
+        prefix = self._frame_prefixes.get(event_name)
+        if prefix is None:
+            prefix = self.codec.dumps_text({"type": event_name})[:-1] + ',"payload":'
+            self._frame_prefixes[event_name] = prefix
+        self.send_frame(
+            f"{prefix}{payload.decode('utf-8')}}}", to, client_class, self._policy_for(event_name), event_name, uav_id
+        )
+
+    def send_frame(self, message: str, to=None, client_class=None, policy=SendPolicy.BLOCK, event_name=None, uav_id=None):
+        """
+        Send a fully framed {"type","payload"} text message to one client,
+        or to every client subscribed to (event_name, uav_id), optionally
+        narrowed to client_class. Without event_name it goes to everyone.
+
+        The frame is encoded once by the caller; delivery costs at most one
+        hop onto the WS loop regardless of how many clients receive it.
+        """
         if self.loop and self.loop.is_running():
-            if to:
-                asyncio.run_coroutine_threadsafe(to.send(message), self.loop)
+            if threading.get_ident() == self._loop_thread_id:
+                self._fanout(message, to, client_class, policy, event_name, uav_id)
             else:
-                for client in self.clients:
-                    asyncio.run_coroutine_threadsafe(client.send(message), self.loop)
+                self.loop.call_soon_threadsafe(self._fanout, message, to, client_class, policy, event_name, uav_id)
+
+    def _fanout(self, message: str, to, client_class, policy, event_name=None, uav_id=None):
+        """
+        Runs on the WS loop. Clients with an empty queue and room in their
+        transport buffer get the frame written in one synchronous broadcast;
+        backlogged clients get it queued behind their pending frames, so
+        per-client ordering and the slow-consumer policy still hold.
+        """
+        if to is not None:
+            session = self.sessions.get(to)
+            sessions = [session] if session else []
+        else:
+            if event_name is None:
+                sessions = self.sessions.values()
+            else:
+                sessions = self.subscriptions.targets(event_name, uav_id)
+            if client_class is not None:
+                sessions = [s for s in sessions if s.client_class == client_class]
+
+        # Per-hop latency: set when this frame comes from a traced NATS callback,
+        # and only stamped when someone receives it
+        trace = current_trace() if sessions else None
+        enqueued = trace.mark_enqueued() if trace else 0
+
+        direct = []
+        for session in sessions:
+            if session.writable():
+                direct.append(session)
+            else:
+                session.enqueue(message, policy, trace, enqueued)
+
+        if direct:
+            broadcast([s.websocket for s in direct], message)
+            for session in direct:
+                session.sent += 1
+            if trace:
+                trace.mark_sent(enqueued)
+
+    def _print_banner(self):
+        import socket
+        try:
+            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            s.connect(("8.8.8.8", 80))
+            display_ip = s.getsockname()[0]
+            s.close()
+        except:
+            display_ip = self.host
+
+        print("-" * 30)
+        print(f"🚀 WS Server is LIVE{' (inline)' if self.inline else ''}")
+        print(f"🔗 URL: ws://{display_ip}:{self.port}") 
+        print("-" * 30)
 
     def _run_server(self):
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
+        self._loop_thread_id = threading.get_ident()
         
         try:
             # Explicitly use self.port here
             start_server = serve(self._handler, self.host, self.port)
             self.server = self.loop.run_until_complete(start_server)
-            
-            import socket
-            try:
-                s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                s.connect(("8.8.8.8", 80))
-                display_ip = s.getsockname()[0]
-                s.close()
-            except:
-                display_ip = self.host
-
-            print("-" * 30)
-            print(f"🚀 WS Server is LIVE")
-            print(f"🔗 URL: ws://{display_ip}:{self.port}") 
-            print("-" * 30)
+            self._print_banner()
+            self.ready.set()
 
             self.loop.run_forever()
         except Exception as e:
             print(f"❌ Server Error: {e}")
 
+    async def start_async(self):
+        """Serve on the caller's running loop (inline mode), no extra thread."""
+        if self.is_running: return
+        self.inline = True
+        self.loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self.server = await serve(self._handler, self.host, self.port)
+        self.is_running = True
+        self._print_banner()
+        self.ready.set()
+
+    async def stop_async(self):
+        """Stop an inline server started with start_async()."""
+        if not self.is_running:
+            return
+        print("Stopping WS Server...")
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        for ws in list(self.clients):
+            await ws.close()
+        self.is_running = False
+        print("WS Server stopped gracefully.")
+
     def start(self):
         if self.is_running: return
         self.server_thread = threading.Thread(target=self._run_server, daemon=True)
@@ -0,0 +1,5 @@
+from .flight_recorder import FlightRecorder
+from .recording_reader import RecordingReader
+from .replay import ReplayEngine
+
+__all__ = ["FlightRecorder", "RecordingReader", "ReplayEngine"]
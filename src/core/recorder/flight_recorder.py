@@ -0,0 +1,212 @@
+"""
+flight_recorder.py
+------------------
+Captures raw NATS traffic into mmap'd append-only segments (see segment.py).
+
+record() only timestamps the message and puts it on a SimpleQueue, so it is
+safe to call from NATS callbacks on the event loop; a dedicated writer
+thread copies records into the current segment's mmap and rolls over to a
+new segment when the next record would not fit.
+
+The queue is bounded by max_queue: when the writer falls behind (or has
+died) further records are dropped and counted rather than held in memory.
+The bound is a qsize() check in front of SimpleQueue.put(); queue.Queue's
+lock and condition would cost ~10x more per message on the event loop.
+"""
+
+import mmap
+import os
+import queue
+import threading
+import time
+from typing import Optional
+
+from core.utils import Logger
+
+from .segment import (
+    INDEX_ENTRY,
+    MAX_SUBJECT_LEN,
+    RECORD_HEADER,
+    index_path,
+    list_segments,
+    segment_number,
+    segment_path,
+)
+
+_STOP = object()
+
+
+class FlightRecorder:
+    """
+    Args:
+        directory: where segment-NNNNNN.rec/.idx files are written. New
+                   segments continue the numbering of any already there.
+        segment_size: bytes per segment file (preallocated).
+        index_interval: seconds of receive time between sparse index entries.
+        max_queue: records waiting for the writer before new ones are dropped.
+    """
+
+    def __init__(self, directory: str, segment_size: int = 64 * 1024 * 1024, index_interval: float = 1.0,
+                 max_queue: int = 65536):
+        self.logger = Logger.get("Recorder")
+        self.directory = directory
+        self.segment_size = segment_size
+        self.index_interval = index_interval
+        self.max_queue = max_queue
+
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self.error: Optional[str] = None    # why the writer thread died, if it did
+
+        # Writer-thread state
+        self._number = 0
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._index = None
+        self._offset = 0
+        self._next_index_ts = 0.0
+
+        self.records = 0
+        self.bytes = 0
+        self.segments = 0
+        self.dropped = 0      # by the writer: records too large for a segment
+        self.overflowed = 0   # by record(): queue full or writer dead
+
+    # ------------------------------
+    # Lifecycle
+    # ------------------------------
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        existing = list_segments(self.directory)
+        self._number = segment_number(existing[-1]) if existing else 0
+        self.error = None
+
+        self._thread = threading.Thread(target=self._write_loop, name="FlightRecorder", daemon=True)
+        self._thread.start()
+        self.logger.info(f"⏺️ Flight recorder writing to {os.path.abspath(self.directory)}")
+
+    def stop(self, timeout: float = 5.0):
+        """Flush everything queued so far and close the current segment."""
+        if not self._thread:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        self.logger.info(f"Flight recorder stopped: {self.stats()}")
+
+    # ------------------------------
+    # Producer side (any thread)
+    # ------------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def record(self, subject: str, data: bytes, ts: Optional[float] = None):
+        """Queue one message; never blocks. Dropped when max_queue records are already waiting."""
+        if self._queue.qsize() >= self.max_queue or self.error:
+            self.overflowed += 1
+            if self.overflowed == 1:
+                self.logger.warning(
+                    f"Flight recorder {'writer failed' if self.error else 'queue full'}; dropping records"
+                )
+            return
+        self._queue.put((subject, time.time() if ts is None else ts, data))
+
+    async def tap(self, msg):
+        """NATS subscription callback that records msg as-is."""
+        self.record(msg.subject, msg.data)
+
+    # ------------------------------
+    # Writer thread
+    # ------------------------------
+
+    def _write_loop(self):
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                self._write(*item)
+                # Drain whatever else is already queued before blocking again
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        return
+                    self._write(*item)
+                if self._index:
+                    self._index.flush()
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.logger.error(f"Flight recorder writer failed, recording stopped: {self.error}")
+        finally:
+            self._close_segment()
+
+    def _write(self, subject: str, ts: float, data: bytes):
+        subject_bytes = subject.encode()
+        size = RECORD_HEADER.size + len(subject_bytes) + len(data)
+        # Keep room for a zero header after the last record so readers see the end
+        if len(subject_bytes) > MAX_SUBJECT_LEN or size + RECORD_HEADER.size > self.segment_size:
+            self.dropped += 1
+            return
+
+        if self._mmap is None or self._offset + size + RECORD_HEADER.size > self.segment_size:
+            self._open_segment()
+
+        offset = self._offset
+        if ts >= self._next_index_ts:
+            self._index.write(INDEX_ENTRY.pack(ts, offset))
+            self._next_index_ts = ts + self.index_interval
+
+        mm = self._mmap
+        RECORD_HEADER.pack_into(mm, offset, len(subject_bytes), ts, len(data))
+        start = offset + RECORD_HEADER.size
+        mm[start:start + len(subject_bytes)] = subject_bytes
+        start += len(subject_bytes)
+        mm[start:start + len(data)] = data
+
+        self._offset = offset + size
+        self.records += 1
+        self.bytes += size
+
+    def _open_segment(self):
+        self._close_segment()
+        self._number += 1
+        path = segment_path(self.directory, self._number)
+
+        self._file = open(path, "w+b")
+        self._file.truncate(self.segment_size)
+        self._mmap = mmap.mmap(self._file.fileno(), self.segment_size)
+        self._index = open(index_path(path), "wb")
+        self._offset = 0
+        self._next_index_ts = 0.0
+        self.segments += 1
+
+    def _close_segment(self):
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+    def stats(self) -> dict:
+        return {
+            "records": self.records,
+            "bytes": self.bytes,
+            "segments": self.segments,
+            "dropped": self.dropped + self.overflowed,
+            "queued": self._queue.qsize(),
+            "running": self.running,
+            "error": self.error,
+        }
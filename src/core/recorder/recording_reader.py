@@ -0,0 +1,99 @@
+"""
+recording_reader.py
+-------------------
+Reads FlightRecorder segments through read-only mmaps.
+
+    reader = RecordingReader("recordings")
+    for subject, ts, data in reader.read(since=t0, until=t1):
+        ...
+
+A time-bounded read uses each segment's sparse .idx to bisect to the last
+index entry at or before `since`, then scans forward from that offset.
+"""
+
+import bisect
+import mmap
+import os
+from typing import Iterator, List, Optional, Tuple
+
+from .segment import INDEX_ENTRY, RECORD_HEADER, index_path, list_segments
+
+Record = Tuple[str, float, bytes]
+
+
+class RecordingReader:
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def segments(self) -> List[str]:
+        return list_segments(self.directory)
+
+    def read(self, since: Optional[float] = None, until: Optional[float] = None) -> Iterator[Record]:
+        """Yield (subject, receive_ts, data) in recorded order, optionally bounded in time."""
+        paths = self.segments()
+        indexes = [self._load_index(path) for path in paths]
+
+        for k, (path, index) in enumerate(zip(paths, indexes)):
+            if until is not None and index and index[0][0] > until:
+                break
+
+            start = 0
+            if since is not None:
+                # The next segment starts before since: nothing here is wanted
+                following = indexes[k + 1] if k + 1 < len(indexes) else None
+                if following and following[0][0] < since:
+                    continue
+                i = bisect.bisect_right(index, (since, float("inf"))) - 1
+                if i >= 0:
+                    start = index[i][1]
+
+            for subject, ts, data in self._scan(path, start):
+                if since is not None and ts < since:
+                    continue
+                if until is not None and ts > until:
+                    return
+                yield subject, ts, data
+
+    def __iter__(self) -> Iterator[Record]:
+        return self.read()
+
+    def time_range(self) -> Optional[Tuple[float, float]]:
+        """(first_ts, last_ts) across all segments, or None if empty."""
+        first = last = None
+        for path in self.segments():
+            for _, ts, _ in self._scan(path, 0):
+                if first is None:
+                    first = ts
+                last = ts
+        return None if first is None else (first, last)
+
+    @staticmethod
+    def _load_index(path: str) -> List[Tuple[float, int]]:
+        try:
+            with open(index_path(path), "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return []
+        usable = len(raw) - len(raw) % INDEX_ENTRY.size
+        return list(INDEX_ENTRY.iter_unpack(raw[:usable]))
+
+    @staticmethod
+    def _scan(path: str, offset: int) -> Iterator[Record]:
+        """Records from offset up to the first zero header (or end of file)."""
+        if os.path.getsize(path) == 0:
+            return
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm)
+            header_size = RECORD_HEADER.size
+            while offset + header_size <= end:
+                subject_len, ts, data_len = RECORD_HEADER.unpack_from(mm, offset)
+                if subject_len == 0:
+                    return
+                start = offset + header_size
+                stop = start + subject_len + data_len
+                if stop > end:
+                    return
+                subject = mm[start:start + subject_len].decode()
+                data = mm[start + subject_len:stop]
+                offset = stop
+                yield subject, ts, data
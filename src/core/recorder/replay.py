@@ -0,0 +1,146 @@
+"""
+replay.py
+---------
+Republishes a FlightRecorder recording into NATS.
+
+Timing follows a single monotonic schedule: record i is due at
+start + (ts_i - ts_0) / speed, so per-message sleep jitter never
+accumulates into drift. speed=1 is real time, speed=10 is 10x, and
+speed=0 publishes as fast as the connection accepts (max-throughput).
+
+Run from src/:
+    python -m core.recorder.replay recordings [--speed 10 | --max]
+        [--url nats://127.0.0.1:4222] [--subject 'uav.*.telemetry.>']
+        [--since EPOCH] [--until EPOCH] [--loop N]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, Iterable, Optional
+
+from .recording_reader import Record, RecordingReader
+
+Publish = Callable[[str, bytes], Awaitable[None]]
+
+
+def subject_matches(pattern: str, subject: str) -> bool:
+    """NATS wildcard match: '*' is one token, a trailing '>' is one or more tokens."""
+    want = pattern.split(".")
+    have = subject.split(".")
+    for i, token in enumerate(want):
+        if token == ">":
+            return len(have) > i
+        if i >= len(have) or (token != "*" and token != have[i]):
+            return False
+    return len(want) == len(have)
+
+
+class ReplayEngine:
+    """
+    Args:
+        publish: coroutine (subject, data) -> None, e.g. nc.publish.
+        speed: time scale; 1.0 real time, >1 accelerated, 0 = no pacing.
+        flush: optional coroutine awaited every flush_every records and at the end.
+    """
+
+    def __init__(self, publish: Publish, speed: float = 1.0,
+                 flush: Optional[Callable[[], Awaitable[None]]] = None, flush_every: int = 1000):
+        if speed < 0:
+            raise ValueError("speed must be >= 0")
+        self.publish = publish
+        self.speed = speed
+        self.flush = flush
+        self.flush_every = flush_every
+
+        self.published = 0
+        self.bytes = 0
+        self.max_lag = 0.0    # worst lateness vs schedule, seconds
+        self.elapsed = 0.0
+
+    async def run(self, records: Iterable[Record]):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        first_ts = None
+
+        for subject, ts, data in records:
+            if first_ts is None:
+                first_ts = ts
+
+            if self.speed > 0:
+                due = start + (ts - first_ts) / self.speed
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.max_lag = max(self.max_lag, -delay)
+
+            await self.publish(subject, data)
+            self.published += 1
+            self.bytes += len(data)
+            if self.flush and self.published % self.flush_every == 0:
+                await self.flush()
+            elif self.speed == 0 and self.published % self.flush_every == 0:
+                # Let the connection's flusher run between bursts
+                await asyncio.sleep(0)
+
+        if self.flush:
+            await self.flush()
+        self.elapsed = loop.time() - start
+
+    def stats(self) -> dict:
+        rate = self.published / self.elapsed if self.elapsed else 0.0
+        return {
+            "published": self.published,
+            "bytes": self.bytes,
+            "elapsed_s": round(self.elapsed, 3),
+            "msgs_per_s": round(rate, 1),
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+        }
+
+
+def _filtered(reader: RecordingReader, since, until, patterns):
+    for record in reader.read(since, until):
+        if not patterns or any(subject_matches(p, record[0]) for p in patterns):
+            yield record
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Replay a flight recording into NATS")
+    parser.add_argument("directory", help="recording directory (segment-*.rec)")
+    parser.add_argument("--url", default="nats://127.0.0.1:4222")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = real time, 10 = 10x faster")
+    parser.add_argument("--max", action="store_true", help="no pacing: publish as fast as possible")
+    parser.add_argument("--subject", action="append", default=[], help="only replay matching subjects (repeatable)")
+    parser.add_argument("--since", type=float, default=None, help="start at this receive time (epoch seconds)")
+    parser.add_argument("--until", type=float, default=None, help="stop after this receive time (epoch seconds)")
+    parser.add_argument("--loop", type=int, default=1, help="replay the recording N times")
+    args = parser.parse_args()
+
+    from core.comms import NatsClient
+
+    reader = RecordingReader(args.directory)
+    span = reader.time_range()
+    if span is None:
+        print(f"❌ No records in {args.directory}")
+        return
+    print(f"📼 {len(reader.segments())} segment(s), {span[1] - span[0]:.1f}s recorded")
+
+    client = NatsClient(local_servers=[args.url], name="replay")
+    if not await client.connect():
+        return
+    try:
+        for n in range(args.loop):
+            engine = ReplayEngine(client.nc.publish, speed=0 if args.max else args.speed, flush=client.nc.flush)
+            wall = time.perf_counter()
+            await engine.run(_filtered(reader, args.since, args.until, args.subject))
+            print(f"▶️ pass {n + 1}/{args.loop}: {engine.stats()} (wall {time.perf_counter() - wall:.2f}s)")
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
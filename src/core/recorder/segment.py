@@ -0,0 +1,60 @@
+"""
+segment.py
+----------
+On-disk layout shared by FlightRecorder and RecordingReader.
+
+A recording is a directory of fixed-size, append-only segment files:
+
+    segment-000001.rec    preallocated to segment_size bytes, zero-filled
+    segment-000001.idx    sparse time index for that segment
+
+Each record in a .rec file is
+
+    <H subject_len> <d receive_ts> <I data_len> <subject bytes> <data bytes>
+
+little-endian, packed back to back. Because the file starts zero-filled, a
+header with subject_len == 0 marks the end of the written data, so a segment
+that is still being written (or was cut short by a crash) reads cleanly up
+to its last complete record.
+
+The .idx sidecar is a flat array of <d ts> <Q offset> entries, written
+every index_interval seconds of receive time; offsets point at a record
+header in the .rec file of the same number.
+"""
+
+import os
+import struct
+from typing import List
+
+RECORD_HEADER = struct.Struct("<HdI")
+INDEX_ENTRY = struct.Struct("<dQ")
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".rec"
+INDEX_SUFFIX = ".idx"
+
+MAX_SUBJECT_LEN = 0xFFFF
+
+
+def segment_path(directory: str, number: int) -> str:
+    return os.path.join(directory, f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}")
+
+
+def index_path(segment: str) -> str:
+    return segment[: -len(SEGMENT_SUFFIX)] + INDEX_SUFFIX
+
+
+def list_segments(directory: str) -> List[str]:
+    """Segment files in directory, in write order."""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(
+        name for name in os.listdir(directory)
+        if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+    )
+    return [os.path.join(directory, name) for name in names]
+
+
+def segment_number(path: str) -> int:
+    name = os.path.basename(path)
+    return int(name[len(SEGMENT_PREFIX): -len(SEGMENT_SUFFIX)])
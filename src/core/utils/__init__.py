@@ -1,3 +1,12 @@
 from .logger import Logger
+from .codec import Codec, get_codec, set_codec, slice_envelope_body
+from .latency import LatencyHistogram, LatencyTracker, get_latency_tracker, current_trace, mark_decoded
+from .loop_monitor import LoopWatchdog
+from .metrics import get_subject_stats
+from .profiler import SamplingProfiler
 
-__all__ = ["Logger"]
\ No newline at end of file
+__all__ = [
+    "Logger", "Codec", "get_codec", "set_codec", "slice_envelope_body",
+    "LatencyHistogram", "LatencyTracker", "get_latency_tracker", "current_trace", "mark_decoded",
+    "LoopWatchdog", "SamplingProfiler", "get_subject_stats",
+]
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+codec.py
+--------
+Pluggable JSON codec shared by the NATS and WebSocket paths.
+
+The backend is picked once per process from nats.yaml:
+
+    codec:
+      backend: orjson     # stdlib | orjson | msgspec
+
+Optional backends that are not installed fall back to stdlib json.
+Every backend raises json.JSONDecodeError on malformed input, so callers
+keep a single except clause regardless of the backend in use.
+"""
+
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+from .logger import Logger
+
+
+class Codec(ABC):
+    """
+    Interface: dumps() -> bytes, dumps_text() -> str, loads(bytes | str).
+
+    Backends may also bind a library function straight onto the instance in
+    __init__ (shadowing the method) to skip a Python-level call per message.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        ...
+
+    @abstractmethod
+    def dumps_text(self, obj: Any) -> str:
+        """Encode to str, for WebSocket text frames."""
+
+    @abstractmethod
+    def loads(self, data) -> Any:
+        ...
+
+
+class StdlibCodec(Codec):
+    name = "stdlib"
+
+    def __init__(self):
+        self._encoder = json.JSONEncoder(separators=(",", ":"))
+        self.dumps_text = self._encoder.encode
+        self.loads = json.loads
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.dumps_text(obj).encode("utf-8")
+
+    def dumps_text(self, obj: Any) -> str:
+        return self._encoder.encode(obj)
+
+    def loads(self, data) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(Codec):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self.dumps = orjson.dumps
+        self.loads = orjson.loads  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj)
+
+    def dumps_text(self, obj: Any) -> str:
+        return self._orjson.dumps(obj).decode("utf-8")
+
+    def loads(self, data) -> Any:
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec(Codec):
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+        self._decode_error = msgspec.DecodeError
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+        self.dumps = self._encoder.encode
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def dumps_text(self, obj: Any) -> str:
+        return self.dumps(obj).decode("utf-8")
+
+    def loads(self, data) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except self._decode_error as e:
+            raise json.JSONDecodeError(str(e), "", 0) from None
+
+
+_BACKENDS = {
+    "stdlib": StdlibCodec,
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+}
+
+_active: Optional[Codec] = None
+_lock = threading.Lock()
+
+_HEADER_KEY = b'"header"'
+_BODY_KEY = b'"body":'
+_NOT_BRACE_OR_QUOTE = bytes(range(256)).translate(None, b'{}"')
+
+
+def _is_one_object(body: bytes) -> bool:
+    """
+    True if body's first '{' is closed by its last '}', i.e. nothing follows
+    the object. Braces inside strings are ignored; bodies with backslash
+    escapes or braces inside strings are rejected rather than scanned.
+    """
+    if b"\\" in body:
+        return False
+    # strings with no brace inside reduce to '""' and drop out; any quote left means one had a brace
+    braces = body.translate(None, _NOT_BRACE_OR_QUOTE).replace(b'""', b"")
+    if b'"' in braces:
+        return False
+    # the inner braces must balance without closing the outer object early
+    braces = braces[1:-1]
+    while b"{}" in braces:
+        braces = braces.replace(b"{}", b"")
+    return not braces
+
+
+def slice_envelope_body(data: bytes) -> Optional[bytes]:
+    """
+    Return the raw JSON bytes of an envelope's "body" without parsing it.
+
+    Works on the {"header": {...}, "body": {...}} layout that MessageFactory
+    (and the Air Unit) emit, where "body" is the last key. Returns None when
+    the bytes do not match that layout (including a key after "body", or a
+    body the brace check cannot vouch for), so callers can fall back to a
+    full parse.
+    """
+    start = data.find(_BODY_KEY)
+    header = data.find(_HEADER_KEY)
+    if start < 0 or header < 0 or header > start:
+        return None
+
+    end = data.rfind(b"}")
+    body = data[start + len(_BODY_KEY):end].strip()
+    if body[:1] != b"{" or body[-1:] != b"}" or not _is_one_object(body):
+        return None
+    return body
+
+
+def create_codec(backend: str) -> Codec:
+    """Instantiate a backend by name, falling back to stdlib if unavailable."""
+    logger = Logger.get("Codec")
+    cls = _BACKENDS.get(backend)
+    if cls is None:
+        logger.warning(f"Unknown codec backend '{backend}', using stdlib")
+        return StdlibCodec()
+    try:
+        return cls()
+    except ImportError:
+        logger.warning(f"Codec backend '{backend}' not installed, using stdlib")
+        return StdlibCodec()
+
+
+def set_codec(backend: str) -> Codec:
+    """Replace the process-wide codec. Components created afterwards pick it up."""
+    global _active
+    with _lock:
+        _active = create_codec(backend)
+    return _active
+
+
+def get_codec() -> Codec:
+    """Return the process-wide codec, selecting it from nats.yaml on first use."""
+    global _active
+    if _active is None:
+        with _lock:
+            if _active is None:
+                from config import ConfigLoader
+                try:
+                    backend = ConfigLoader().get("nats.yaml").get("codec", {}).get("backend", "stdlib")
+                except (FileNotFoundError, ValueError):
+                    backend = "stdlib"
+                _active = create_codec(backend)
+                Logger.get("Codec").info(f"JSON codec: {_active.name}")
+    return _active
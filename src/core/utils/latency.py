@@ -0,0 +1,226 @@
+"""
+latency.py
+----------
+Always-on per-hop latency histograms for the NATS -> WS path.
+
+A Trace is started at NATS callback entry and carried in a ContextVar, so
+it follows the message without changing any callback signatures:
+loop.call_soon_threadsafe() copies the caller's context, which makes the
+trace visible in WebSocketServer._fanout on the WS thread as well.
+
+    entry ──decode──▶ decoded ──dispatch──▶ ws enqueue ──send──▶ ws sent
+      └──────────────────────── total ─────────────────────────────┘
+
+Telemetry held back by TelemetryConflator adds a hop between decode and
+dispatch, the time the frame waited for its class's flush:
+
+    decoded ──conflate──▶ flush ──dispatch──▶ ws enqueue ...
+
+Histograms use log-linear buckets (4 per power of two, so ~19% wide) over
+nanoseconds. record() is a few integer operations and no allocation. Each
+histogram is written from a single thread (decode on the NATS loop;
+dispatch, send and total on the WS loop), so no locks are taken. A frame
+queued for several backlogged clients records one send/total per client.
+
+Command responses also record "rtt": WS command published -> UAV
+response received (see controllers.pending_commands).
+
+The conflator keeps the trace of each pending frame and makes it current
+again (LatencyTracker.attach) while flushing, so its frames record every
+hop; "total" then includes the conflation wait.
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from .logger import Logger
+
+_SUB_BUCKETS = 4                    # per power of two
+_BUCKETS = 64 * _SUB_BUCKETS
+
+HOPS = ("decode", "conflate", "dispatch", "send", "total", "rtt")
+
+
+def _bucket(ns: int) -> int:
+    if ns < 8:
+        return max(ns, 0)
+    bits = ns.bit_length()
+    return (bits - 2) * _SUB_BUCKETS + ((ns >> (bits - 3)) & 3)
+
+
+def _bucket_upper(index: int) -> int:
+    """Largest ns value that falls in bucket index."""
+    if index < 8:
+        return index
+    bits = index // _SUB_BUCKETS + 2
+    sub = index % _SUB_BUCKETS
+    return ((4 + sub + 1) << (bits - 3)) - 1
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns: int):
+        self.counts[_bucket(ns)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, q: float) -> int:
+        """Upper bound (ns) of the bucket holding the q-th quantile."""
+        if not self.count:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return min(_bucket_upper(index), self.max)
+        return self.max
+
+    def buckets(self) -> List[Tuple[int, int]]:
+        """Non-empty (upper_bound_ns, cumulative_count) pairs, for exporters."""
+        out, seen = [], 0
+        for index, n in enumerate(self.counts):
+            if n:
+                seen += n
+                out.append((_bucket_upper(index), seen))
+        return out
+
+    def snapshot(self) -> dict:
+        us = lambda ns: round(ns / 1000, 1)
+        return {
+            "count": self.count,
+            "mean_us": us(self.total / self.count) if self.count else 0.0,
+            "p50_us": us(self.percentile(0.50)),
+            "p99_us": us(self.percentile(0.99)),
+            "p999_us": us(self.percentile(0.999)),
+            "max_us": us(self.max),
+        }
+
+
+class Trace:
+    """Timestamps (perf_counter_ns) of one message on its way through the service."""
+
+    __slots__ = ("tracker", "event", "entry", "decoded")
+
+    def __init__(self, tracker: "LatencyTracker", event: str):
+        self.tracker = tracker
+        self.event = event
+        self.entry = time.perf_counter_ns()
+        self.decoded = 0
+
+    def mark_decoded(self):
+        self.decoded = time.perf_counter_ns()
+        self.tracker.record(self.event, "decode", self.decoded - self.entry)
+
+    def held(self) -> "Trace":
+        """
+        For a frame released after being held (conflation): record the wait
+        as "conflate" and return a copy whose dispatch hop starts now. The
+        original is left as is, since one frame may be released per client class.
+        """
+        released = Trace(self.tracker, self.event)
+        released.entry = self.entry
+        released.decoded = released_at = time.perf_counter_ns()
+        self.tracker.record(self.event, "conflate", released_at - (self.decoded or self.entry))
+        return released
+
+    def mark_enqueued(self) -> int:
+        now = time.perf_counter_ns()
+        self.tracker.record(self.event, "dispatch", now - (self.decoded or self.entry))
+        return now
+
+    def mark_sent(self, enqueued: int):
+        now = time.perf_counter_ns()
+        self.tracker.record(self.event, "send", now - enqueued)
+        self.tracker.record(self.event, "total", now - self.entry)
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("latency_trace", default=None)
+
+
+class LatencyTracker:
+    """(event, hop) -> LatencyHistogram."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._hists: Dict[Tuple[str, str], LatencyHistogram] = {}
+
+    def begin(self, event: str):
+        """
+        Start a trace for the message being handled and make it current.
+        Returns a token for end(), or None when disabled.
+        """
+        if not self.enabled:
+            return None
+        return _current.set(Trace(self, event))
+
+    @staticmethod
+    def attach(trace: Optional[Trace]):
+        """Make an existing trace current again (e.g. when a held frame is sent). Returns a token for end()."""
+        return _current.set(trace) if trace is not None else None
+
+    @staticmethod
+    def end(token):
+        if token is not None:
+            _current.reset(token)
+
+    def record(self, event: str, hop: str, ns: int):
+        hist = self._hists.get((event, hop))
+        if hist is None:
+            hist = self._hists.setdefault((event, hop), LatencyHistogram())
+        hist.record(ns)
+
+    def histograms(self) -> Dict[Tuple[str, str], LatencyHistogram]:
+        return dict(self._hists)
+
+    def snapshot(self) -> Dict[str, Dict[str, dict]]:
+        """{event: {hop: stats}} in hop order."""
+        out: Dict[str, Dict[str, dict]] = {}
+        for (event, hop), hist in sorted(self._hists.items(), key=lambda kv: (kv[0][0], HOPS.index(kv[0][1]))):
+            out.setdefault(event, {})[hop] = hist.snapshot()
+        return out
+
+    def reset(self):
+        self._hists = {}
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+def mark_decoded():
+    """Stamp the decode hop of the current trace, if any."""
+    trace = _current.get()
+    if trace is not None:
+        trace.mark_decoded()
+
+
+_tracker: Optional[LatencyTracker] = None
+_lock = threading.Lock()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Process-wide tracker, enabled from nats.yaml latency.enabled (default on)."""
+    global _tracker
+    if _tracker is None:
+        with _lock:
+            if _tracker is None:
+                from config import ConfigLoader
+                try:
+                    enabled = ConfigLoader().get("nats.yaml").get("latency", {}).get("enabled", True)
+                except (FileNotFoundError, ValueError):
+                    enabled = True
+                _tracker = LatencyTracker(enabled)
+                Logger.get("Latency").info(f"Per-hop latency tracking: {'on' if enabled else 'off'}")
+    return _tracker
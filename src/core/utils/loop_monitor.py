@@ -0,0 +1,175 @@
+"""
+loop_monitor.py
+---------------
+Scheduling-lag monitor for the service's asyncio loops.
+
+Each watched loop runs a probe task that sleeps `interval` and records how
+late it woke up (the time every other callback on that loop was stuck
+behind whatever was running) into a LatencyHistogram.
+
+A single watchdog thread checks the probes every interval. When a probe
+is overdue by more than `threshold`, the loop is blocked *right now*, so
+the watchdog grabs that loop thread's stack via sys._current_frames()
+and the current asyncio task: the stack of the offending callback, not
+of whoever notices afterwards. Each stall is captured once and logged.
+
+    watchdog = LoopWatchdog(interval=0.05, threshold=0.1)
+    watchdog.watch("main", asyncio.get_running_loop())
+    watchdog.start()
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Dict, NamedTuple, Optional
+
+from .latency import LatencyHistogram
+from .logger import Logger
+
+
+class Stall(NamedTuple):
+    loop: str
+    at: float            # wall clock when captured
+    lag_ms: float        # how overdue the probe was at capture time (the stall may run longer)
+    task: Optional[str]
+    stack: str
+
+
+class LoopLagMonitor:
+    """Lag probe for one loop. Created by LoopWatchdog.watch()."""
+
+    def __init__(self, name: str, loop: asyncio.AbstractEventLoop, interval: float, max_stalls: int = 20):
+        self.name = name
+        self.loop = loop
+        self.interval = interval
+        self.hist = LatencyHistogram()
+        self.stalls = deque(maxlen=max_stalls)
+        self.stall_count = 0         # lifetime total, not cleared by LoopWatchdog.reset()
+
+        self.thread_id: Optional[int] = None
+        self._due = 0                # perf_counter_ns the probe should wake at; 0 when idle
+        self._reported_due = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.loop.call_soon_threadsafe(self._start)
+
+    def _start(self):
+        self._task = self.loop.create_task(self._probe())
+
+    def stop(self):
+        if self._task and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._task.cancel)
+        self._due = 0
+
+    async def _probe(self):
+        self.thread_id = threading.get_ident()
+        interval_ns = int(self.interval * 1e9)
+        try:
+            while True:
+                self._due = time.perf_counter_ns() + interval_ns
+                await asyncio.sleep(self.interval)
+                self.hist.record(max(0, time.perf_counter_ns() - self._due))
+        finally:
+            self._due = 0
+
+    def check(self, now: int, threshold_ns: int) -> Optional[Stall]:
+        """Called from the watchdog thread; captures a stall once per overdue probe."""
+        due = self._due
+        if not due or now - due < threshold_ns or due == self._reported_due:
+            return None
+        self._reported_due = due
+
+        frame = sys._current_frames().get(self.thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame else "<no frame>"
+        try:
+            task = asyncio.current_task(self.loop)
+        except RuntimeError:
+            task = None
+        stall = Stall(self.name, time.time(), round((now - due) / 1e6, 1), task.get_name() if task else None, stack)
+        self.stalls.append(stall)
+        self.stall_count += 1
+        return stall
+
+    def snapshot(self) -> dict:
+        return {
+            **self.hist.snapshot(),
+            "stalls": self.stall_count,
+            "recent_stalls": [stall._asdict() for stall in self.stalls],
+        }
+
+
+class LoopWatchdog:
+    """
+    Args:
+        interval: seconds between lag probes (and watchdog checks).
+        threshold: lag in seconds that counts as a stall and triggers stack capture.
+    """
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1, max_stalls: int = 20):
+        self.logger = Logger.get("LoopWatchdog")
+        self.interval = interval
+        self.threshold = threshold
+        self.max_stalls = max_stalls
+        self.monitors: Dict[str, LoopLagMonitor] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def watch(self, name: str, loop: asyncio.AbstractEventLoop) -> LoopLagMonitor:
+        monitor = LoopLagMonitor(name, loop, self.interval, self.max_stalls)
+        self.monitors[name] = monitor
+        if self._thread:
+            monitor.start()
+        return monitor
+
+    def start(self):
+        if self._thread:
+            return
+        for monitor in self.monitors.values():
+            monitor.start()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        self.logger.info(
+            f"Watching loops {list(self.monitors)} (probe {self.interval * 1000:.0f}ms, "
+            f"stall threshold {self.threshold * 1000:.0f}ms)"
+        )
+
+    def stop(self):
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join(timeout=2)
+        self._thread = None
+        for monitor in self.monitors.values():
+            monitor.stop()
+
+    def _run(self):
+        threshold_ns = int(self.threshold * 1e9)
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter_ns()
+            for monitor in list(self.monitors.values()):
+                stall = monitor.check(now, threshold_ns)
+                if stall:
+                    self.logger.warning(
+                        f"Loop '{stall.loop}' blocked for {stall.lag_ms}ms+ "
+                        f"(task: {stall.task or 'none, plain callback'}):\n{stall.stack}"
+                    )
+
+    def histograms(self) -> Dict[str, LatencyHistogram]:
+        return {name: monitor.hist for name, monitor in self.monitors.items()}
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {name: monitor.snapshot() for name, monitor in self.monitors.items()}
+
+    def reset(self):
+        """
+        Clear the lag histograms and recent stalls. stall_count is a lifetime
+        total and is kept: it backs the monotonic *_loop_stalls_total counter.
+        """
+        for monitor in self.monitors.values():
+            monitor.hist = LatencyHistogram()
+            monitor.stalls.clear()
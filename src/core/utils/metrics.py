@@ -0,0 +1,143 @@
+"""
+metrics.py
+----------
+Prometheus text exposition (format 0.0.4) without a client library.
+
+Nothing here runs on the message path: collectors read counters the
+service already keeps (nats-py stats, WS sessions, latency histograms)
+when the endpoint is scraped, and build Metric families from them.
+
+    families = [
+        Metric("ground_ws_clients", "gauge", "Connected WS clients", [({}, 3)]),
+        histogram("ground_latency_seconds", "...", {("telemetry", "total"): hist}, ("event", "hop")),
+    ]
+    text = render(families)
+
+Per-subscription traffic is counted by the controllers themselves: each
+takes a SubjectCounter for the pattern it subscribes to and calls
+count(msg) in its callback, which already runs once per message.
+
+    counter = get_subject_stats().counter(subject)
+    counter.subscriptions.append(await nc.subscribe(subject, cb=handler))
+    ...
+    counter.count(msg)   # first line of handler
+"""
+
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .latency import LatencyHistogram
+
+Labels = Dict[str, str]
+
+
+class Metric(NamedTuple):
+    """One metric family; samples are (labels, value) or (suffix, labels, value)."""
+    name: str
+    kind: str          # counter | gauge | histogram
+    help: str
+    samples: List[tuple]
+
+
+class SubjectCounter:
+    """Messages and payload bytes delivered on one subscribed subject pattern."""
+
+    __slots__ = ("pattern", "messages", "bytes", "subscriptions")
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.messages = 0
+        self.bytes = 0
+        self.subscriptions = []     # nats-py Subscriptions on this pattern, for pending_msgs/pending_bytes
+
+    def count(self, msg):
+        self.messages += 1
+        self.bytes += len(msg.data)
+
+    @property
+    def pending_msgs(self) -> int:
+        return sum(sub.pending_msgs for sub in self.subscriptions)
+
+    @property
+    def pending_bytes(self) -> int:
+        return sum(sub.pending_bytes for sub in self.subscriptions)
+
+
+class SubjectStats:
+    """pattern -> SubjectCounter; counters are created at subscribe time, off the message path."""
+
+    def __init__(self):
+        self._counters: Dict[str, SubjectCounter] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, pattern: str) -> SubjectCounter:
+        with self._lock:
+            counter = self._counters.get(pattern)
+            if counter is None:
+                counter = self._counters[pattern] = SubjectCounter(pattern)
+            return counter
+
+    def counters(self) -> List[SubjectCounter]:
+        return sorted(self._counters.values(), key=lambda c: c.pattern)
+
+
+_subject_stats: Optional[SubjectStats] = None
+_lock = threading.Lock()
+
+
+def get_subject_stats() -> SubjectStats:
+    """Process-wide per-pattern NATS traffic counters."""
+    global _subject_stats
+    if _subject_stats is None:
+        with _lock:
+            if _subject_stats is None:
+                _subject_stats = SubjectStats()
+    return _subject_stats
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        if value != value:
+            return "NaN"
+        if value in (float("inf"), float("-inf")):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(int(value))
+
+
+def histogram(name: str, help: str, hists: Dict[tuple, LatencyHistogram], label_names: Tuple[str, ...]) -> Metric:
+    """
+    Export LatencyHistograms (ns) as one Prometheus histogram in seconds.
+    Only non-empty buckets are emitted; cumulative counts keep it valid.
+    """
+    samples = []
+    for key, hist in sorted(hists.items()):
+        labels = dict(zip(label_names, key))
+        for upper_ns, cumulative in hist.buckets():
+            samples.append(("_bucket", {**labels, "le": repr(upper_ns / 1e9)}, cumulative))
+        samples.append(("_bucket", {**labels, "le": "+Inf"}, hist.count))
+        samples.append(("_sum", labels, hist.total / 1e9))
+        samples.append(("_count", labels, hist.count))
+    return Metric(name, "histogram", help, samples)
+
+
+def render(families: Iterable[Metric]) -> str:
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family.name} {family.help}")
+        lines.append(f"# TYPE {family.name} {family.kind}")
+        for sample in family.samples:
+            suffix, labels, value = sample if len(sample) == 3 else ("", *sample)
+            lines.append(f"{family.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+    lines.append("")
+    return "\n".join(lines)
@@ -1,6 +1,6 @@
 # Marks this directory as a Python package
 
-from .message_factory import MessageFactory
+from .message_factory import MessageFactory, MessageTemplate, EncodedMessage
 from .subject_factory import SubjectFactory
 
-__all__ = ["MessageFactory", "SubjectFactory"]
\ No newline at end of file
+__all__ = ["MessageFactory", "MessageTemplate", "EncodedMessage", "SubjectFactory"]
\ No newline at end of file
@@ -1,15 +1,107 @@
 # services/message_factory.py
 
+import itertools
+import json
+import threading
 import uuid
 from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional
+
 from config import ConfigLoader
 from data.models import telemetry, discovery, heartbeat
 
 
+class EncodedMessage(NamedTuple):
+    """A fully serialized message plus the header fields the publisher routes on."""
+    data: bytes
+    msg_id: str
+    qos: str
+    stream: Optional[str]
+
+
+def _json_bytes(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+class MessageTemplate:
+    """
+    Pre-validated, pre-serialized message for one msg_type.
+
+    The body and the static header fields are validated against the schema
+    and encoded to bytes once. render() only splices in the runtime header
+    fields (msg_id, timestamp, sequence).
+
+    Wire layout (body always last, so receivers can slice it without parsing):
+        {"header":{"msg_type":..,"msg_id":..,"qos":..,"stream":..,
+                   "timestamp":..,"source":..,"sequence":..},"body":{..}}
+    """
+
+    def __init__(self, msg_type: str, config: Dict[str, Any], schema):
+        header_cfg = config.get("header", {})
+        body_cfg = config.get("body", {})
+
+        self.msg_type = msg_type
+        self.body = schema(**body_cfg).model_dump()
+        self.body_bytes = _json_bytes(self.body)
+
+        self.header_type = header_cfg.get("msg_type", msg_type)
+        self.qos = header_cfg.get("qos", "AT_MOST_ONCE")
+        self.stream = header_cfg.get("stream", None)
+        self.source = header_cfg.get("source", "Air-Unit")
+
+        self._head = b'{"header":{"msg_type":' + _json_bytes(self.header_type) + b',"msg_id":"'
+        self._after_id = (
+            b'","qos":' + _json_bytes(self.qos)
+            + b',"stream":' + _json_bytes(self.stream)
+            + b',"timestamp":"'
+        )
+        self._after_ts = b'","source":' + _json_bytes(self.source) + b',"sequence":'
+        self._before_body = b'},"body":'
+
+        self._sequence = itertools.count(1)
+
+    def next_sequence(self) -> int:
+        return next(self._sequence)
+
+    def header(self) -> Dict[str, Any]:
+        """Build a fresh header dict (runtime values are unique/fresh)."""
+        return {
+            "msg_type": self.header_type,
+            "msg_id": str(uuid.uuid4()),
+            "qos": self.qos,
+            "stream": self.stream,
+            "timestamp": datetime.utcnow().isoformat(),
+            "source": self.source,
+            "sequence": self.next_sequence(),
+        }
+
+    def render(self, body_bytes: Optional[bytes] = None) -> EncodedMessage:
+        """
+        Serialize a new message. body_bytes, if given, replaces the cached
+        body and must already be valid JSON for this msg_type.
+        """
+        msg_id = str(uuid.uuid4())
+        data = b"".join((
+            self._head,
+            msg_id.encode(),
+            self._after_id,
+            datetime.utcnow().isoformat().encode(),
+            self._after_ts,
+            str(self.next_sequence()).encode(),
+            self._before_body,
+            self.body_bytes if body_bytes is None else body_bytes,
+            b"}",
+        ))
+        return EncodedMessage(data, msg_id, self.qos, self.stream)
+
+
 class MessageFactory:
     """
     Factory to create full message payloads (header + body)
     using schema models and YAML-defined parameters.
+
+    Templates are compiled once per msg_type and dropped when
+    message.yaml changes on disk.
     """
 
     schema_map = {
@@ -18,35 +110,50 @@ class MessageFactory:
         "heartbeat": heartbeat.HeartbeatModel,
     }
 
-    @classmethod
-    def create(cls, msg_type: str):
-        """
-        Create a full message payload from the given msg_type.
-        Loads configuration from message.yaml and validates body using the model schema.
-        """
-        # Load YAML config
-        config = ConfigLoader().get("message.yaml")[msg_type]
+    _templates: Dict[str, MessageTemplate] = {}
+    _lock = threading.Lock()
+    _watching = False
 
-        # Extract parts
-        header_cfg = config.get("header", {})
-        body_cfg = config.get("body", {})
+    @classmethod
+    def template(cls, msg_type: str) -> MessageTemplate:
+        """Return the compiled template for msg_type, building it on first use."""
+        tpl = cls._templates.get(msg_type)
+        if tpl is not None:
+            return tpl
 
         # Validate message type
         if msg_type not in cls.schema_map:
             raise ValueError(f"Unknown message type: {msg_type}")
 
-        # Build body from schema
-        SchemaModel = cls.schema_map[msg_type]
-        body = SchemaModel(**body_cfg).model_dump()
+        with cls._lock:
+            tpl = cls._templates.get(msg_type)
+            if tpl is None:
+                loader = ConfigLoader()
+                if not cls._watching:
+                    loader.subscribe("message.yaml", cls._on_messages_changed)
+                    cls._watching = True
+                config = loader.get("message.yaml")[msg_type]
+                tpl = MessageTemplate(msg_type, config, cls.schema_map[msg_type])
+                cls._templates[msg_type] = tpl
+        return tpl
 
-        # Build header (ensure runtime values are unique/fresh)
-        header = {
-            "msg_type": header_cfg.get("msg_type", msg_type),
-            "msg_id": str(uuid.uuid4()),
-            "qos": header_cfg.get("qos", "AT_MOST_ONCE"),
-            "stream": header_cfg.get("stream", None),
-            "timestamp": datetime.utcnow().isoformat(),
-            "source": header_cfg.get("source", "Air-Unit"),
-        }
+    @classmethod
+    def _on_messages_changed(cls, filename: str, data: dict):
+        """Drop compiled templates; they are rebuilt lazily from the new file."""
+        with cls._lock:
+            cls._templates = {}
 
-        return {"header": header, "body": body}
+    @classmethod
+    def create(cls, msg_type: str):
+        """
+        Create a full message payload from the given msg_type.
+        Body values come from message.yaml, validated once by the model schema;
+        the returned body is a shallow copy of the cached one.
+        """
+        tpl = cls.template(msg_type)
+        return {"header": tpl.header(), "body": dict(tpl.body)}
+
+    @classmethod
+    def encode(cls, msg_type: str) -> EncodedMessage:
+        """Create a message already serialized to bytes, ready for NatsPublisher."""
+        return cls.template(msg_type).render()
@@ -1,7 +1,90 @@
 # subjects_factory.py
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
 from config import ConfigLoader
 
 
+class SubjectRegistry:
+    """
+    Compiled subject table built once from topic.yaml.
+
+    Holds an interned template suffix per (topic, subtopic) and a bounded
+    LRU of fully rendered subjects, so a repeat create() with the same
+    arguments is a single dict lookup with no validation or string joins.
+
+    The registry rebuilds itself when topic.yaml changes on disk.
+    """
+
+    def __init__(self, topics_map: Dict[str, list], max_rendered: int = 4096):
+        self.max_rendered = max_rendered
+        self._lock = threading.Lock()
+        self._rendered: "OrderedDict[tuple, str]" = OrderedDict()
+        self._compile(topics_map)
+
+    def _compile(self, topics_map: Dict[str, list]):
+        """Validate topic.yaml once and precompute interned '.topic.subtopic' suffixes."""
+        suffixes: Dict[Tuple[str, Optional[str]], str] = {}
+        for topic, subtopics in topics_map.items():
+            suffixes[(topic, None)] = sys.intern(f".{topic}")
+            for subtopic in subtopics or []:
+                suffixes[(topic, subtopic)] = sys.intern(f".{topic}.{subtopic}")
+
+        with self._lock:
+            self.topics_map = topics_map
+            self._suffixes = suffixes
+            self._rendered.clear()
+
+    def suffix(self, topic: str, subtopic: Optional[str]) -> str:
+        """Return the interned '.topic[.subtopic]' template, validating on the way."""
+        try:
+            return self._suffixes[(topic, subtopic or None)]
+        except KeyError:
+            if topic not in self.topics_map:
+                raise ValueError(f"Unknown topic: {topic}") from None
+            raise ValueError(
+                f"Invalid subtopic '{subtopic}' for topic '{topic}'"
+            ) from None
+
+    def render(
+        self,
+        source: str,
+        source_id: str,
+        topic: str,
+        subtopic: Optional[str],
+        mode: str,
+        remote_client_id: Optional[str],
+    ) -> str:
+        """Return the subject for these arguments, from the LRU when possible."""
+        key = (source, source_id, topic, subtopic, mode, remote_client_id)
+        rendered = self._rendered.get(key)
+        if rendered is not None:
+            try:
+                self._rendered.move_to_end(key)
+            except KeyError:
+                pass  # evicted concurrently; the value is still valid
+            return rendered
+
+        subject = f"{source}.{source_id}{self.suffix(topic, subtopic)}"
+
+        # ---- publishing requires a target ----
+        if mode == "pub":
+            if not remote_client_id:
+                raise ValueError(
+                    "remote_client_id is required when mode='pub'"
+                )
+            subject = f"{subject}.{remote_client_id}"
+
+        subject = sys.intern(subject)
+        with self._lock:
+            self._rendered[key] = subject
+            if len(self._rendered) > self.max_rendered:
+                self._rendered.popitem(last=False)
+        return subject
+
+
 class SubjectFactory:
     """
     Factory to generate standardized subjects.
@@ -14,10 +97,38 @@ class SubjectFactory:
 
     Subscribing form (generic):
         {source}.{source_id}.{topic}.{subtopic}
+
+    All instances share one SubjectRegistry compiled from topic.yaml,
+    so constructing a SubjectFactory is free.
     """
 
+    _registry: Optional[SubjectRegistry] = None
+    _registry_lock = threading.Lock()
+
     def __init__(self):
-        self.topics_map = ConfigLoader().get("topic.yaml")["Topics"]
+        self.registry = self.get_registry()
+
+    @property
+    def topics_map(self) -> Dict[str, list]:
+        return self.registry.topics_map
+
+    @classmethod
+    def get_registry(cls) -> SubjectRegistry:
+        """Return the process-wide registry, compiling topic.yaml on first use."""
+        if cls._registry is None:
+            with cls._registry_lock:
+                if cls._registry is None:
+                    loader = ConfigLoader()
+                    registry = SubjectRegistry(loader.get("topic.yaml")["Topics"])
+                    loader.subscribe("topic.yaml", cls._on_topics_changed)
+                    cls._registry = registry
+        return cls._registry
+
+    @classmethod
+    def _on_topics_changed(cls, filename: str, data: dict):
+        """Recompile the registry when topic.yaml changes on disk."""
+        if cls._registry is not None:
+            cls._registry._compile(data["Topics"])
 
     def create(
         self,
@@ -46,26 +157,6 @@ class SubjectFactory:
             PUB:
                 ground.gcs-01.search.response.airunit-001
         """
-
-        if topic not in self.topics_map:
-            raise ValueError(f"Unknown topic: {topic}")
-
-        if subtopic:
-            if subtopic not in self.topics_map[topic]:
-                raise ValueError(
-                    f"Invalid subtopic '{subtopic}' for topic '{topic}'"
-                )
-
-        parts = [source, source_id, topic]
-        if subtopic:
-            parts.append(subtopic)
-
-        # ---- publishing requires a target ----
-        if mode == "pub":
-            if not remote_client_id:
-                raise ValueError(
-                    "remote_client_id is required when mode='pub'"
-                )
-            parts.append(remote_client_id)
-
-        return ".".join(parts)
+        return self.registry.render(
+            source, source_id, topic, subtopic, mode, remote_client_id
+        )
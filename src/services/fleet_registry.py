@@ -0,0 +1,119 @@
+"""
+fleet_registry.py
+-----------------
+In-memory index of every UAV this ground instance has seen, keyed by id.
+
+Replaces the single "last UAV that answered" slot: discovery, telemetry and
+FC link responses all update the same record, and WS commands are routed
+by target_uav with an O(1) dict lookup.
+"""
+
+import time
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+
+class LinkState(str, Enum):
+    DISCOVERED = "DISCOVERED"         # Answered discovery, no FC link requested yet
+    CONNECTING = "CONNECTING"         # fcconnect request sent, awaiting response
+    CONNECTED = "CONNECTED"           # FC link confirmed by the UAV
+    DISCONNECTING = "DISCONNECTING"   # fcdisconnect request sent, awaiting response
+    DISCONNECTED = "DISCONNECTED"     # FC link closed (or connect refused)
+
+
+class UavRecord:
+    """Everything the ground side knows about one UAV."""
+
+    __slots__ = ("uav_id", "info", "capabilities", "first_seen", "last_seen", "link_state")
+
+    def __init__(self, uav_id: str, info: Optional[Dict[str, Any]] = None):
+        now = time.time()
+        self.uav_id = uav_id
+        self.info = info or {}
+        self.capabilities = list(self.info.get("capabilities") or [])
+        self.first_seen = now
+        self.last_seen = now
+        self.link_state = LinkState.DISCOVERED
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "uav_id": self.uav_id,
+            "capabilities": self.capabilities,
+            "link_state": self.link_state.value,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "info": self.info,
+        }
+
+
+class FleetRegistry:
+    """
+    uav_id -> UavRecord. All methods are O(1) except snapshot().
+    Only touched from the main event loop.
+    """
+
+    def __init__(self):
+        self._uavs: Dict[str, UavRecord] = {}
+
+    def __len__(self) -> int:
+        return len(self._uavs)
+
+    def __contains__(self, uav_id: str) -> bool:
+        return uav_id in self._uavs
+
+    def get(self, uav_id: str) -> Optional[UavRecord]:
+        return self._uavs.get(uav_id)
+
+    def upsert_discovery(self, uav_data: Dict[str, Any]) -> UavRecord:
+        """Register (or refresh) a UAV from its discovery body."""
+        uav_id = uav_data.get("client_id")
+        if not uav_id:
+            raise ValueError("Discovery data has no client_id")
+
+        record = self._uavs.get(uav_id)
+        if record is None:
+            record = self._uavs[uav_id] = UavRecord(uav_id, uav_data)
+        else:
+            record.info = uav_data
+            record.capabilities = list(uav_data.get("capabilities") or [])
+            record.last_seen = time.time()
+        return record
+
+    def touch(self, uav_id: str) -> UavRecord:
+        """Mark uav_id as seen now (e.g. on telemetry), registering it if unknown."""
+        record = self._uavs.get(uav_id)
+        if record is None:
+            record = self._uavs[uav_id] = UavRecord(uav_id)
+        else:
+            record.last_seen = time.time()
+        return record
+
+    def set_link_state(self, uav_id: str, state: LinkState) -> Optional[UavRecord]:
+        record = self._uavs.get(uav_id)
+        if record is not None:
+            record.link_state = state
+            record.last_seen = time.time()
+        return record
+
+    def resolve(self, target_uav: Optional[str]) -> str:
+        """
+        Return the UAV id a command should go to.
+        With no target, a fleet of exactly one UAV is unambiguous.
+
+        Raises:
+            KeyError: target_uav is unknown, or no target and the fleet is not exactly one UAV.
+        """
+        if target_uav:
+            if target_uav not in self._uavs:
+                raise KeyError(f"Unknown UAV: {target_uav}")
+            return target_uav
+
+        if len(self._uavs) == 1:
+            return next(iter(self._uavs))
+        raise KeyError(f"target_uav required: {len(self._uavs)} UAVs known")
+
+    def remove(self, uav_id: str) -> Optional[UavRecord]:
+        return self._uavs.pop(uav_id, None)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [record.to_dict() for record in self._uavs.values()]
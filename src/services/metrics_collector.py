@@ -0,0 +1,157 @@
+"""
+metrics_collector.py
+--------------------
+Builds the /metrics page for NetworkService from counters that already
+exist, so scraping adds no work to the message path:
+
+  NATS     nc.stats (msgs/bytes in and out, reconnects, errors), the
+           outbound buffer, and per subscribed subject pattern the
+           messages/bytes counted in the controllers' callbacks and the
+           messages/bytes still pending for them
+  WS       connected clients, frames sent/dropped, per-client queue depth
+  Latency  the per-hop histograms from core.utils.latency
+  Loops    scheduling lag and stall counts from the LoopWatchdog
+  Fleet    UAVs by link state
+  Commands pending UAV commands and how they completed (RTT is the
+           "rtt" hop of the latency histogram)
+  Recorder flight recorder writer state, backlog and dropped records
+
+Runs on the main loop when the endpoint is scraped. WS session counters
+are read from the WS thread's objects without locking; each value is a
+single int read, which is consistent enough for monitoring.
+"""
+
+from collections import Counter
+from typing import List
+
+from core.utils import get_latency_tracker, get_subject_stats
+from core.utils.metrics import Metric, histogram, render
+
+PREFIX = "ground"
+
+
+class MetricsCollector:
+    def __init__(self, service):
+        self.service = service
+        self.latency = get_latency_tracker()
+        self.subjects = get_subject_stats()
+
+    def render(self) -> str:
+        return render(self.collect())
+
+    def collect(self) -> List[Metric]:
+        families = []
+        families += self._nats()
+        families += self._ws()
+        families += self._fleet()
+        families += self._commands()
+        families.append(histogram(
+            f"{PREFIX}_latency_seconds",
+            "NATS-to-WS latency per event and hop (decode, conflate, dispatch, send, total), and command round trip (rtt)",
+            self.latency.histograms(),
+            ("event", "hop"),
+        ))
+        families += self._loops()
+        families += self._recorder()
+        return families
+
+    def _nats(self) -> List[Metric]:
+        nc = self.service.client.nc if self.service.client else None
+        if nc is None:
+            return [Metric(f"{PREFIX}_nats_connected", "gauge", "1 if the NATS client is connected", [({}, 0)])]
+
+        stats = nc.stats
+        counters = self.subjects.counters()
+
+        def per_pattern(attr):
+            return [({"pattern": c.pattern}, getattr(c, attr)) for c in counters]
+
+        return [
+            Metric(f"{PREFIX}_nats_connected", "gauge", "1 if the NATS client is connected", [({}, int(nc.is_connected))]),
+            Metric(f"{PREFIX}_nats_messages_total", "counter", "NATS messages by direction",
+                   [({"direction": "in"}, stats["in_msgs"]), ({"direction": "out"}, stats["out_msgs"])]),
+            Metric(f"{PREFIX}_nats_bytes_total", "counter", "NATS payload bytes by direction",
+                   [({"direction": "in"}, stats["in_bytes"]), ({"direction": "out"}, stats["out_bytes"])]),
+            Metric(f"{PREFIX}_nats_reconnects_total", "counter", "NATS reconnects", [({}, stats["reconnects"])]),
+            Metric(f"{PREFIX}_nats_errors_total", "counter", "-ERR messages received from the server",
+                   [({}, stats["errors_received"])]),
+            Metric(f"{PREFIX}_nats_outbound_pending_bytes", "gauge", "Bytes buffered for the next flush to the server",
+                   [({}, nc.pending_data_size)]),
+            Metric(f"{PREFIX}_nats_subject_messages_total", "counter", "Messages handled per subscribed subject pattern",
+                   per_pattern("messages")),
+            Metric(f"{PREFIX}_nats_subject_bytes_total", "counter", "Payload bytes handled per subscribed subject pattern",
+                   per_pattern("bytes")),
+            Metric(f"{PREFIX}_nats_subject_pending_messages", "gauge", "Messages waiting for their callback, per pattern",
+                   per_pattern("pending_msgs")),
+            Metric(f"{PREFIX}_nats_subject_pending_bytes", "gauge", "Bytes waiting for their callback, per pattern",
+                   per_pattern("pending_bytes")),
+        ]
+
+    def _ws(self) -> List[Metric]:
+        ws = self.service.ws_server
+        if ws is None:
+            return []
+        clients = ws.client_stats()
+        sent, dropped = ws.frame_totals()
+        by_class = Counter(c["client_class"] for c in clients)
+        per_client = lambda key: [
+            ({"client": c["remote"], "client_class": c["client_class"]}, c[key]) for c in clients
+        ]
+        return [
+            Metric(f"{PREFIX}_ws_clients", "gauge", "Connected WS clients by client class",
+                   [({"client_class": name}, n) for name, n in sorted(by_class.items())] or [({}, 0)]),
+            Metric(f"{PREFIX}_ws_frames_sent_total", "counter", "WS frames written, all clients", [({}, sent)]),
+            Metric(f"{PREFIX}_ws_frames_dropped_total", "counter", "WS frames dropped by send queue policy, all clients",
+                   [({}, dropped)]),
+            Metric(f"{PREFIX}_ws_client_queue_depth", "gauge", "Frames queued per WS client", per_client("queue_depth")),
+            Metric(f"{PREFIX}_ws_client_frames_dropped", "gauge", "Frames dropped per connected WS client",
+                   per_client("dropped")),
+        ]
+
+    def _loops(self) -> List[Metric]:
+        watchdog = self.service.watchdog
+        if watchdog is None:
+            return []
+        return [
+            histogram(f"{PREFIX}_loop_lag_seconds", "Event-loop scheduling lag per loop",
+                      {(name,): hist for name, hist in watchdog.histograms().items()}, ("loop",)),
+            Metric(f"{PREFIX}_loop_stalls_total", "counter", "Lag probes overdue past the stall threshold",
+                   [({"loop": name}, m.stall_count) for name, m in watchdog.monitors.items()]),
+        ]
+
+    def _commands(self) -> List[Metric]:
+        egress = self.service._cmd_egress
+        if egress is None:
+            return []
+        stats = egress.pending.stats()
+        return [
+            Metric(f"{PREFIX}_commands_pending", "gauge", "Commands sent to UAVs awaiting a response",
+                   [({}, stats["pending"])]),
+            Metric(f"{PREFIX}_commands_total", "counter",
+                   "UAV commands by outcome (correlated reply, FIFO-matched legacy response, timeout, no responders)",
+                   [({"outcome": outcome}, stats[outcome])
+                    for outcome in ("sent", "correlated", "fifo", "timeout", "no_responders")]),
+            Metric(f"{PREFIX}_command_responses_unmatched_total", "counter",
+                   "Command responses with no pending command (unsolicited or late)", [({}, stats["unmatched"])]),
+        ]
+
+    def _recorder(self) -> List[Metric]:
+        recorder = self.service.recorder
+        if recorder is None:
+            return []
+        stats = recorder.stats()
+        return [
+            Metric(f"{PREFIX}_recorder_writer_up", "gauge", "1 while the flight recorder writer thread is running",
+                   [({}, int(stats["running"]))]),
+            Metric(f"{PREFIX}_recorder_queued", "gauge", "Records waiting for the flight recorder writer",
+                   [({}, stats["queued"])]),
+            Metric(f"{PREFIX}_recorder_records_total", "counter", "Records written by the flight recorder",
+                   [({}, stats["records"])]),
+            Metric(f"{PREFIX}_recorder_dropped_total", "counter",
+                   "Records not recorded (queue full, writer failed, or too large)", [({}, stats["dropped"])]),
+        ]
+
+    def _fleet(self) -> List[Metric]:
+        states = Counter(uav["link_state"] for uav in self.service.fleet.snapshot())
+        return [Metric(f"{PREFIX}_uavs", "gauge", "Known UAVs by FC link state",
+                       [({"link_state": state}, n) for state, n in sorted(states.items())])]
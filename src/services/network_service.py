@@ -1,16 +1,26 @@
 # ws implementation
 
 import asyncio
+import hmac
+import signal
+import threading
 from typing import Optional
 from config import ConfigLoader
-from core.comms import NatsClient, NatsNode, WebSocketServer # IPCServer commented out
-from core.utils import Logger
+from core.comms import NatsClient, NatsNode, WebSocketServer, MetricsServer # IPCServer commented out
+from core.utils import Logger, LoopWatchdog, SamplingProfiler, get_latency_tracker
+from core.recorder import FlightRecorder
 from controllers import DiscoveryController, CommandEgressController, TelemetryController
+from .telemetry_conflator import TelemetryConflator
+from .telemetry_store import TelemetryStore
+from .telemetry_analytics import TelemetryAnalytics
+from .fleet_registry import FleetRegistry, LinkState
+from .metrics_collector import MetricsCollector
 
 class NetworkService:
     def __init__(self, config_file: str = "nats.yaml"):
         self.logger = Logger.get("NetworkService")
         self.loader = ConfigLoader()
+        self.config_file = config_file
         self.config = self.loader.get(config_file)
         self.loop = None  # Add this to store the reference
         
@@ -19,6 +29,16 @@ class NetworkService:
         self.ws_server: Optional[WebSocketServer] = None
         self.discovery: Optional[DiscoveryController] = None
         self._cmd_egress: Optional[CommandEgressController] = None
+        self.conflator: Optional[TelemetryConflator] = None
+        self.telemetry_store: Optional[TelemetryStore] = None
+        self.analytics: Optional[TelemetryAnalytics] = None
+        self.recorder: Optional[FlightRecorder] = None
+        self.metrics: Optional[MetricsServer] = None
+        self.watchdog: Optional[LoopWatchdog] = None
+        self.profiler: Optional[SamplingProfiler] = None
+        self._main_thread_id: Optional[int] = None
+        self._tasks = set()     # in-flight tasks started by _dispatch
+        self.fleet = FleetRegistry()
         
         # NATS Client Setup
         nats_cfg = self.config.get("nats", {})
@@ -34,6 +54,13 @@ class NetworkService:
         try:
             # ✅ CAPTURE THE RUNNING LOOP HERE
             self.loop = asyncio.get_running_loop()
+            self._main_thread_id = threading.get_ident()
+
+            # 0. Live config: cached YAML is re-parsed only when a file changes
+            self.loader.subscribe(self.config_file, self._on_config_changed)
+            ConfigLoader.start_watcher(
+                interval=self.config.get("config", {}).get("watch_interval", 1.0)
+            )
 
             # 1. Start NATS Node
             self.node = NatsNode(self.config.get("config_file", [])[0])
@@ -42,28 +69,211 @@ class NetworkService:
             # 2. Connect NATS Client
             await self.client.connect()
 
+            # Flight recorder: raw copy of every NATS message the controllers receive
+            recorder_cfg = self.config.get("recorder", {})
+            if recorder_cfg.get("enabled", False):
+                self.recorder = FlightRecorder(
+                    recorder_cfg.get("directory", "recordings"),
+                    segment_size=int(recorder_cfg.get("segment_size_mb", 64) * 1024 * 1024),
+                    index_interval=recorder_cfg.get("index_interval", 1.0),
+                    max_queue=int(recorder_cfg.get("max_queue", 65536)),
+                )
+                self.recorder.start()
+
             # Initialize ComandEgressController
-            self._cmd_egress = CommandEgressController(self.client, self.client_id, self.on_conn_response, self.on_disconn_response, self.on_mission_upload_response)
+            self._cmd_egress = CommandEgressController(
+                self.client, self.client_id, self.on_conn_response, self.on_disconn_response, self.on_mission_upload_response,
+                recorder=self.recorder,
+                on_command_failed=self._on_command_failed,
+                timeouts=self.config.get("commands", {}).get("timeouts"),
+            )
             await self._cmd_egress.activate()
 
             # init telemetry controler
-            self.telemetry = TelemetryController(self.client, self.client_id, self.on_telemetry_update)
+            telem_cfg = self.config.get("telemetry", {})
+            history_cfg = telem_cfg.get("history", {})
+            if history_cfg.get("enabled", False):
+                self.telemetry_store = TelemetryStore(
+                    history_cfg.get("fields", []),
+                    capacity=history_cfg.get("capacity", 600),
+                    max_uavs=history_cfg.get("max_uavs", 32),
+                )
+                self.logger.info(
+                    f"Telemetry history: {len(self.telemetry_store.fields)} fields, "
+                    f"{self.telemetry_store.bytes_per_uav} bytes per UAV"
+                )
+            self.telemetry = TelemetryController(
+                self.client,
+                self.client_id,
+                self.on_telemetry_update,
+                on_telemetry_raw=self.on_telemetry_raw,
+                passthrough=telem_cfg.get("passthrough", False),
+                store=self.telemetry_store,
+                recorder=self.recorder,
+            )
             await self.telemetry.activate()
 
+            # Discovery: one long-lived subscription for the life of the service
+            disc_cfg = self.config.get("discovery", {})
+            self.discovery = DiscoveryController(
+                self.client,
+                self.client_id,
+                on_uav_discovered=self._on_uav_discovered,
+                on_uav_seen=self._on_uav_seen,
+                ttl=disc_cfg.get("ttl", 30.0),
+                min_response_interval=disc_cfg.get("min_response_interval", 1.0),
+                refresh_interval=disc_cfg.get("refresh_interval", 1.0),
+                recorder=self.recorder,
+            )
+            await self.discovery.activate()
+
             # 3. Start WebSocket Server
             ws_cfg = self.config.get("ws", {})
+            queue_cfg = ws_cfg.get("send_queue", {})
             self.ws_server = WebSocketServer(
                 host=ws_cfg.get("host", "0.0.0.0"),
-                port=ws_cfg.get("port", 3000)
+                port=ws_cfg.get("port", 3000),
+                max_queue=queue_cfg.get("max_size", 256),
+                block_timeout=queue_cfg.get("block_timeout", 2.0),
+                policies=queue_cfg.get("policies"),
             )
-            self.ws_server.start()
+            if ws_cfg.get("mode", "threaded") == "inline":
+                # Same loop as NATS: no cross-thread hop in either direction
+                await self.ws_server.start_async()
+            else:
+                self.ws_server.start()
             self.register_ws_handlers()
+
+            # 4. Conflate telemetry per UAV before it reaches WS clients
+            conflation_cfg = ws_cfg.get("conflation", {})
+            if conflation_cfg.get("enabled", False):
+                rates = conflation_cfg.get("client_classes", {})
+                self.ws_server.set_client_classes(rates.keys())
+                self.conflator = TelemetryConflator(self.ws_server, rates)
+                self.conflator.start()
+
+            # 5. Fleet-wide derived metrics from the telemetry history
+            analytics_cfg = self.config.get("analytics", {})
+            if analytics_cfg.get("enabled", False):
+                if self.telemetry_store:
+                    self.analytics = TelemetryAnalytics(
+                        self.telemetry_store,
+                        self.ws_server,
+                        analytics_cfg.get("fields", {}),
+                        interval=analytics_cfg.get("interval", 1.0),
+                        window=analytics_cfg.get("window", 10.0),
+                        samples=analytics_cfg.get("samples", 64),
+                        stale_after=analytics_cfg.get("stale_after", 3.0),
+                    )
+                    self.analytics.start()
+                else:
+                    self.logger.warning("Analytics needs telemetry.history enabled; skipping")
+
+            # 6. Scheduling lag of the main loop and (threaded mode) the WS loop
+            monitor_cfg = self.config.get("loop_monitor", {})
+            if monitor_cfg.get("enabled", False):
+                self.watchdog = LoopWatchdog(
+                    interval=monitor_cfg.get("interval", 0.05),
+                    threshold=monitor_cfg.get("threshold", 0.1),
+                )
+                self.watchdog.watch("main", self.loop)
+                if not self.ws_server.inline:
+                    if await asyncio.to_thread(self.ws_server.ready.wait, 5):
+                        self.watchdog.watch("ws", self.ws_server.loop)
+                    else:
+                        self.logger.warning("WS loop not ready; only the main loop is monitored")
+                self.watchdog.start()
+
+            # 7. On-demand sampling profiler ('profiler' WS event, or SIGUSR1 to toggle)
+            profiler_cfg = self.config.get("profiler", {})
+            self.profiler = SamplingProfiler(
+                profiler_cfg.get("output_dir", "profiles"),
+                interval=profiler_cfg.get("interval", 0.01),
+            )
+            if hasattr(signal, "SIGUSR1"):  # not on Windows
+                try:
+                    self.loop.add_signal_handler(signal.SIGUSR1, self._toggle_profiler)
+                except (NotImplementedError, RuntimeError, ValueError) as e:
+                    self.logger.warning(f"SIGUSR1 profiler toggle unavailable: {e}")
+
+            # 8. Prometheus text endpoint for bus and fan-out health
+            metrics_cfg = self.config.get("metrics", {})
+            if metrics_cfg.get("enabled", False):
+                self.metrics = MetricsServer(
+                    MetricsCollector(self).render,
+                    host=metrics_cfg.get("host", "127.0.0.1"),
+                    port=metrics_cfg.get("port", 9108),
+                )
+                await self.metrics.start()
+
             self.logger.info("All communication layers ready.")
 
         except Exception as e:
             self.logger.error(f"Startup failed: {e}")
             await self.stop_service()
 
+    # Sections built into long-lived objects at startup; edits take effect on restart
+    _RESTART_SECTIONS = ("nats", "codec", "recorder", "analytics", "loop_monitor", "metrics", "latency", "config")
+
+    def _on_config_changed(self, filename: str, data: dict):
+        """Called from the config watcher thread when nats.yaml changes on disk."""
+        if self.loop and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._apply_config, filename, data)
+        else:
+            self.config = data
+
+    def _apply_config(self, filename: str, data: dict):
+        """
+        Runs on the main loop. Pushes the live-tunable settings (discovery
+        intervals, command timeouts, telemetry passthrough, WS send queues,
+        conflation rates) into the running components; the profiler reads
+        self.config per request. Anything else is logged as needing a restart.
+        """
+        old, self.config = self.config, data
+        changed = sorted(k for k in {*old, *data} if old.get(k) != data.get(k))
+        self.logger.info(f"Config reloaded: {filename} (changed: {', '.join(changed) or 'nothing'})")
+
+        try:
+            if self.discovery:
+                disc_cfg = data.get("discovery", {})
+                self.discovery.ttl = disc_cfg.get("ttl", 30.0)
+                self.discovery.min_response_interval = disc_cfg.get("min_response_interval", 1.0)
+                self.discovery.refresh_interval = disc_cfg.get("refresh_interval", 1.0)
+
+            if self._cmd_egress:
+                self._cmd_egress.pending.timeouts = {"default": 5.0, **(data.get("commands", {}).get("timeouts") or {})}
+
+            telem_cfg = data.get("telemetry", {})
+            if self.telemetry:
+                self.telemetry.passthrough = telem_cfg.get("passthrough", False) and self.telemetry.on_telemetry_raw is not None
+            if old.get("telemetry", {}).get("history") != telem_cfg.get("history"):
+                self.logger.warning("telemetry.history changes take effect on restart")
+
+            ws_cfg = data.get("ws", {})
+            if self.ws_server:
+                queue_cfg = ws_cfg.get("send_queue", {})
+                self.ws_server.configure(
+                    max_queue=queue_cfg.get("max_size", 256),
+                    block_timeout=queue_cfg.get("block_timeout", 2.0),
+                    policies=queue_cfg.get("policies"),
+                )
+            conflation_cfg = ws_cfg.get("conflation", {})
+            if self.conflator and conflation_cfg.get("enabled", False):
+                rates = conflation_cfg.get("client_classes", {})
+                self.ws_server.set_client_classes(rates.keys())
+                self.conflator.set_rates(rates)
+            elif bool(self.conflator) != bool(conflation_cfg.get("enabled", False)):
+                self.logger.warning("ws.conflation.enabled changes take effect on restart")
+            for key in ("host", "port", "mode"):
+                if old.get("ws", {}).get(key) != ws_cfg.get(key):
+                    self.logger.warning(f"ws.{key} changes take effect on restart")
+        except (ValueError, TypeError) as e:
+            self.logger.error(f"Could not apply reloaded config: {e}")
+
+        restart = [k for k in changed if k in self._RESTART_SECTIONS]
+        if restart:
+            self.logger.warning(f"Changes to {', '.join(restart)} take effect on restart")
+
     def register_ws_handlers(self):
         """Registers events for the WebSocket thread."""
         self.ws_server.listen_event("search_for_uavs", self._handle_ws_search_wrapper)
@@ -72,6 +282,39 @@ class NetworkService:
         self.ws_server.listen_event("disconnect_from_fc", self._handle_ws_fc_disconnect_wrapper)
         # mission handelers
         self.ws_server.listen_event("mission_upload", self._handle_ws_mission_upload_wrapper)
+        # fleet
+        self.ws_server.listen_event("list_uavs", self._handle_ws_list_uavs)
+        self.ws_server.listen_event("telemetry_history", self._handle_ws_telemetry_history)
+        # diagnostics
+        self.ws_server.listen_event("latency_stats", self._handle_ws_latency_stats)
+        self.ws_server.listen_event("loop_lag_stats", self._handle_ws_loop_lag_stats)
+        self.ws_server.listen_event("profiler", self._handle_ws_profiler)
+
+    def _dispatch(self, coro):
+        """
+        Run coro as a task on the main loop. In inline WS mode handlers
+        already run there, so it is spawned directly instead of hopping
+        threads. Tasks are held in self._tasks until done.
+        """
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self._spawn(coro)
+        else:
+            self.loop.call_soon_threadsafe(self._spawn, coro)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = self.loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error(f"WS command task failed: {task.exception()!r}")
 
     def _handle_ws_search_wrapper(self, sid, data):
         """
@@ -82,23 +325,27 @@ class NetworkService:
 
         if self.loop and self.loop.is_running():
             # ✅ Use the stored loop reference instead of get_event_loop()
-            asyncio.run_coroutine_threadsafe(self._handle_search_for_uavs(), self.loop)
+            self._dispatch(self._handle_search_for_uavs(sid))
         else:
             self.logger.error("Main event loop is not running. Cannot handle search.")
 
-    async def _handle_search_for_uavs(self):
-        """The actual async logic."""
+    async def _handle_search_for_uavs(self, sid=None):
+        """
+        Discovery is always listening; re-send the UAVs it currently
+        knows to the requesting client instead of restarting it.
+        """
         self.logger.info("Triggering UAV Discovery logic...")
         try:
-            if self.discovery:
-                await self.discovery.deactivate()
-
-            self.discovery = DiscoveryController(
-                self.client,
-                self.client_id,
-                on_uav_discovered=self._on_uav_discovered
-            )
+            if not self.discovery:
+                self.logger.error("Discovery controller not initialized")
+                return
             await self.discovery.activate()
+
+            if self.ws_server:
+                for uav_data in self.discovery.known_uavs():
+                    self.ws_server.send_event(
+                        "uav_discovered", uav_data, to=sid, uav_id=uav_data.get("client_id")
+                    )
         except Exception as e:
             self.logger.error(f"Discovery failed: {e}")
 
@@ -106,78 +353,271 @@ class NetworkService:
         """Callback from controller to send data back to WS clients."""
         self.logger.info(f"Found: {uav_data.get('client_id')}")
         self.logger.info(f"{uav_data}")
+        try:
+            self.fleet.upsert_discovery(uav_data)
+        except ValueError as e:
+            self.logger.warning(f"Ignoring discovery data: {e}")
+            return
         if self.ws_server:
-            self.ws_server.send_event("uav_discovered", uav_data)
+            self.ws_server.send_event("uav_discovered", uav_data, uav_id=uav_data.get("client_id"))
+
 
+    def _on_uav_seen(self, uav_id: str):
+        """Repeat discovery request from a known, unchanged UAV."""
+        self.fleet.touch(uav_id)
 
     # --- FC Connection Wrappers ---
 
     def _handle_ws_fc_connect_wrapper(self, sid, data):
         self.logger.info(f"WS Event 'connect_to_fc' from {sid}")
         if self.loop and self.loop.is_running():
-            asyncio.run_coroutine_threadsafe(self._handle_fc_connect(data), self.loop)
+            self._dispatch(self._handle_fc_connect(data, sid))
 
     def _handle_ws_fc_disconnect_wrapper(self, sid, data):
         self.logger.info(f"WS Event 'disconnect_from_fc' from {sid}")
         if self.loop and self.loop.is_running():
-            asyncio.run_coroutine_threadsafe(self._handle_fc_disconnect(data), self.loop)
+            self._dispatch(self._handle_fc_disconnect(data, sid))
+
+    # --- Fleet routing ---
+
+    def _handle_ws_list_uavs(self, sid, data):
+        """Reply to the requesting client with every UAV in the fleet registry."""
+        if self.loop and self.loop.is_running():
+            self._dispatch(self._send_fleet(sid))
+
+    async def _send_fleet(self, sid):
+        if self.ws_server:
+            self.ws_server.send_event("uav_list", self.fleet.snapshot(), to=sid)
+
+    def _handle_ws_telemetry_history(self, sid, data):
+        """{uav, fields?, since?, limit?} -> 'telemetry_history' reply to the requester."""
+        if self.loop and self.loop.is_running():
+            self._dispatch(self._send_telemetry_history(sid, data if isinstance(data, dict) else {}))
+
+    async def _send_telemetry_history(self, sid, data: dict):
+        uav_id = data.get("uav")
+        try:
+            if not self.telemetry_store:
+                raise KeyError("Telemetry history is disabled")
+            reply = self.telemetry_store.history(
+                uav_id, data.get("fields"), data.get("since"), data.get("limit")
+            )
+        except KeyError as e:
+            reply = {"uav": uav_id, "error": e.args[0]}
+        except (TypeError, ValueError) as e:
+            reply = {"uav": uav_id, "error": f"Bad telemetry_history request: {e}"}
+        if self.ws_server:
+            self.ws_server.send_event("telemetry_history", reply, to=sid)
+
+    def _handle_ws_latency_stats(self, sid, data):
+        """Reply with per-hop latency percentiles; {"reset": true} clears them afterwards."""
+        tracker = get_latency_tracker()
+        self.ws_server.send_event("latency_stats", tracker.snapshot(), to=sid)
+        if isinstance(data, dict) and data.get("reset"):
+            tracker.reset()
+
+    def _handle_ws_loop_lag_stats(self, sid, data):
+        """Reply with lag percentiles and recent stall stacks per loop; {"reset": true} clears them."""
+        reply = self.watchdog.snapshot() if self.watchdog else {"error": "Loop monitor is disabled"}
+        self.ws_server.send_event("loop_lag_stats", reply, to=sid)
+        if self.watchdog and isinstance(data, dict) and data.get("reset"):
+            self.watchdog.reset()
+
+    # --- Profiler ---
+
+    def _handle_ws_profiler(self, sid, data):
+        """
+        {"action": "start"|"stop"|"status", "token", "duration"?, "interval"?} -> 'profiler_status' reply.
+        Only clients presenting profiler.token may use it; with no token configured the event is refused.
+        """
+        data = data if isinstance(data, dict) else {}
+        token = str(self.config.get("profiler", {}).get("token") or "")
+        if not token or not hmac.compare_digest(str(data.get("token", "")).encode(), token.encode()):
+            self.logger.warning("Refused 'profiler' event: missing or wrong token")
+            self.ws_server.send_event("profiler_status", {"error": "Not authorized"}, to=sid)
+            return
+        if self.loop and self.loop.is_running():
+            self._dispatch(self._profiler_command(data.get("action", "status"), data, sid))
+
+    def _toggle_profiler(self):
+        """SIGUSR1 handler (runs on the main loop). Needs no token: the sender already controls the process."""
+        action = "stop" if self.profiler and self.profiler.running else "start"
+        self._spawn(self._profiler_command(action, {}))
+
+    def _profile_threads(self) -> dict:
+        threads = {"main": self._main_thread_id}
+        if self.ws_server and not self.ws_server.inline and self.ws_server._loop_thread_id:
+            threads["ws"] = self.ws_server._loop_thread_id
+        return threads
+
+    async def _profiler_command(self, action: str, data: dict, sid=None):
+        cfg = self.config.get("profiler", {})
+        reply = {}
+        try:
+            if not self.profiler:
+                raise RuntimeError("Profiler not initialized")
+            if action == "start":
+                # Read per request so profiling can be allowed by editing nats.yaml (hot reload)
+                if not cfg.get("enabled", False):
+                    raise RuntimeError("Profiler is disabled (profiler.enabled in nats.yaml)")
+                max_duration = cfg.get("max_duration", 300.0)
+                duration = data.get("duration")
+                self.profiler.start(
+                    self._profile_threads(),
+                    duration=max_duration if duration is None else duration,
+                    interval=data.get("interval"),
+                    max_duration=max_duration,
+                )
+            elif action == "stop":
+                reply["output"] = await asyncio.to_thread(self.profiler.stop)
+            elif action != "status":
+                raise ValueError(f"Unknown profiler action '{action}'")
+        except (RuntimeError, ValueError, TypeError) as e:
+            self.logger.warning(f"Profiler {action} failed: {e}")
+            reply["error"] = str(e)
+
+        if self.profiler:
+            reply = {**self.profiler.status(), **reply}
+        if self.ws_server and sid is not None:
+            self.ws_server.send_event("profiler_status", reply, to=sid)
+
+    def _resolve_target(self, data, command: str, sid=None):
+        """
+        Map a WS command payload to a known UAV id via its 'target_uav'.
+        On failure the issuing client gets a 'command_error' and None is returned.
+        """
+        target = data.get("target_uav") if isinstance(data, dict) else None
+        try:
+            return self.fleet.resolve(target)
+        except KeyError as e:
+            reason = e.args[0]
+            self.logger.error(f"Cannot route '{command}': {reason}")
+            if self.ws_server and sid is not None:
+                self.ws_server.send_event(
+                    "command_error",
+                    {"command": command, "target_uav": target, "error": reason},
+                    to=sid,
+                )
+            return None
 
     # --- Core FC Logic (Completed) ---
 
-    async def _handle_fc_connect(self, data: dict):
+    async def _handle_fc_connect(self, data: dict, sid=None):
         """Logic to establish connection with the Flight Controller via NATS."""
-        uav_id: str = self.discovery.remote_client_id if self.discovery else "airunit-001" #TODO-remove the hardcode of id
+        uav_id = self._resolve_target(data, "connect_to_fc", sid)
+        if uav_id is None:
+            return
 
         self.logger.info(f"Attempting to trigger FC connect for UAV: {uav_id}")
         
         try:
             if self._cmd_egress:
                 # Use the CommandEgressController to build the subject and publish to NATS
-                await self._cmd_egress.send_connect_request(uav_id)
+                await self._cmd_egress.send_connect_request(uav_id, requester=sid)
+                self.fleet.set_link_state(uav_id, LinkState.CONNECTING)
             else:
                 self.logger.error("CommandEgressController not initialized")
 
         except Exception as e:
             self.logger.error(f"Failed to relay FC Connection command: {e}")
 
-    async def _handle_fc_disconnect(self, data: dict):
+    async def _handle_fc_disconnect(self, data: dict, sid=None):
         """Logic to tear down connection with the Flight Controller via NATS."""
-        uav_id: str = self.discovery.remote_client_id if self.discovery else "airunit-001" #TODO-remove the hardcode of id
+        uav_id = self._resolve_target(data, "disconnect_from_fc", sid)
+        if uav_id is None:
+            return
 
         self.logger.info(f"Attempting to trigger FC disconnect for UAV: {uav_id}")
         
         try:
             if self._cmd_egress:
                 # Use the CommandEgressController to build the subject and publish to NATS
-                await self._cmd_egress.send_disconnect_request(uav_id)
+                await self._cmd_egress.send_disconnect_request(uav_id, requester=sid)
+                self.fleet.set_link_state(uav_id, LinkState.DISCONNECTING)
             else:
                 self.logger.error("CommandEgressController not initialized")
 
         except Exception as e:
             self.logger.error(f"Failed to relay FC Disconnection command: {e}")
 
-    async def on_conn_response(self, conn_response: dict):
-        """Sends connection response back to WS clients."""
+    def _send_command_response(self, event: str, uav_id: str, response: dict, request=None):
+        """
+        A response to a tracked command goes only to the client that issued
+        it, tagged with request_id and rtt_ms; unsolicited ones are broadcast.
+        """
+        if not self.ws_server:
+            return
+        if request is None:
+            self.ws_server.send_event(event, response, uav_id=uav_id)
+        else:
+            payload = {**response, "request_id": request.id, "rtt_ms": request.rtt_ms}
+            self.ws_server.send_event(event, payload, to=request.requester, uav_id=uav_id)
+
+    def _on_command_failed(self, request):
+        """Timed out or no responders: tell the issuer and undo the pending link state."""
+        if request.command == "fcconnect":
+            self._revert_link_state(request.uav_id, LinkState.CONNECTING, LinkState.DISCONNECTED)
+        elif request.command == "fcdisconnect":
+            self._revert_link_state(request.uav_id, LinkState.DISCONNECTING, LinkState.CONNECTED)
+        if self.ws_server and request.requester is not None:
+            self.ws_server.send_event(
+                "command_error",
+                {
+                    "command": request.command,
+                    "target_uav": request.uav_id,
+                    "request_id": request.id,
+                    "error": request.error,
+                },
+                to=request.requester,
+            )
+
+    def _revert_link_state(self, uav_id: str, pending: LinkState, previous: LinkState):
+        record = self.fleet.get(uav_id)
+        if record and record.link_state == pending:
+            self.fleet.set_link_state(uav_id, previous)
+
+    async def on_conn_response(self, uav_id: str, conn_response: dict, request=None):
+        """Sends connection response back to the issuing WS client."""
         try:
-            self.logger.info(f"Got response for fc-connection: {conn_response}")
-            if self.ws_server:
-                self.ws_server.send_event("fc_connection_res", conn_response)
+            self.logger.info(f"Got response for fc-connection from [{uav_id}]: {conn_response}")
+            self.fleet.touch(uav_id)
+            self.fleet.set_link_state(
+                uav_id, LinkState.CONNECTED if conn_response.get("connected") else LinkState.DISCONNECTED
+            )
+            self._send_command_response("fc_connection_res", uav_id, conn_response, request)
         except Exception as e:
             self.logger.error(f"Failed to send FC connection response: {e}")
 
-    async def on_disconn_response(self, disconn_response: dict):
-        """Sends disconnection response back to WS clients."""
+    async def on_disconn_response(self, uav_id: str, disconn_response: dict, request=None):
+        """Sends disconnection response back to the issuing WS client."""
         try:
-            self.logger.info(f"Got response for fc-disconnection: {disconn_response}")
-            if self.ws_server:
-                self.ws_server.send_event("fc_disconnection_res", disconn_response)
+            self.logger.info(f"Got response for fc-disconnection from [{uav_id}]: {disconn_response}")
+            self.fleet.touch(uav_id)
+            self.fleet.set_link_state(
+                uav_id, LinkState.CONNECTED if disconn_response.get("connected") else LinkState.DISCONNECTED
+            )
+            self._send_command_response("fc_disconnection_res", uav_id, disconn_response, request)
         except Exception as e:
             self.logger.error(f"Failed to send FC disconnection response: {e}")
 
-    async def on_telemetry_update(self, telemetry_data:dict):
+    async def on_telemetry_update(self, uav_id: str, telemetry_data:dict):
         try:
-            if self.ws_server:
-                self.ws_server.send_event("telemetry_update", telemetry_data)
+            self.fleet.touch(uav_id)
+            if self.conflator:
+                self.conflator.push(uav_id, telemetry_data)
+            elif self.ws_server:
+                self.ws_server.send_event("telemetry_update", telemetry_data, uav_id=uav_id)
+        except Exception as e:
+            self.logger.error(f"Failed to send telemetry update: {e}")
+
+    async def on_telemetry_raw(self, uav_id: str, body: bytes):
+        """Passthrough path: body is still JSON bytes, framed for WS without re-encoding."""
+        try:
+            self.fleet.touch(uav_id)
+            if self.conflator:
+                self.conflator.push(uav_id, body)
+            elif self.ws_server:
+                self.ws_server.send_raw("telemetry_update", body, uav_id=uav_id)
         except Exception as e:
             self.logger.error(f"Failed to send telemetry update: {e}")
             
@@ -186,30 +626,42 @@ class NetworkService:
     def _handle_ws_mission_upload_wrapper(self, sid, data):
         self.logger.info(f"WS Event 'mission_upload' from {sid}")
         if self.loop and self.loop.is_running():
-            asyncio.run_coroutine_threadsafe(self._handle_mission_upload(data), self.loop)
+            self._dispatch(self._handle_mission_upload(data, sid))
 
-    async def _handle_mission_upload(self, data: dict):
-        """Logic to upload mission to the Flight Controller via NATS."""
-        uav_id: str = self.discovery.remote_client_id if self.discovery else "airunit-001" #TODO-remove the hardcode of id
+    async def _handle_mission_upload(self, data, sid=None):
+        """
+        Logic to upload mission to the Flight Controller via NATS.
+        Accepts {"target_uav", "mission": <dict | list>}, or the mission dict
+        itself with "target_uav" alongside; only the mission is forwarded.
+        """
+        uav_id = self._resolve_target(data, "mission_upload", sid)
+        if uav_id is None:
+            return
+
+        if isinstance(data, dict):
+            if "mission" in data:
+                data = data["mission"]
+            else:
+                data = {k: v for k, v in data.items() if k != "target_uav"}
 
         self.logger.info(f"Attempting to trigger mission upload for UAV: {uav_id}")
         
         try:
             if self._cmd_egress:
                 # Use the CommandEgressController to build the subject and publish to NATS
-                await self._cmd_egress.send_mission(uav_id, data)
+                await self._cmd_egress.send_mission(uav_id, data, requester=sid)
             else:
                 self.logger.error("CommandEgressController not initialized")
 
         except Exception as e:
             self.logger.error(f"Failed to relay Mission Upload command: {e}")        
 
-    async def on_mission_upload_response(self, response: dict):
-        """Sends mission upload response back to WS clients."""
+    async def on_mission_upload_response(self, uav_id: str, response: dict, request=None):
+        """Sends mission upload response back to the issuing WS client."""
         try:
-            self.logger.info(f"Got response for mission upload: {response}")
-            if self.ws_server:
-                self.ws_server.send_event("mission_upload_res", response)
+            self.logger.info(f"Got response for mission upload from [{uav_id}]: {response}")
+            self.fleet.touch(uav_id)
+            self._send_command_response("mission_upload_res", uav_id, response, request)
         except Exception as e:
             self.logger.error(f"Failed to send mission upload response: {e}")        
 
@@ -217,12 +669,39 @@ class NetworkService:
     async def stop_service(self):
         """Lifecycle Stop"""
         self.logger.info("Shutting down...")
+        self.loader.unsubscribe(self.config_file, self._on_config_changed)
+        ConfigLoader.stop_watcher()
+        if self.metrics:
+            await self.metrics.stop()
+        if self.watchdog:
+            self.watchdog.stop()
+        if self.profiler:
+            if hasattr(signal, "SIGUSR1") and self.loop:
+                self.loop.remove_signal_handler(signal.SIGUSR1)
+            if self.profiler.running:
+                await asyncio.to_thread(self.profiler.stop)
         if self.discovery:
             await self.discovery.deactivate()
+        if self._cmd_egress:
+            await self._cmd_egress.deactivate()
+        if self.analytics:
+            await self.analytics.stop()
+        if self.conflator:
+            await self.conflator.stop()
         if self.ws_server:
-            self.ws_server.stop()
+            if self.ws_server.inline:
+                await self.ws_server.stop_async()
+            else:
+                self.ws_server.stop()
+        if self._tasks:
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
         if self.client:
             await self.client.close()
+        if self.recorder:
+            # Joins the writer thread after it drains the queue
+            await asyncio.to_thread(self.recorder.stop)
         if self.node:
             await self.node.stop()
 
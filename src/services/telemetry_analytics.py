@@ -0,0 +1,167 @@
+"""
+telemetry_analytics.py
+----------------------
+Periodic fleet-wide derived metrics computed from TelemetryStore.
+
+Every interval, the last `samples` history rows of every UAV are gathered
+into one [n_uavs, samples] block per field, and all metrics are computed
+over the whole fleet in batched NumPy operations:
+
+    battery_drain_rate   battery units/s lost (least-squares slope over window)
+    time_to_empty        seconds until battery reaches 0 at that rate
+    climb_rate           m/s (slope of altitude over window)
+    ground_speed         m/s (hypot of the newest vx, vy)
+    last_seen_age        seconds since the newest sample
+    stale                last_seen_age > stale_after
+
+One `telemetry_derived` WS event is sent per UAV, so per-UAV subscriptions apply.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from core.utils import Logger
+
+
+class TelemetryAnalytics:
+    """
+    Args:
+        store: TelemetryStore to read from.
+        ws_server: WebSocketServer to emit into.
+        fields: metric input -> store field name (keys: battery, altitude, vx, vy).
+        interval: seconds between evaluations.
+        window: only samples newer than now - window feed the slopes.
+        samples: max history rows per UAV considered per evaluation.
+        stale_after: seconds without telemetry before a UAV is flagged stale.
+    """
+
+    def __init__(self, store, ws_server, fields: Dict[str, str], interval: float = 1.0,
+                 window: float = 10.0, samples: int = 64, stale_after: float = 3.0,
+                 event_name: str = "telemetry_derived"):
+        self.logger = Logger.get("Analytics")
+        self.store = store
+        self.ws_server = ws_server
+        self.interval = interval
+        self.window = window
+        self.samples = min(samples, store.capacity)
+        self.stale_after = stale_after
+        self.event_name = event_name
+
+        self._columns = {}
+        for key in ("battery", "altitude", "vx", "vy"):
+            name = fields.get(key)
+            column = store.field_index(name) if name else None
+            if column is None:
+                self.logger.warning(f"Analytics input '{key}' ({name}) is not a history field; its metrics will be null")
+            self._columns[key] = column
+
+        self._task = None
+        self.runs = 0
+
+    # ------------------------------
+    # Lifecycle
+    # ------------------------------
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+        self.logger.info(f"Telemetry analytics active every {self.interval}s over {self.window}s")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.emit()
+            except Exception as e:
+                self.logger.error(f"Analytics pass failed: {e}")
+
+    # ------------------------------
+    # Computation
+    # ------------------------------
+
+    def emit(self):
+        for uav_id, metrics in self.compute().items():
+            self.ws_server.send_event(self.event_name, metrics, uav_id=uav_id)
+        self.runs += 1
+
+    def compute(self, now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """uav_id -> derived metrics for every UAV in the store."""
+        uav_ids, slots = self.store.active()
+        if not uav_ids:
+            return {}
+        now = time.time() if now is None else now
+
+        store = self.store
+        n = self.samples
+        heads = store.head[slots]
+        counts = store.count[slots]
+
+        # [S, n] ring indices, oldest -> newest; rows beyond count or outside the window are masked
+        positions = np.arange(n)
+        idx = (heads[:, None] - n + positions) % store.capacity
+        ts = store.timestamps[slots[:, None], idx]
+        valid = (positions >= n - counts[:, None]) & (ts > now - self.window)
+
+        newest = (heads - 1) % store.capacity
+        last_seen_age = np.where(counts > 0, now - store.timestamps[slots, newest], np.inf)
+
+        drain = -self._slope(slots, idx, ts, valid, "battery")
+        battery = self._latest(slots, newest, "battery")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            time_to_empty = np.where(drain > 0, battery / drain, np.nan)
+
+        metrics = {
+            "battery_drain_rate": drain,
+            "time_to_empty": time_to_empty,
+            "climb_rate": self._slope(slots, idx, ts, valid, "altitude"),
+            "ground_speed": np.hypot(self._latest(slots, newest, "vx"), self._latest(slots, newest, "vy")),
+            "last_seen_age": last_seen_age,
+        }
+        stale = (last_seen_age > self.stale_after).tolist()
+
+        # One tolist() per metric column, then NaN/inf -> None for JSON
+        columns = {name: _clean(values.tolist()) for name, values in metrics.items()}
+        return {
+            uav_id: dict(
+                {name: column[i] for name, column in columns.items()},
+                uav=uav_id, t=now, stale=stale[i],
+            )
+            for i, uav_id in enumerate(uav_ids)
+        }
+
+    def _latest(self, slots: np.ndarray, newest: np.ndarray, key: str) -> np.ndarray:
+        column = self._columns[key]
+        if column is None:
+            return np.full(len(slots), np.nan)
+        return self.store.values[slots, newest, column]
+
+    def _slope(self, slots: np.ndarray, idx: np.ndarray, ts: np.ndarray, valid: np.ndarray, key: str) -> np.ndarray:
+        """Per-UAV least-squares d(field)/dt over the valid, non-NaN samples; NaN with < 2 points."""
+        column = self._columns[key]
+        if column is None:
+            return np.full(len(slots), np.nan)
+
+        y = self.store.values[slots[:, None], idx, column]
+        mask = valid & ~np.isnan(y)
+        k = mask.sum(axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_mean = np.where(mask, ts, 0.0).sum(axis=1) / k
+            y_mean = np.where(mask, y, 0.0).sum(axis=1) / k
+            dt = np.where(mask, ts - t_mean[:, None], 0.0)
+            dy = np.where(mask, y - y_mean[:, None], 0.0)
+            num = (dt * dy).sum(axis=1)
+            den = (dt * dt).sum(axis=1)
+            return np.where((k >= 2) & (den > 0), num / den, np.nan)
+
+
+def _clean(values: List[float]) -> List[Optional[float]]:
+    return [v if v == v and v not in (float("inf"), float("-inf")) else None for v in values]
@@ -0,0 +1,154 @@
+"""
+telemetry_conflator.py
+----------------------
+Latest-value-wins conflation between TelemetryController and WebSocketServer.
+
+Autopilot feeds arrive at up to ~50 Hz per UAV while browser GCS clients
+only render at ~10 Hz. The conflator keeps the newest telemetry payload per
+UAV and flushes it to each WS client class at that class's own rate; frames
+that were overwritten before a flush are counted as coalesced.
+
+Each pending frame keeps its latency trace, so flushed frames still record
+dispatch/send/total, with the time spent waiting here as the "conflate" hop.
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from core.utils import Logger, current_trace, get_latency_tracker
+
+
+class TelemetryConflator:
+    """
+    Per-UAV, per-client-class telemetry conflation.
+
+    Args:
+        ws_server: WebSocketServer to flush into.
+        rates: client class -> flush rate in Hz. A rate of 0 forwards
+               every frame immediately (no conflation) for that class.
+               The server's default class is added at rate 0 if missing,
+               so clients without a class still get telemetry.
+        event_name: WS event type used for flushed frames.
+    """
+
+    def __init__(self, ws_server, rates: Dict[str, float], event_name: str = "telemetry_update"):
+        self.logger = Logger.get("Conflator")
+        self.ws_server = ws_server
+        self.latency = get_latency_tracker()
+        self.rates = self._with_default(rates)
+        self.event_name = event_name
+
+        # client class -> {uav_id: (payload, trace)}; payload is a body dict or raw JSON bytes
+        self._pending: Dict[str, Dict[str, Any]] = {cls: {} for cls in self.rates}
+        self._tasks = []
+
+        self.received = 0
+        self.coalesced = {cls: 0 for cls in self.rates}
+        self.flushed = {cls: 0 for cls in self.rates}
+
+    # ------------------------------
+    # Lifecycle
+    # ------------------------------
+
+    def start(self):
+        """Start one flush loop per conflated client class on the running loop."""
+        for cls, hz in self.rates.items():
+            if hz > 0:
+                self._tasks.append(asyncio.create_task(self._flush_loop(cls, 1.0 / hz)))
+        self.logger.info(f"Telemetry conflation active: {self.rates}")
+
+    def set_rates(self, rates: Dict[str, float]):
+        """
+        Apply new per-class rates while running (live config). Pending
+        frames are flushed first, then the flush loops restart at the new rates.
+        """
+        rates = self._with_default(rates)
+        if rates == self.rates:
+            return
+        for cls in self.rates:
+            self.flush(cls)
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+        self.rates = rates
+        self._pending = {cls: {} for cls in rates}
+        for counter in (self.coalesced, self.flushed):
+            for cls in rates:
+                counter.setdefault(cls, 0)
+        self.start()
+
+    def _with_default(self, rates: Dict[str, float]) -> Dict[str, float]:
+        rates = dict(rates)
+        default = self.ws_server.DEFAULT_CLASS
+        if default not in rates:
+            self.logger.warning(f"No rate for client class '{default}'; forwarding its telemetry unconflated")
+            rates[default] = 0
+        return rates
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.logger.info(f"Telemetry conflation stopped: {self.stats()}")
+
+    # ------------------------------
+    # Ingest / flush
+    # ------------------------------
+
+    def push(self, uav_id: str, payload: Any):
+        """Record the newest telemetry for uav_id. Runs on the main loop."""
+        self.received += 1
+        trace = current_trace()
+        for cls, pending in self._pending.items():
+            if self.rates[cls] <= 0:
+                self._send(cls, uav_id, payload)
+                self.flushed[cls] += 1
+                continue
+            if uav_id in pending:
+                self.coalesced[cls] += 1
+            pending[uav_id] = (payload, trace)
+
+    async def _flush_loop(self, client_class: str, period: float):
+        while True:
+            await asyncio.sleep(period)
+            self.flush(client_class)
+
+    def flush(self, client_class: str):
+        """Send every pending UAV frame for client_class, then reset its pending set."""
+        pending = self._pending[client_class]
+        if not pending:
+            return
+        self._pending[client_class] = {}
+
+        if not self.ws_server.clients_of_class(client_class):
+            return
+
+        for uav_id, (payload, trace) in pending.items():
+            token = self.latency.attach(trace.held()) if trace else None
+            try:
+                self._send(client_class, uav_id, payload)
+            finally:
+                self.latency.end(token)
+        self.flushed[client_class] += len(pending)
+
+    def _send(self, client_class: str, uav_id: str, payload: Any):
+        if isinstance(payload, (bytes, bytearray)):
+            self.ws_server.send_raw(self.event_name, payload, client_class=client_class, uav_id=uav_id)
+        else:
+            self.ws_server.send_event(self.event_name, payload, client_class=client_class, uav_id=uav_id)
+
+    def stats(self, client_class: Optional[str] = None) -> Dict[str, Any]:
+        """Counters: frames received, coalesced (dropped by conflation) and flushed."""
+        if client_class is not None:
+            return {
+                "received": self.received,
+                "coalesced": self.coalesced[client_class],
+                "flushed": self.flushed[client_class],
+            }
+        return {
+            "received": self.received,
+            "coalesced": dict(self.coalesced),
+            "flushed": dict(self.flushed),
+        }
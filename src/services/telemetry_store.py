@@ -0,0 +1,183 @@
+"""
+telemetry_store.py
+------------------
+Fixed-size per-UAV history of numeric telemetry fields.
+
+Every UAV gets a slot in preallocated NumPy arrays:
+
+    values      float64 [max_uavs, capacity, n_fields]
+    timestamps  float64 [max_uavs, capacity]          (receive time, epoch seconds)
+
+Each slot is a ring buffer, so memory is capacity * 8 * (n_fields + 1) bytes
+per UAV however long the flight. float64 keeps lat/lon well under a metre.
+Fields are dotted paths into the telemetry body (e.g. "battery.voltage");
+missing or non-numeric values are stored as NaN.
+"""
+
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from core.utils import Logger, get_codec
+
+
+class TelemetryStore:
+    """
+    uav_id -> ring buffer slot. Only touched from the main event loop.
+    """
+
+    def __init__(self, fields: Iterable[str], capacity: int = 600, max_uavs: int = 32):
+        self.logger = Logger.get("TelemetryStore")
+        self.codec = get_codec()
+
+        self.fields: List[str] = list(fields)
+        if not self.fields:
+            raise ValueError("TelemetryStore needs at least one field")
+        self._field_index = {name: i for i, name in enumerate(self.fields)}
+        self._paths = [tuple(name.split(".")) for name in self.fields]
+
+        self.capacity = capacity
+        self.max_uavs = max_uavs
+        self.values = np.full((max_uavs, capacity, len(self.fields)), np.nan, dtype=np.float64)
+        self.timestamps = np.zeros((max_uavs, capacity), dtype=np.float64)
+        self.head = np.zeros(max_uavs, dtype=np.int64)    # next write index per slot
+        self.count = np.zeros(max_uavs, dtype=np.int64)   # valid samples per slot
+
+        self._slots: Dict[str, int] = {}
+        self._free = list(range(max_uavs - 1, -1, -1))
+        self.rejected = 0
+
+    @property
+    def bytes_per_uav(self) -> int:
+        return self.capacity * (self.values.itemsize * len(self.fields) + self.timestamps.itemsize)
+
+    def uavs(self) -> List[str]:
+        return list(self._slots)
+
+    def active(self) -> Tuple[List[str], np.ndarray]:
+        """UAV ids with a slot and the matching slot indices, for fleet-wide vectorised reads."""
+        return list(self._slots), np.fromiter(self._slots.values(), dtype=np.int64, count=len(self._slots))
+
+    def field_index(self, name: str) -> Optional[int]:
+        return self._field_index.get(name)
+
+    def slot(self, uav_id: str) -> Optional[int]:
+        """Slot index for uav_id, allocating one on first sight. None when the store is full."""
+        slot = self._slots.get(uav_id)
+        if slot is None:
+            if not self._free:
+                if self.rejected == 0:
+                    self.logger.warning(f"History full ({self.max_uavs} UAVs); not recording {uav_id}")
+                self.rejected += 1
+                return None
+            slot = self._slots[uav_id] = self._free.pop()
+        return slot
+
+    def release(self, uav_id: str):
+        """Forget uav_id and return its slot to the pool."""
+        slot = self._slots.pop(uav_id, None)
+        if slot is not None:
+            self.head[slot] = 0
+            self.count[slot] = 0
+            self._free.append(slot)
+
+    # ------------------------------
+    # Writes
+    # ------------------------------
+
+    def append(self, uav_id: str, body: Dict[str, Any], ts: Optional[float] = None):
+        slot = self.slot(uav_id)
+        if slot is None:
+            return
+
+        i = int(self.head[slot])
+        # one row assignment; per-element numpy writes cost more than the decode
+        self.values[slot, i] = self._extract(body)
+        self.timestamps[slot, i] = time.time() if ts is None else ts
+        self.head[slot] = (i + 1) % self.capacity
+        if self.count[slot] < self.capacity:
+            self.count[slot] += 1
+
+    def append_raw(self, uav_id: str, body: bytes, ts: Optional[float] = None):
+        """
+        Append from a body that is still JSON bytes (telemetry passthrough mode).
+        The bytes are decoded by the C codec and only the configured fields are
+        read; scanning the bytes for them in Python is slower than the decode.
+        """
+        self.append(uav_id, self.codec.loads(body), ts)
+
+    def _extract(self, body: Dict[str, Any]) -> List[float]:
+        row = []
+        for path in self._paths:
+            value = body
+            try:
+                for key in path:
+                    value = value[key]
+            except (KeyError, TypeError, IndexError):
+                value = None
+            row.append(value if isinstance(value, (int, float)) else math.nan)
+        return row
+
+    # ------------------------------
+    # Reads
+    # ------------------------------
+
+    def window(self, uav_id: str, fields: Optional[Iterable[str]] = None,
+               since: Optional[float] = None, limit: Optional[int] = None):
+        """
+        Samples for uav_id in time order as (timestamps[n], values[n, len(fields)]).
+        since keeps samples strictly newer than that epoch time; limit keeps the newest n.
+
+        Raises:
+            KeyError: unknown uav_id or field name.
+        """
+        slot = self._slots.get(uav_id)
+        if slot is None:
+            raise KeyError(f"No telemetry history for UAV: {uav_id}")
+
+        try:
+            columns = [self._field_index[name] for name in fields] if fields else slice(None)
+        except KeyError as e:
+            raise KeyError(f"Unknown telemetry field: {e.args[0]}") from None
+
+        count = int(self.count[slot])
+        order = (self.head[slot] - count + np.arange(count)) % self.capacity
+        ts = self.timestamps[slot, order]
+
+        start = 0
+        if since is not None:
+            start = int(np.searchsorted(ts, since, side="right"))
+        if limit is not None:
+            start = max(start, count - int(limit))
+
+        order = order[start:]
+        return ts[start:], self.values[slot, order][:, columns]
+
+    def history(self, uav_id: str, fields: Optional[Iterable[str]] = None,
+                since: Optional[float] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Columnar, JSON-ready window: {"uav", "t": [...], "fields": {name: [...]}}.
+        Missing (NaN) values are None, so every codec writes them as null.
+        """
+        names = list(fields) if fields else self.fields
+        ts, values = self.window(uav_id, names, since, limit)
+        return {
+            "uav": uav_id,
+            "t": ts.tolist(),
+            "fields": {name: _clean(values[:, i].tolist()) for i, name in enumerate(names)},
+        }
+
+    def stats(self) -> dict:
+        return {
+            "uavs": len(self._slots),
+            "max_uavs": self.max_uavs,
+            "capacity": self.capacity,
+            "bytes_per_uav": self.bytes_per_uav,
+            "rejected": self.rejected,
+        }
+
+
+def _clean(values: List[float]) -> List[Optional[float]]:
+    return [None if v != v else v for v in values]
@@ -0,0 +1,4 @@
+from .virtual_uav import VirtualUav
+from .fleet_simulator import FleetSimulator
+
+__all__ = ["VirtualUav", "FleetSimulator"]
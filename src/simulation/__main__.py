@@ -0,0 +1,59 @@
+"""
+Run a simulated air-unit fleet against a local nats-server.
+
+Run from src/:
+    python -m simulation [--uavs 50] [--rate 10] [--connections 2]
+        [--url nats://127.0.0.1:4222] [--duration 60] [--legacy-responses]
+"""
+
+import argparse
+import asyncio
+import time
+
+from .fleet_simulator import FleetSimulator
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Simulated air-unit fleet")
+    parser.add_argument("--url", default="nats://127.0.0.1:4222")
+    parser.add_argument("--uavs", type=int, default=10, help="number of virtual UAVs")
+    parser.add_argument("--rate", type=float, default=10.0, help="telemetry Hz per UAV")
+    parser.add_argument("--connections", type=int, default=1, help="NATS connections to spread UAVs over")
+    parser.add_argument("--discovery-interval", type=float, default=5.0)
+    parser.add_argument("--prefix", default="sim")
+    parser.add_argument("--duration", type=float, default=0, help="seconds to run (0 = until Ctrl+C)")
+    parser.add_argument("--report", type=float, default=5.0, help="seconds between stats lines")
+    parser.add_argument("--legacy-responses", action="store_true",
+                        help="ignore msg.reply and answer on uav.<id>.<topic>.response, like older air units")
+    args = parser.parse_args()
+
+    sim = FleetSimulator(
+        url=args.url,
+        count=args.uavs,
+        rate=args.rate,
+        connections=args.connections,
+        discovery_interval=args.discovery_interval,
+        prefix=args.prefix,
+        use_reply=not args.legacy_responses,
+    )
+    await sim.start()
+
+    started = time.monotonic()
+    last_published, last_time = 0, started
+    try:
+        while not args.duration or time.monotonic() - started < args.duration:
+            await asyncio.sleep(args.report)
+            now = time.monotonic()
+            stats = sim.stats()
+            rate = (stats["published"] - last_published) / (now - last_time)
+            last_published, last_time = stats["published"], now
+            print(f"📊 {rate:,.0f} msgs/s | {stats}")
+    finally:
+        await sim.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,188 @@
+"""
+fleet_simulator.py
+------------------
+Spawns N VirtualUavs against a local nats-server.
+
+UAVs are spread across a few NATS connections. Each connection runs one
+ticker that publishes telemetry for all of its UAVs every 1/rate seconds
+on a fixed schedule, and one wildcard subscription per command topic
+(ground.*.<topic>.request.*) that routes to the UAV named by the last token.
+Command responses go to msg.reply when the ground sets one, as the
+correlating CommandEgressController does; otherwise to uav.<id>.<topic>.response.
+"""
+
+import asyncio
+from functools import partial
+from typing import Dict, List
+
+from core.comms import NatsClient
+from core.utils import Logger
+from factory import SubjectFactory
+
+from .virtual_uav import VirtualUav
+
+COMMAND_TOPICS = ("fcconnect", "fcdisconnect", "mission_upload")
+
+
+class _Link:
+    """One NATS connection and the UAVs that publish through it."""
+
+    def __init__(self, client: NatsClient):
+        self.client = client
+        self.uavs: Dict[str, VirtualUav] = {}
+
+
+class FleetSimulator:
+    """
+    Args:
+        url: NATS server URL.
+        count: number of virtual UAVs.
+        rate: telemetry Hz per UAV.
+        connections: NATS connections to spread the UAVs over.
+        discovery_interval: seconds between discovery requests per UAV.
+        prefix: UAV ids are <prefix>-0001, <prefix>-0002, ...
+        use_reply: answer commands on msg.reply when present; False mimics older air units.
+    """
+
+    def __init__(self, url: str = "nats://127.0.0.1:4222", count: int = 10, rate: float = 10.0,
+                 connections: int = 1, discovery_interval: float = 5.0, prefix: str = "sim",
+                 use_reply: bool = True):
+        self.logger = Logger.get("FleetSim")
+        self.url = url
+        self.count = count
+        self.rate = rate
+        self.connections = max(1, min(connections, count))
+        self.discovery_interval = discovery_interval
+        self.prefix = prefix
+        self.use_reply = use_reply
+        self.subjects = SubjectFactory()
+
+        self.links: List[_Link] = []
+        self._tasks: List[asyncio.Task] = []
+
+        self.published = 0
+        self.bytes = 0
+        self.commands = 0
+        self.discovery_responses = 0
+        self.late_ticks = 0
+
+    @property
+    def uavs(self) -> List[VirtualUav]:
+        return [uav for link in self.links for uav in link.uavs.values()]
+
+    # ------------------------------
+    # Lifecycle
+    # ------------------------------
+
+    async def start(self):
+        for n in range(self.connections):
+            client = NatsClient(local_servers=[self.url], name=f"{self.prefix}-fleet-{n}")
+            if not await client.connect():
+                raise ConnectionError(f"Could not connect to {self.url}")
+            self.links.append(_Link(client))
+
+        for i in range(self.count):
+            uav_id = f"{self.prefix}-{i + 1:04d}"
+            uav = VirtualUav(uav_id, phase=(i * 0.61803) % 6.2832)
+            self.links[i % self.connections].uavs[uav_id] = uav
+
+        for link in self.links:
+            await self._subscribe(link)
+            self._tasks.append(asyncio.create_task(self._telemetry_loop(link)))
+            self._tasks.append(asyncio.create_task(self._discovery_loop(link)))
+
+        self.logger.info(
+            f"🛩️ Simulating {self.count} UAVs at {self.rate} Hz over {self.connections} connection(s) "
+            f"(~{self.count * self.rate:.0f} msgs/s)"
+        )
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for link in self.links:
+            await link.client.close()
+        self.links = []
+
+    async def _subscribe(self, link: _Link):
+        nc = link.client.nc
+        for topic in COMMAND_TOPICS:
+            subject = self.subjects.create(
+                source="ground", source_id="*", topic=topic, subtopic="request",
+                mode="pub", remote_client_id="*",
+            )
+            await nc.subscribe(subject, cb=partial(self._on_command, link))
+
+        subject = self.subjects.create(
+            source="ground", source_id="*", topic="discovery", subtopic="response",
+            mode="pub", remote_client_id="*",
+        )
+        await nc.subscribe(subject, cb=partial(self._on_discovery_response, link))
+
+    # ------------------------------
+    # Callbacks
+    # ------------------------------
+
+    async def _on_command(self, link: _Link, msg):
+        # ground.<ground_id>.<topic>.request.<uav_id>
+        tokens = msg.subject.split(".")
+        uav = link.uavs.get(tokens[-1])
+        if uav is None:
+            return  # addressed to a UAV on another connection
+        self.commands += 1
+        response = uav.handle_command(tokens[2], msg.data)
+        if response is not None:
+            subject, data = response
+            # Answer on the ground's reply subject when it gave one (correlated), else the shared .response subject
+            await link.client.nc.publish((self.use_reply and msg.reply) or subject, data)
+
+    async def _on_discovery_response(self, link: _Link, msg):
+        uav = link.uavs.get(msg.subject.rsplit(".", 1)[-1])
+        if uav is not None:
+            uav.discovered = True
+            self.discovery_responses += 1
+
+    # ------------------------------
+    # Publishers
+    # ------------------------------
+
+    async def _telemetry_loop(self, link: _Link):
+        nc = link.client.nc
+        period = 1.0 / self.rate
+        loop = asyncio.get_running_loop()
+        due = loop.time()
+        while True:
+            for uav in link.uavs.values():
+                data = uav.telemetry()
+                await nc.publish(uav.telemetry_subject, data)
+                self.published += 1
+                self.bytes += len(data)
+
+            due += period
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                # Fell behind: count it and restart the schedule instead of bursting
+                self.late_ticks += 1
+                due = loop.time()
+                await asyncio.sleep(0)
+
+    async def _discovery_loop(self, link: _Link):
+        nc = link.client.nc
+        while True:
+            for uav in link.uavs.values():
+                await nc.publish(uav.discovery_subject, uav.discovery_request())
+            await asyncio.sleep(self.discovery_interval)
+
+    def stats(self) -> dict:
+        return {
+            "uavs": self.count,
+            "published": self.published,
+            "bytes": self.bytes,
+            "commands": self.commands,
+            "discovery_responses": self.discovery_responses,
+            "discovered": sum(1 for uav in self.uavs if uav.discovered),
+            "late_ticks": self.late_ticks,
+        }
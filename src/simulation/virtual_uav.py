@@ -0,0 +1,144 @@
+"""
+virtual_uav.py
+--------------
+One simulated Air Unit: flies a circle around the SITL home position,
+drains its battery, and speaks the same subjects as the real air unit.
+"""
+
+import itertools
+import math
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict
+
+from core.utils import get_codec
+from factory import SubjectFactory
+
+# Default SITL home (ArduCopter)
+HOME_LAT = -35.363261
+HOME_LON = 149.165230
+HOME_ALT = 584.0
+METERS_PER_DEG = 111_320.0
+
+
+class VirtualUav:
+    """
+    Pure state + message building; FleetSimulator owns the NATS side.
+
+    Args:
+        uav_id: client id, e.g. "sim-0001".
+        radius: circle radius in metres.
+        speed: ground speed in m/s.
+    """
+
+    def __init__(self, uav_id: str, radius: float = 50.0, speed: float = 5.0, phase: float = 0.0):
+        self.uav_id = uav_id
+        self.radius = radius
+        self.speed = speed
+        self.phase = phase
+        self.codec = get_codec()
+        self.subjects = SubjectFactory()
+
+        self.started = time.monotonic()
+        self.connected = False
+        self.mission_items = 0
+        self.discovered = False
+        self._sequence = itertools.count(1)
+
+        # uav.<id>.<topic>.<subtopic> (4 tokens, as the ground subscribes to uav.*.<topic>.<subtopic>)
+        self.telemetry_subject = self._subject("telemetry", "update")
+        self.discovery_subject = self._subject("discovery", "request")
+        self.response_subjects = {
+            topic: self._subject(topic, "response")
+            for topic in ("fcconnect", "fcdisconnect", "mission_upload")
+        }
+
+    def _subject(self, topic: str, subtopic: str) -> str:
+        return self.subjects.create(source="uav", source_id=self.uav_id, topic=topic, subtopic=subtopic, mode="sub")
+
+    # ------------------------------
+    # Messages
+    # ------------------------------
+
+    def envelope(self, msg_type: str, body: Dict[str, Any]) -> bytes:
+        """Encode {"header", "body"} with body last, like MessageTemplate.render()."""
+        return self.codec.dumps({
+            "header": {
+                "msg_type": msg_type,
+                "msg_id": str(uuid.uuid4()),
+                "qos": "AT_MOST_ONCE",
+                "stream": None,
+                "timestamp": datetime.utcnow().isoformat(),
+                "source": self.uav_id,
+                "sequence": next(self._sequence),
+            },
+            "body": body,
+        })
+
+    def telemetry(self) -> bytes:
+        t = time.monotonic() - self.started
+        omega = self.speed / self.radius
+        angle = self.phase + omega * t
+        north, east = self.radius * math.cos(angle), self.radius * math.sin(angle)
+        relative_alt = 20.0 + 2.0 * math.sin(t / 10.0)
+        remaining = max(0.0, 100.0 - t * 0.02)
+
+        return self.envelope("Telemetry", {
+            "drone_id": self.uav_id,
+            "position": {
+                "lat": HOME_LAT + north / METERS_PER_DEG,
+                "lon": HOME_LON + east / (METERS_PER_DEG * math.cos(math.radians(HOME_LAT))),
+                "alt": HOME_ALT + relative_alt,
+                "relative_alt": relative_alt,
+            },
+            "velocity": {
+                "vx": -self.speed * math.sin(angle),
+                "vy": self.speed * math.cos(angle),
+                "vz": -0.2 * math.cos(t / 10.0),
+            },
+            "attitude": {"roll": 0.05, "pitch": -0.02, "yaw": (angle + math.pi / 2) % (2 * math.pi)},
+            "heading": math.degrees(angle + math.pi / 2) % 360.0,
+            "groundspeed": self.speed,
+            "airspeed": self.speed,
+            "battery": {"voltage": 10.5 + 2.1 * remaining / 100.0, "current": 8.5, "remaining": round(remaining, 2)},
+            "gps": {"fix_type": 3, "satellites_visible": 14, "eph": 0.8, "epv": 1.2},
+            "mode": "GUIDED" if self.connected else "LOITER",
+            "armed": self.connected,
+            "status": "ok",
+        })
+
+    def discovery_request(self) -> bytes:
+        return self.envelope("Discovery", {
+            "client_id": self.uav_id,
+            "client_type": "AIR",
+            "software_version": "sim-1.0",
+            "ip_address": "127.0.0.1",
+            "capabilities": ["telem", "control", "mission"],
+            "location": {"lat": HOME_LAT, "lon": HOME_LON, "alt": HOME_ALT},
+            "uptime_seconds": int(time.monotonic() - self.started),
+            "status": "available",
+        })
+
+    # ------------------------------
+    # Command handling -> (response subject, response bytes)
+    # ------------------------------
+
+    def handle_command(self, topic: str, data: bytes):
+        if topic == "fcconnect":
+            self.connected = True
+            body = {"connected": True}
+        elif topic == "fcdisconnect":
+            self.connected = False
+            body = {"connected": False}
+        elif topic == "mission_upload":
+            try:
+                mission = self.codec.loads(data)
+            except ValueError:
+                return self.response_subjects[topic], self.envelope("MissionUpload", {"success": False, "error": "invalid mission JSON"})
+            waypoints = mission.get("waypoints", []) if isinstance(mission, dict) else mission
+            self.mission_items = len(waypoints)
+            body = {"success": True, "items": self.mission_items}
+        else:
+            return None
+        return self.response_subjects[topic], self.envelope(topic, body)
@@ -0,0 +1,65 @@
+import asyncio
+
+from core.comms.ws.client_session import ClientSession, SendPolicy
+
+
+class _Socket:
+    remote_address = ("127.0.0.1", 5000)
+
+    def __init__(self):
+        self.frames = []
+        self.gate = asyncio.Event()
+        self.closed = None
+
+    async def send(self, message):
+        await self.gate.wait()
+        self.frames.append(message)
+
+    async def close(self, code=1000, reason=""):
+        self.closed = (code, reason)
+
+
+def test_blocked_frames_keep_order_without_a_task_per_frame():
+    async def scenario():
+        socket = _Socket()
+        session = ClientSession(socket, "default", max_queue=8, block_timeout=5)
+        session.start()
+        tasks = len(asyncio.all_tasks())
+        for i in range(10):
+            session.enqueue(str(i), SendPolicy.BLOCK)
+        assert len(asyncio.all_tasks()) == tasks
+        socket.gate.set()
+        while session.sent < 10:
+            await asyncio.sleep(0)
+        assert socket.frames == [str(i) for i in range(10)]
+        assert session.depth == 0 and session._block_timer is None
+        await session.close()
+    asyncio.run(scenario())
+
+
+def test_blocked_too_long_disconnects():
+    async def scenario():
+        socket = _Socket()
+        session = ClientSession(socket, "default", max_queue=2, block_timeout=0.05)
+        session.start()
+        for i in range(4):
+            session.enqueue(str(i), SendPolicy.BLOCK)
+        await asyncio.sleep(0.1)
+        # the writer holds frame 0, the queue frames 1-2; frame 3 waited too long
+        assert session.closing and not session.overflow
+        await session._closer
+        assert socket.closed == (1008, "slow consumer")
+        assert session.dropped == 1
+        await session.close()
+    asyncio.run(scenario())
+
+
+def test_overflow_is_bounded():
+    async def scenario():
+        session = ClientSession(_Socket(), "default", max_queue=2, block_timeout=5)
+        for i in range(5):
+            session.enqueue(str(i), SendPolicy.BLOCK)
+        assert session.closing and session.depth == 4
+        await session._closer
+        await session.close()
+    asyncio.run(scenario())
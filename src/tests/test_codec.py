@@ -0,0 +1,17 @@
+from core.utils import get_codec, slice_envelope_body
+
+
+def test_slices_body_of_standard_envelope():
+    codec = get_codec()
+    body = {"position": {"lat": -35.3}, "mode": "GUIDED", "wp": [{"seq": 1}]}
+    data = codec.dumps({"header": {"source": "uav-1"}, "body": body})
+    assert codec.loads(slice_envelope_body(data)) == body
+
+
+def test_rejects_key_after_body():
+    assert slice_envelope_body(b'{"header":{},"body":{"x":1},"sig":{"k":2}}') is None
+
+
+def test_rejects_bodies_the_brace_check_cannot_vouch_for():
+    assert slice_envelope_body(b'{"header":{},"body":{"x":"}{"}}') is None
+    assert slice_envelope_body(b'{"header":{},"body":{"x":"a\\"}"},"sig":{}}') is None
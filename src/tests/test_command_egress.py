@@ -0,0 +1,41 @@
+import asyncio
+from types import SimpleNamespace
+
+from controllers.command_egress_controller import CommandEgressController
+from core.utils import get_subject_stats
+
+
+def _controller(responses):
+    async def on_response(uav_id, body, request):
+        responses.append((uav_id, body, request))
+
+    controller = CommandEgressController(SimpleNamespace(nc=None), "gcs-1", on_conn_response=on_response)
+    controller._inbox = "_INBOX.test"
+    controller._reply_traffic = get_subject_stats().counter("<inbox>.>")
+    return controller
+
+
+def _msg(subject, data=b'{"body": {"connected": true}}'):
+    return SimpleNamespace(subject=subject, data=data, headers=None)
+
+
+def test_malformed_reply_subjects_are_counted_as_unmatched():
+    async def scenario():
+        responses = []
+        controller = _controller(responses)
+        for subject in ("_INBOX.test.x", "_INBOX.test.fcconnect", "_INBOX.test.bogus.uav-1.1"):
+            await controller._reply_cb(_msg(subject))
+        assert responses == []
+        assert controller.pending.counts["unmatched"] == 3
+    asyncio.run(scenario())
+
+
+def test_reply_is_matched_by_request_id():
+    async def scenario():
+        responses = []
+        controller = _controller(responses)
+        request = controller.pending.add("uav-1", "fcconnect")
+        await controller._reply_cb(_msg(f"_INBOX.test.fcconnect.uav-1.{request.id}"))
+        assert responses == [("uav-1", {"connected": True}, request)]
+        assert controller.pending.counts["correlated"] == 1
+    asyncio.run(scenario())
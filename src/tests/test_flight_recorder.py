@@ -0,0 +1,30 @@
+import time
+
+from core.recorder import FlightRecorder
+
+
+def test_records_beyond_max_queue_are_dropped(tmp_path):
+    recorder = FlightRecorder(str(tmp_path), max_queue=3)
+    for i in range(5):
+        recorder.record("uav.a.telemetry.update", b"{}")
+    stats = recorder.stats()
+    assert stats["queued"] == 3 and stats["dropped"] == 2
+
+
+def test_writer_failure_is_surfaced(tmp_path):
+    recorder = FlightRecorder(str(tmp_path), segment_size=1 << 16)
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    recorder._write = fail
+    recorder.start()
+    recorder.record("uav.a.telemetry.update", b"{}")
+    deadline = time.monotonic() + 2
+    while recorder.running and time.monotonic() < deadline:
+        time.sleep(0.01)
+    recorder.record("uav.a.telemetry.update", b"{}")
+    stats = recorder.stats()
+    assert not stats["running"] and stats["error"] == "OSError: disk full"
+    assert stats["dropped"] == 1 and stats["queued"] == 0
+    recorder.stop()
@@ -0,0 +1,46 @@
+import asyncio
+
+from controllers.pending_commands import PendingCommands
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_out_of_order_resolution_leaves_no_stale_fifo_ids():
+    async def scenario():
+        table = PendingCommands(lambda pending: None)
+        sent = [table.add("uav-1", "fcconnect") for _ in range(100)]
+        for pending in reversed(sent):
+            assert table.resolve(pending.id) is pending
+        assert len(table) == 0
+        assert table._fifo == {}
+    _run(scenario())
+
+
+def test_fifo_skips_commands_answered_by_request_id():
+    async def scenario():
+        table = PendingCommands(lambda pending: None)
+        first = table.add("uav-1", "fcconnect")
+        second = table.add("uav-1", "fcconnect")
+        third = table.add("uav-1", "fcconnect")
+        table.resolve(second.id)
+        assert table.resolve_oldest("uav-1", "fcconnect") is first
+        assert table.resolve_oldest("uav-1", "fcconnect") is third
+        assert table.resolve_oldest("uav-1", "fcconnect") is None
+        assert table._fifo == {}
+    _run(scenario())
+
+
+def test_timeout_behind_pending_command_is_removed_from_fifo():
+    async def scenario():
+        failed = []
+        table = PendingCommands(failed.append, {"fcconnect": 10.0})
+        first = table.add("uav-1", "fcconnect")
+        table.timeouts["fcconnect"] = 0.01
+        second = table.add("uav-1", "fcconnect")
+        await asyncio.sleep(0.05)
+        assert failed == [second]
+        assert list(table._fifo[("uav-1", "fcconnect")]) == [first.id]
+        assert table.resolve_oldest("uav-1", "fcconnect") is first
+    _run(scenario())
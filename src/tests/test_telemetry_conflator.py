@@ -0,0 +1,37 @@
+from core.utils import LatencyTracker, current_trace, mark_decoded
+from services.telemetry_conflator import TelemetryConflator
+
+
+class _Server:
+    DEFAULT_CLASS = "default"
+
+    def __init__(self):
+        self.sent = []
+
+    def clients_of_class(self, client_class):
+        return [object()]
+
+    def send_event(self, event, payload, client_class=None, uav_id=None):
+        trace = current_trace()
+        self.sent.append((client_class, payload, trace))
+        if trace:
+            trace.mark_sent(trace.mark_enqueued())
+
+
+def test_flushed_frames_keep_their_trace():
+    server = _Server()
+    conflator = TelemetryConflator(server, {"default": 10, "gcs": 5})
+    tracker = LatencyTracker()
+    for i in range(3):
+        token = tracker.begin("telemetry")
+        mark_decoded()
+        conflator.push("uav-1", {"i": i})
+        tracker.end(token)
+
+    conflator.flush("default")
+    conflator.flush("gcs")
+    assert [(cls, payload) for cls, payload, _ in server.sent] == [("default", {"i": 2}), ("gcs", {"i": 2})]
+    assert all(trace is not None for _, _, trace in server.sent)
+    assert current_trace() is None
+    stats = tracker.snapshot()["telemetry"]
+    assert [stats[hop]["count"] for hop in ("decode", "conflate", "dispatch", "send", "total")] == [3, 2, 2, 2, 2]
@@ -0,0 +1,20 @@
+import json
+
+from services.telemetry_store import TelemetryStore
+
+
+def test_append_raw_reads_configured_fields():
+    store = TelemetryStore(["position.lat", "battery.remaining", "heading"], capacity=4, max_uavs=2)
+    store.append_raw("uav-1", b'{"position":{"lat":-35.3,"lon":149.1},"battery":{"remaining":77},"mode":"GUIDED"}', ts=1.0)
+    ts, values = store.window("uav-1")
+    assert ts.tolist() == [1.0]
+    assert values[0, :2].tolist() == [-35.3, 77.0]
+
+
+def test_history_reports_gaps_as_null():
+    store = TelemetryStore(["position.lat", "heading"], capacity=4, max_uavs=2)
+    store.append("uav-1", {"position": {"lat": 1.0}, "heading": "north"}, ts=1.0)
+    store.append("uav-1", {"position": "lost", "heading": 90}, ts=2.0)
+    history = store.history("uav-1")
+    assert history["fields"] == {"position.lat": [1.0, None], "heading": [None, 90.0]}
+    json.dumps(history, allow_nan=False)